@@ -0,0 +1,93 @@
+# backend_python/benchmarks/bench_async_db.py
+#
+# Compara, sob concorrência, três formas de um handler `async def` acessar o banco:
+#   - sync_no_loop:   sessão síncrona chamada direto no event loop (padrão antigo dos controladores);
+#   - sync_threadpool: sessão síncrona em thread (equivalente a um handler `def`);
+#   - async:          AsyncSession nativa.
+# Mede vazão e o atraso máximo do event loop (um "batimento" a cada 1 ms).
+# Usa SQLite em arquivo temporário (aiosqlite como substituto local do aiomysql).
+# Uso: python -m benchmarks.bench_async_db
+
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+REQUISICOES = 2000
+CONCORRENCIA = 50
+LINHAS = 5000
+
+metadata = MetaData()
+sessoes = Table(
+    "sessoes_maconicas", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_loja", Integer, index=True),
+    Column("tipo", String(50)),
+    Column("data_sessao", DateTime, server_default=func.now()),
+)
+
+def _consulta(i: int):
+    return select(sessoes).where(sessoes.c.id_loja == i % 50).limit(20)
+
+async def _medir(nome: str, handler):
+    atraso_max = 0.0
+    ativo = True
+
+    async def batimento():
+        nonlocal atraso_max
+        while ativo:
+            inicio = time.perf_counter()
+            await asyncio.sleep(0.001)
+            atraso_max = max(atraso_max, time.perf_counter() - inicio - 0.001)
+
+    tarefa_batimento = asyncio.create_task(batimento())
+    limite = asyncio.Semaphore(CONCORRENCIA)
+
+    async def requisicao(i: int):
+        async with limite:
+            await handler(i)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(requisicao(i) for i in range(REQUISICOES)))
+    duracao = time.perf_counter() - inicio
+    ativo = False
+    await tarefa_batimento
+    print(f"{nome:<16} {REQUISICOES / duracao:>10,.0f} req/s   atraso máx. do loop: {atraso_max * 1000:>8.2f} ms")
+
+async def main():
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_async.db")
+    engine = create_engine(f"sqlite:///{caminho}", pool_size=CONCORRENCIA)
+    engine_async = create_async_engine(f"sqlite+aiosqlite:///{caminho}", pool_size=CONCORRENCIA)
+
+    metadata.create_all(engine)
+    with engine.begin() as conexao:
+        conexao.execute(insert(sessoes), [{"id_loja": i % 50, "tipo": "Ordinária"} for i in range(LINHAS)])
+
+    def consultar_sync(i: int):
+        with Session(engine) as db:
+            return db.execute(_consulta(i)).all()
+
+    async def sync_no_loop(i: int):
+        consultar_sync(i)
+
+    async def sync_threadpool(i: int):
+        await asyncio.to_thread(consultar_sync, i)
+
+    async def nativo(i: int):
+        async with engine_async.connect() as conexao:
+            (await conexao.execute(_consulta(i))).all()
+
+    print(f"{REQUISICOES} requisições, concorrência {CONCORRENCIA}, {LINHAS} linhas")
+    await _medir("sync_no_loop", sync_no_loop)
+    await _medir("sync_threadpool", sync_threadpool)
+    await _medir("async", nativo)
+
+    await engine_async.dispose()
+    engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
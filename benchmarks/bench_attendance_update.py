@@ -0,0 +1,80 @@
+# backend_python/benchmarks/bench_attendance_update.py
+#
+# Custo de aplicar uma lista de presença completa a uma sessão:
+#   - por_item: um UPDATE por membro, como o update_session_attendance original;
+#   - case:     um único UPDATE ... SET status_presenca = CASE id_membro ... WHERE id_membro IN (...).
+# Mede tempo por lista e número de instruções enviadas ao banco. Usa SQLite em arquivo temporário.
+# Uso: python -m benchmarks.bench_attendance_update
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, case, create_engine, event, insert, update
+
+TAMANHOS_LOJA = [10, 300, 5000]
+REPETICOES = 10
+STATUS = ["Presente", "Ausente", "Justificado"]
+
+metadata = MetaData()
+presencas = Table(
+    "presencas_sessao", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_sessao", Integer),
+    Column("id_membro", Integer),
+    Column("status_presenca", String(50)),
+    Column("data_hora_checkin", DateTime),
+    Index("ix_presencas_sessao_sessao_membro", "id_sessao", "id_membro"),
+)
+
+def por_item(conexao, id_sessao: int, lista: dict):
+    for id_membro, status_presenca in lista.items():
+        conexao.execute(
+            update(presencas)
+            .where(presencas.c.id_sessao == id_sessao, presencas.c.id_membro == id_membro)
+            .values(status_presenca=status_presenca, data_hora_checkin=datetime.now())
+        )
+
+def em_massa(conexao, id_sessao: int, lista: dict):
+    conexao.execute(
+        update(presencas)
+        .where(presencas.c.id_sessao == id_sessao, presencas.c.id_membro.in_(list(lista)))
+        .values(status_presenca=case(lista, value=presencas.c.id_membro), data_hora_checkin=datetime.now())
+    )
+
+def main():
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_attendance.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    metadata.create_all(engine)
+    with engine.begin() as conexao:
+        conexao.execute(insert(presencas), [
+            {"id_sessao": id_sessao, "id_membro": id_membro, "status_presenca": "Ausente"}
+            for id_sessao, tamanho in enumerate(TAMANHOS_LOJA, start=1)
+            for id_membro in range(1, tamanho + 1)
+        ])
+
+    instrucoes = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def contar(*_args):
+        nonlocal instrucoes
+        instrucoes += 1
+
+    aleatorio = random.Random(42)
+    print(f"{'membros':>8} {'estratégia':<10} {'ms/lista':>10} {'instruções':>11}")
+    for id_sessao, tamanho in enumerate(TAMANHOS_LOJA, start=1):
+        for nome, estrategia in (("por_item", por_item), ("case", em_massa)):
+            instrucoes = 0
+            inicio = time.perf_counter()
+            for _ in range(REPETICOES):
+                lista = {id_membro: aleatorio.choice(STATUS) for id_membro in range(1, tamanho + 1)}
+                with engine.begin() as conexao:
+                    estrategia(conexao, id_sessao, lista)
+            duracao = (time.perf_counter() - inicio) / REPETICOES
+            print(f"{tamanho:>8} {nome:<10} {duracao * 1000:>10.2f} {instrucoes // REPETICOES:>11}")
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
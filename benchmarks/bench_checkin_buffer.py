@@ -0,0 +1,81 @@
+# backend_python/benchmarks/bench_checkin_buffer.py
+#
+# Vazão de check-ins (check-ins/s em um worker) na rajada de abertura de sessão:
+#   - direto: um upsert e um commit por check-in, como o /api/checkin sem buffer;
+#   - buffer: cada check-in é anexado (com fsync) a um arquivo JSONL e gravado no banco
+#             em lotes de LOTE registros, com um único upsert de várias linhas.
+# Usa SQLite em arquivo temporário.
+# Uso: python -m benchmarks.bench_checkin_buffer
+
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, create_engine
+from sqlalchemy.dialects.sqlite import insert
+
+MEMBROS = 2000
+LOTE = 500
+
+metadata = MetaData()
+presencas = Table(
+    "presencas_sessao", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_sessao", Integer),
+    Column("id_membro", Integer),
+    Column("status_presenca", String(50)),
+    Column("data_hora_checkin", DateTime),
+    Index("uq_presencas_sessao_sessao_membro", "id_sessao", "id_membro", unique=True),
+)
+
+def _upsert(linhas):
+    comando = insert(presencas).values(linhas)
+    return comando.on_conflict_do_update(
+        index_elements=["id_sessao", "id_membro"],
+        set_={"status_presenca": comando.excluded.status_presenca, "data_hora_checkin": comando.excluded.data_hora_checkin},
+    )
+
+def direto(engine, id_sessao: int, _diretorio: str):
+    for id_membro in range(1, MEMBROS + 1):
+        with engine.begin() as conexao:
+            conexao.execute(_upsert([{
+                "id_sessao": id_sessao, "id_membro": id_membro,
+                "status_presenca": "Presente", "data_hora_checkin": datetime.now(),
+            }]))
+
+def buffer(engine, id_sessao: int, diretorio: str):
+    caminho = os.path.join(diretorio, f"checkins-{id_sessao}.jsonl")
+    pendentes = []
+    with open(caminho, "a", encoding="utf-8") as arquivo:
+        for id_membro in range(1, MEMBROS + 1):
+            registro = {"id_sessao": id_sessao, "id_membro": id_membro, "data_hora_checkin": datetime.now().isoformat()}
+            arquivo.write(json.dumps(registro) + "\n")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+            pendentes.append(registro)
+            if len(pendentes) >= LOTE or id_membro == MEMBROS:
+                with engine.begin() as conexao:
+                    conexao.execute(_upsert([
+                        {**registro, "status_presenca": "Presente", "data_hora_checkin": datetime.fromisoformat(registro["data_hora_checkin"])}
+                        for registro in pendentes
+                    ]))
+                pendentes = []
+    os.remove(caminho)
+
+def main():
+    diretorio = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(diretorio, 'bench_checkin.db')}")
+    metadata.create_all(engine)
+
+    print(f"{'estratégia':<10} {'check-ins':>10} {'segundos':>10} {'check-ins/s':>12}")
+    for id_sessao, (nome, estrategia) in enumerate((("direto", direto), ("buffer", buffer)), start=1):
+        inicio = time.perf_counter()
+        estrategia(engine, id_sessao, diretorio)
+        duracao = time.perf_counter() - inicio
+        print(f"{nome:<10} {MEMBROS:>10} {duracao:>10.2f} {MEMBROS / duracao:>12.0f}")
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
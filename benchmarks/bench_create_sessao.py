@@ -0,0 +1,95 @@
+# backend_python/benchmarks/bench_create_sessao.py
+#
+# Custo de criar uma sessão com a lista de presença inicial, para lojas de tamanhos diferentes:
+#   - orm_por_membro: carrega os membros ativos e adiciona um PresencaSessao por membro (padrão antigo);
+#   - insert_select:  um único INSERT ... SELECT dos membros ativos (padrão atual de create_sessao).
+# Ambos na mesma transação da sessão. Usa SQLite em arquivo temporário com modelos equivalentes.
+# Uso: python -m benchmarks.bench_create_sessao
+
+import os
+import tempfile
+import time
+
+from pydantic import BaseModel
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, create_engine, func, insert, literal, select
+from sqlalchemy.orm import Session, declarative_base
+
+TAMANHOS_LOJA = [10, 300, 5000]
+REPETICOES = 20
+
+Base = declarative_base()
+
+class MembroLoja(Base):
+    __tablename__ = "membros_loja"
+    id = Column(Integer, primary_key=True)
+    id_loja = Column(Integer, index=True)
+    nome_completo = Column(String(255))
+    situacao = Column(String(50))
+
+class SessaoMaconica(Base):
+    __tablename__ = "sessoes_maconicas"
+    id = Column(Integer, primary_key=True)
+    id_loja = Column(Integer, index=True)
+    data_sessao = Column(DateTime, server_default=func.now())
+
+class PresencaSessao(Base):
+    __tablename__ = "presencas_sessao"
+    id = Column(Integer, primary_key=True)
+    id_sessao = Column(Integer, ForeignKey("sessoes_maconicas.id"), index=True)
+    id_membro = Column(Integer, ForeignKey("membros_loja.id"))
+    status_presenca = Column(String(50))
+    criado_em = Column(DateTime, server_default=func.now())
+
+class PresencaSessaoCreate(BaseModel):
+    id_sessao: int
+    id_membro: int
+    status_presenca: str
+
+def orm_por_membro(db: Session, id_loja: int):
+    sessao = SessaoMaconica(id_loja=id_loja)
+    db.add(sessao)
+    db.flush()
+    membros = db.query(MembroLoja).filter(MembroLoja.id_loja == id_loja, MembroLoja.situacao == "Ativo").all()
+    for membro in membros:
+        presenca = PresencaSessaoCreate(id_sessao=sessao.id, id_membro=membro.id, status_presenca="Ausente")
+        db.add(PresencaSessao(**presenca.model_dump()))
+    db.commit()
+
+def insert_select(db: Session, id_loja: int):
+    sessao = SessaoMaconica(id_loja=id_loja)
+    db.add(sessao)
+    db.flush()
+    db.execute(
+        insert(PresencaSessao).from_select(
+            ["id_sessao", "id_membro", "status_presenca"],
+            select(literal(sessao.id), MembroLoja.id, literal("Ausente")).where(
+                MembroLoja.id_loja == id_loja, MembroLoja.situacao == "Ativo"
+            ),
+        )
+    )
+    db.commit()
+
+def main():
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_create_sessao.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conexao:
+        conexao.execute(insert(MembroLoja), [
+            {"id_loja": id_loja, "nome_completo": f"Membro {i}", "situacao": "Ativo"}
+            for id_loja, tamanho in enumerate(TAMANHOS_LOJA, start=1)
+            for i in range(tamanho)
+        ])
+
+    print(f"{'membros':>8} {'estratégia':<16} {'ms/sessão':>10} {'presenças/s':>12}")
+    for id_loja, tamanho in enumerate(TAMANHOS_LOJA, start=1):
+        for nome, estrategia in (("orm_por_membro", orm_por_membro), ("insert_select", insert_select)):
+            inicio = time.perf_counter()
+            for _ in range(REPETICOES):
+                with Session(engine) as db:
+                    estrategia(db, id_loja)
+            duracao = (time.perf_counter() - inicio) / REPETICOES
+            print(f"{tamanho:>8} {nome:<16} {duracao * 1000:>10.2f} {tamanho / duracao:>12,.0f}")
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
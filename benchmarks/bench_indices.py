@@ -0,0 +1,157 @@
+# backend_python/benchmarks/bench_indices.py
+#
+# Plano de execução e latência das consultas quentes das tabelas de loja antes e depois
+# dos índices de `database.migrations.indices_tenant`, sobre dados sintéticos em SQLite.
+# As tabelas são criadas só com a chave primária (como ficam hoje sem a migração).
+# Uso: python -m benchmarks.bench_indices
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, insert, text
+
+from database.migrations.indices_tenant import criar_indices
+
+LOJAS = 200
+MEMBROS_POR_LOJA = 50
+SESSOES_POR_LOJA = 100
+PRESENCAS_POR_SESSAO = 20
+VISITANTES_POR_SESSAO = 2
+REPETICOES = 200
+
+metadata = MetaData()
+membros = Table(
+    "membros_loja", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_loja", Integer),
+    Column("nome_completo", String(255)),
+    Column("email", String(255)),
+    Column("situacao", String(50)),
+)
+sessoes = Table(
+    "sessoes_maconicas", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_loja", Integer),
+    Column("data_sessao", DateTime),
+    Column("status", String(50)),
+)
+presencas = Table(
+    "presencas_sessao", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_sessao", Integer),
+    Column("id_membro", Integer),
+    Column("id_visitante", Integer),
+    Column("status_presenca", String(50)),
+)
+historico = Table(
+    "historico_cargos", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_membro", Integer),
+    Column("id_cargo", Integer),
+)
+condecoracoes = Table(
+    "condecoracoes", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("id_membro", Integer),
+    Column("titulo", String(255)),
+)
+
+# (nome, SQL, gerador de parâmetros)
+CONSULTAS = [
+    ("checkin (sessão, membro)",
+     "SELECT id FROM presencas_sessao WHERE id_sessao = :s AND id_membro = :m",
+     lambda r: {"s": r.randint(1, LOJAS * SESSOES_POR_LOJA), "m": r.randint(1, LOJAS * MEMBROS_POR_LOJA)}),
+    ("presença de visitante",
+     "SELECT id FROM presencas_sessao WHERE id_visitante = :v",
+     lambda r: {"v": r.randint(1, LOJAS * SESSOES_POR_LOJA * VISITANTES_POR_SESSAO)}),
+    ("sessão mais recente",
+     "SELECT id FROM sessoes_maconicas WHERE id_loja = :l ORDER BY data_sessao DESC LIMIT 1",
+     lambda r: {"l": r.randint(1, LOJAS)}),
+    ("membros ativos da loja",
+     "SELECT id FROM membros_loja WHERE id_loja = :l AND situacao = 'Ativo'",
+     lambda r: {"l": r.randint(1, LOJAS)}),
+    ("login por e-mail",
+     "SELECT id FROM membros_loja WHERE email = :e",
+     lambda r: {"e": f"membro{r.randint(1, LOJAS * MEMBROS_POR_LOJA)}@loja.test"}),
+    ("histórico de cargos",
+     "SELECT id FROM historico_cargos WHERE id_membro = :m",
+     lambda r: {"m": r.randint(1, LOJAS * MEMBROS_POR_LOJA)}),
+    ("condecorações",
+     "SELECT id FROM condecoracoes WHERE id_membro = :m",
+     lambda r: {"m": r.randint(1, LOJAS * MEMBROS_POR_LOJA)}),
+]
+
+def _popular(engine):
+    aleatorio = random.Random(42)
+    inicio = datetime(2020, 1, 1)
+    with engine.begin() as conexao:
+        conexao.execute(insert(membros), [
+            {"id": i, "id_loja": (i - 1) // MEMBROS_POR_LOJA + 1, "nome_completo": f"Membro {i}",
+             "email": f"membro{i}@loja.test", "situacao": "Ativo" if aleatorio.random() < 0.8 else "Inativo"}
+            for i in range(1, LOJAS * MEMBROS_POR_LOJA + 1)
+        ])
+        conexao.execute(insert(sessoes), [
+            {"id": i, "id_loja": aleatorio.randint(1, LOJAS), "status": "Realizada",
+             "data_sessao": inicio + timedelta(hours=aleatorio.randint(0, 50_000))}
+            for i in range(1, LOJAS * SESSOES_POR_LOJA + 1)
+        ])
+        linhas, id_visitante = [], 0
+        for id_sessao in range(1, LOJAS * SESSOES_POR_LOJA + 1):
+            for _ in range(PRESENCAS_POR_SESSAO):
+                linhas.append({"id_sessao": id_sessao, "id_membro": aleatorio.randint(1, LOJAS * MEMBROS_POR_LOJA),
+                               "id_visitante": None, "status_presenca": "Presente"})
+            for _ in range(VISITANTES_POR_SESSAO):
+                id_visitante += 1
+                linhas.append({"id_sessao": id_sessao, "id_membro": None,
+                               "id_visitante": id_visitante, "status_presenca": "Presente"})
+        conexao.execute(insert(presencas), linhas)
+        conexao.execute(insert(historico), [
+            {"id_membro": aleatorio.randint(1, LOJAS * MEMBROS_POR_LOJA), "id_cargo": aleatorio.randint(1, 30)}
+            for _ in range(LOJAS * MEMBROS_POR_LOJA * 3)
+        ])
+        conexao.execute(insert(condecoracoes), [
+            {"id_membro": aleatorio.randint(1, LOJAS * MEMBROS_POR_LOJA), "titulo": "Comenda"}
+            for _ in range(LOJAS * MEMBROS_POR_LOJA)
+        ])
+
+def _medir(engine, rotulo: str) -> dict:
+    print(f"\n== {rotulo} ==")
+    resultados = {}
+    with engine.connect() as conexao:
+        for nome, sql, parametros in CONSULTAS:
+            aleatorio = random.Random(7)
+            plano = conexao.execute(text("EXPLAIN QUERY PLAN " + sql), parametros(aleatorio)).all()
+            inicio = time.perf_counter()
+            for _ in range(REPETICOES):
+                conexao.execute(text(sql), parametros(aleatorio)).all()
+            resultados[nome] = (time.perf_counter() - inicio) / REPETICOES * 1000
+            print(f"{nome:<26} {resultados[nome]:>9.3f} ms   plano: {' | '.join(linha[-1] for linha in plano)}")
+    return resultados
+
+def main():
+    caminho = os.path.join(tempfile.mkdtemp(), "bench_indices.db")
+    engine = create_engine(f"sqlite:///{caminho}")
+    metadata.create_all(engine)
+    inicio = time.perf_counter()
+    _popular(engine)
+    print(f"Dados sintéticos: {LOJAS} lojas, {LOJAS * MEMBROS_POR_LOJA} membros, "
+          f"{LOJAS * SESSOES_POR_LOJA} sessões, "
+          f"{LOJAS * SESSOES_POR_LOJA * (PRESENCAS_POR_SESSAO + VISITANTES_POR_SESSAO)} presenças "
+          f"({time.perf_counter() - inicio:.1f} s)")
+
+    antes = _medir(engine, "sem índices")
+    criados = criar_indices(engine)
+    with engine.begin() as conexao:
+        conexao.execute(text("ANALYZE"))
+    depois = _medir(engine, f"com {len(criados)} índices")
+
+    print(f"\n{'consulta':<26} {'antes':>10} {'depois':>10} {'ganho':>8}")
+    for nome in antes:
+        print(f"{nome:<26} {antes[nome]:>8.3f}ms {depois[nome]:>8.3f}ms {antes[nome] / depois[nome]:>7.0f}x")
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# backend_python/benchmarks/bench_rbac.py
+#
+# Micro-benchmark do motor RBAC compilado (decisões por segundo).
+# Uso: python -m benchmarks.bench_rbac
+
+import random
+import time
+
+from services.authorization_service import MotorRBAC
+
+NUM_PERMISSOES = 200
+NUM_CARGOS = 60
+PERMISSOES_POR_CARGO = 40
+DECISOES = 1_000_000
+
+def main():
+    random.seed(42)
+    permissoes = {f"recurso_{i}:acao": i for i in range(NUM_PERMISSOES)}
+    associacoes = [
+        (id_cargo, indice_bit)
+        for id_cargo in range(1, NUM_CARGOS + 1)
+        for indice_bit in random.sample(range(NUM_PERMISSOES), PERMISSOES_POR_CARGO)
+    ]
+
+    motor = MotorRBAC()
+    inicio = time.perf_counter()
+    motor.compilar(permissoes, associacoes)
+    print(f"Compilação: {len(associacoes)} associações em {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+    acoes = list(permissoes)
+    consultas = [
+        (random.randint(1, NUM_CARGOS), motor.mascara(random.sample(acoes, 2)))
+        for _ in range(1000)
+    ]
+
+    permitidas = 0
+    inicio = time.perf_counter()
+    for i in range(DECISOES):
+        id_cargo, mascara = consultas[i % 1000]
+        permitidas += motor.permite(id_cargo, mascara)
+    duracao = time.perf_counter() - inicio
+
+    print(f"{DECISOES} decisões em {duracao:.3f} s -> {DECISOES / duracao:,.0f} decisões/s ({permitidas} permitidas)")
+
+if __name__ == "__main__":
+    main()
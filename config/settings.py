@@ -1,11 +1,19 @@
 # backend_python/config/settings.py
 
 import os
+from ipaddress import IPv4Network, IPv6Network, ip_network
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from typing import Literal, Union, List
+from typing import Dict, Literal, Optional, Union, List
 from urllib.parse import quote_plus  # <-- IMPORTAÇÃO ADICIONADA
 
+# Presets do pool de conexões por ambiente (NODE_ENV)
+PRESETS_POOL = {
+    "development": {"pool_size": 5, "max_overflow": 5, "pool_recycle": 1800, "pool_pre_ping": True, "pool_timeout": 30},
+    "staging": {"pool_size": 10, "max_overflow": 10, "pool_recycle": 1800, "pool_pre_ping": True, "pool_timeout": 15},
+    "production": {"pool_size": 20, "max_overflow": 20, "pool_recycle": 1800, "pool_pre_ping": True, "pool_timeout": 10},
+}
+
 class Configuracoes(BaseSettings):
     """
     Define e valida as variáveis de ambiente para a aplicação usando Pydantic.
@@ -40,6 +48,118 @@ class Configuracoes(BaseSettings):
         description="Dialeto do SQLAlchemy a ser usado (mysql ou postgresql)."
     )
 
+    URL_BANCO_DE_DADOS_ASYNC_PERSONALIZADA: Optional[str] = Field(
+        default=None,
+        alias="DB_ASYNC_URL",
+        description="URL do engine assíncrono (ex: 'sqlite+aiosqlite:///./sigma.db'); se ausente, é derivada do banco principal."
+    )
+
+    # --- Pool de Conexões (valores ausentes usam o preset do NODE_ENV) ---
+    TAMANHO_POOL: Optional[int] = Field(default=None, alias="DB_POOL_SIZE", description="Conexões mantidas abertas no pool.")
+    OVERFLOW_MAXIMO_POOL: Optional[int] = Field(
+        default=None,
+        alias="DB_MAX_OVERFLOW",
+        description="Conexões extras permitidas além do tamanho do pool em picos de carga."
+    )
+    RECICLAGEM_POOL: Optional[int] = Field(
+        default=None,
+        alias="DB_POOL_RECYCLE_SECONDS",
+        description="Idade máxima (em segundos) de uma conexão; deve ser menor que o wait_timeout do MySQL."
+    )
+    PRE_PING_POOL: Optional[bool] = Field(
+        default=None,
+        alias="DB_POOL_PRE_PING",
+        description="Testa a conexão ao retirá-la do pool, descartando conexões encerradas pelo servidor."
+    )
+    TIMEOUT_POOL: Optional[int] = Field(
+        default=None,
+        alias="DB_POOL_TIMEOUT_SECONDS",
+        description="Tempo máximo (em segundos) de espera por uma conexão livre no pool."
+    )
+
+    # --- Presenças ---
+    MODO_PRESENCA: Literal["completo", "esparso"] = Field(
+        default="completo",
+        alias="ATTENDANCE_MODE",
+        description="'completo' grava uma presença 'Ausente' por membro ao criar a sessão; 'esparso' grava só o rol e os eventos registrados."
+    )
+    CHECKIN_EM_BUFFER: bool = Field(
+        default=False,
+        alias="CHECKIN_BUFFER_ENABLED",
+        description="Confirma o check-in (202) após gravá-lo em disco e o grava no banco em lotes (escrita adiada)."
+    )
+    DESCARGA_CHECKINS_MS: int = Field(
+        default=200,
+        alias="CHECKIN_BUFFER_FLUSH_MS",
+        description="Intervalo máximo (em ms) entre as gravações em lote dos check-ins em buffer."
+    )
+    LOTE_MAXIMO_CHECKINS: int = Field(
+        default=500,
+        alias="CHECKIN_BUFFER_MAX_BATCH",
+        description="Quantidade de check-ins em buffer que dispara a gravação imediata do lote."
+    )
+    DIRETORIO_BUFFER_CHECKINS: str = Field(
+        default="data/checkin_buffer",
+        alias="CHECKIN_BUFFER_DIR",
+        description="Diretório local dos arquivos de check-ins ainda não gravados no banco (um por processo)."
+    )
+
+    # --- Repetição de Transações em Conflito ---
+    MAX_TENTATIVAS_REPETICAO: int = Field(
+        default=4,
+        alias="DB_RETRY_MAX_ATTEMPTS",
+        description="Tentativas totais de uma escrita idempotente que falhou por deadlock ou timeout de bloqueio."
+    )
+    ESPERA_BASE_REPETICAO_MS: int = Field(
+        default=20,
+        alias="DB_RETRY_BASE_DELAY_MS",
+        description="Espera base (em ms) do backoff exponencial entre tentativas; o valor efetivo é sorteado (jitter)."
+    )
+    ESPERA_MAXIMA_REPETICAO_MS: int = Field(
+        default=500,
+        alias="DB_RETRY_MAX_DELAY_MS",
+        description="Teto (em ms) da espera entre duas tentativas."
+    )
+
+    # --- Réplicas de Leitura ---
+    URLS_REPLICAS_LEITURA: str = Field(
+        default="",
+        alias="DB_REPLICA_URLS",
+        description="URLs SQLAlchemy das réplicas de leitura, separadas por vírgula (vazio desativa o roteamento)."
+    )
+    JANELA_LEITURA_APOS_ESCRITA: int = Field(
+        default=5,
+        alias="DB_READ_YOUR_WRITES_SECONDS",
+        description="Tempo (em segundos) em que um cliente que escreveu continua lendo do primário."
+    )
+
+    # --- Sharding de Tenants ---
+    SHARDS_BANCO_DE_DADOS: Dict[str, str] = Field(
+        default_factory=dict,
+        alias="DB_SHARDS",
+        description="Shards de dados das lojas em JSON ({\"nome\": \"url\"}); o banco principal atua como diretório."
+    )
+    SHARD_PADRAO: Optional[str] = Field(
+        default=None,
+        alias="DB_DEFAULT_SHARD",
+        description="Shard em que novas lojas são alocadas; se ausente, ficam no banco diretório."
+    )
+    TTL_CACHE_SHARDS: int = Field(
+        default=5,
+        alias="SHARD_MAP_CACHE_TTL_SECONDS",
+        description="Tempo (em segundos) que a loja -> shard fica em cache; limita a espera ao congelar uma loja."
+    )
+    PASSO_IDS_SHARDS: int = Field(
+        default=1,
+        alias="DB_SHARD_ID_STRIDE",
+        description="Incremento do auto_increment em cada banco (MySQL); acima de 1, os ids são intercalados entre os bancos."
+    )
+    DESLOCAMENTOS_IDS_SHARDS: Dict[str, int] = Field(
+        default_factory=dict,
+        alias="DB_SHARD_ID_OFFSETS",
+        description="Deslocamento do auto_increment de cada banco em JSON ({\"diretorio\": 1, \"nome\": 2}), distinto e entre 1 e o passo."
+    )
+
     # --- JWT (JSON Web Token) ---
     SEGREDO_JWT: str = Field(
         alias="JWT_SECRET", 
@@ -51,6 +171,120 @@ class Configuracoes(BaseSettings):
         alias="JWT_EXPIRES_IN",
         description="Duração da validade de um token JWT (ex: '24h', '60m')."
     )
+    EMBUTIR_PERMISSOES_JWT: bool = Field(
+        default=False,
+        alias="JWT_EMBED_PERMISSIONS",
+        description="Embute no token dos membros o conjunto de permissões e a versão do cargo."
+    )
+
+    # --- Revogação de Tokens ---
+    INTERVALO_SINCRONIZACAO_REVOGACOES: int = Field(
+        default=5,
+        alias="JWT_REVOCATION_SYNC_SECONDS",
+        description="Intervalo (em segundos) para buscar novas revogações de tokens no banco."
+    )
+    INTERVALO_RECONSTRUCAO_REVOGACOES: int = Field(
+        default=3600,
+        alias="JWT_REVOCATION_REBUILD_SECONDS",
+        description="Intervalo (em segundos) para descartar revogações expiradas e reconstruir o filtro."
+    )
+    CAPACIDADE_FILTRO_REVOGACOES: int = Field(
+        default=100000,
+        alias="JWT_REVOCATION_BLOOM_CAPACITY",
+        description="Número de revogações ativas previsto para o dimensionamento do filtro de Bloom."
+    )
+
+    # --- Cache de Autenticação ---
+    TTL_CACHE_AUTENTICACAO: int = Field(
+        default=60,
+        alias="AUTH_CACHE_TTL_SECONDS",
+        description="Tempo (em segundos) que tokens decodificados e usuários autenticados ficam em cache."
+    )
+    TAMANHO_CACHE_AUTENTICACAO: int = Field(
+        default=10000,
+        alias="AUTH_CACHE_MAX_SIZE",
+        description="Número máximo de entradas em cada cache de autenticação."
+    )
+
+    # --- RBAC ---
+    INTERVALO_RECARGA_RBAC: int = Field(
+        default=30,
+        alias="RBAC_RELOAD_INTERVAL_SECONDS",
+        description="Intervalo (em segundos) para recarregar a tabela RBAC e as versões dos cargos."
+    )
+
+    # --- Cache de Tenants (Lojas) ---
+    TTL_CACHE_TENANTS: int = Field(
+        default=300,
+        alias="TENANT_CACHE_TTL_SECONDS",
+        description="Tempo (em segundos) que uma loja resolvida fica em cache."
+    )
+    TTL_CACHE_TENANTS_NEGATIVO: int = Field(
+        default=30,
+        alias="TENANT_NEGATIVE_CACHE_TTL_SECONDS",
+        description="Tempo (em segundos) que um código/domínio inexistente fica em cache."
+    )
+    TAMANHO_CACHE_TENANTS: int = Field(
+        default=5000,
+        alias="TENANT_CACHE_MAX_SIZE",
+        description="Número máximo de lojas mantidas no cache de tenants."
+    )
+    DOMINIO_BASE_LOJAS: str = Field(
+        default="",
+        alias="TENANT_BASE_DOMAIN",
+        description="Domínio base cujos subdomínios identificam a loja pelo código (ex: 'lojas.exemplo.org' para 'loja01.lojas.exemplo.org'); vazio desativa."
+    )
+
+    # --- Hash de Senhas (bcrypt) ---
+    PROCESSOS_HASH_SENHA: int = Field(
+        default=2,
+        alias="PASSWORD_HASH_WORKERS",
+        description="Número de processos dedicados ao cálculo e verificação de hashes bcrypt."
+    )
+    MAX_HASH_SENHA_EM_ANDAMENTO: int = Field(
+        default=8,
+        alias="PASSWORD_HASH_MAX_IN_FLIGHT",
+        description="Máximo de operações bcrypt simultâneas, por event loop e para os chamadores síncronos; as excedentes aguardam na fila."
+    )
+    CUSTO_BCRYPT: Optional[int] = Field(
+        default=None,
+        alias="BCRYPT_COST",
+        description="Fator de custo fixo do bcrypt. Se ausente, é calibrado na inicialização."
+    )
+    TEMPO_ALVO_BCRYPT_MS: int = Field(
+        default=250,
+        alias="BCRYPT_TARGET_MS",
+        description="Tempo alvo (em ms) de uma verificação bcrypt usado na calibração do custo."
+    )
+    CUSTO_MINIMO_BCRYPT: int = Field(default=10, alias="BCRYPT_MIN_COST", description="Menor custo aceito pela calibração.")
+    CUSTO_MAXIMO_BCRYPT: int = Field(default=15, alias="BCRYPT_MAX_COST", description="Maior custo aceito pela calibração.")
+
+    # --- Controle de Admissão de Login ---
+    LOGIN_TENTATIVAS_POR_MINUTO_IP: float = Field(
+        default=30,
+        alias="LOGIN_IP_RATE_PER_MINUTE",
+        description="Tentativas de login por minuto permitidas para um mesmo IP (reabastecimento do bucket)."
+    )
+    LOGIN_RAJADA_IP: int = Field(
+        default=20,
+        alias="LOGIN_IP_BURST",
+        description="Tentativas de login consecutivas permitidas para um mesmo IP (capacidade do bucket)."
+    )
+    LOGIN_TENTATIVAS_POR_MINUTO_EMAIL: float = Field(
+        default=5,
+        alias="LOGIN_EMAIL_RATE_PER_MINUTE",
+        description="Tentativas de login por minuto permitidas para um mesmo e-mail a partir de um mesmo IP."
+    )
+    LOGIN_RAJADA_EMAIL: int = Field(
+        default=5,
+        alias="LOGIN_EMAIL_BURST",
+        description="Tentativas de login consecutivas permitidas para um mesmo e-mail a partir de um mesmo IP."
+    )
+    PROXIES_CONFIAVEIS: str = Field(
+        default="",
+        alias="TRUSTED_PROXIES",
+        description="IPs ou redes (CIDR) dos proxies reversos, separados por vírgula, cujo X-Forwarded-For é aceito (vazio usa o IP da conexão)."
+    )
 
     # --- Credenciais do Super Admin (para o script seed_db.py) ---
     ROOT_EMAIL: str = Field(alias="ROOT_EMAIL", description="E-mail para o usuário root/superadmin.")
@@ -72,6 +306,28 @@ class Configuracoes(BaseSettings):
         alias="LOG_MAX_FILES",
         description="Número máximo de arquivos de log a serem mantidos."
     )
+    REGISTRAR_INSTRUCOES_SQL: bool = Field(
+        default=False,
+        alias="LOG_SQL_STATEMENTS",
+        description="Registra no log, ao fim de cada requisição, as instruções SQL normalizadas com contagem e tempo."
+    )
+
+    # --- Consultas Lentas ---
+    LIMIAR_CONSULTA_LENTA_MS: int = Field(
+        default=200,
+        alias="SLOW_QUERY_THRESHOLD_MS",
+        description="Duração (em ms) a partir da qual uma instrução SQL é registrada no log de consultas lentas."
+    )
+    INTERVALO_EXPLAIN_CONSULTA_LENTA: int = Field(
+        default=300,
+        alias="SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS",
+        description="Intervalo mínimo (em segundos) entre dois EXPLAIN automáticos da mesma consulta normalizada."
+    )
+    MAX_ASSINATURAS_CONSULTAS: int = Field(
+        default=1000,
+        alias="SLOW_QUERY_MAX_FINGERPRINTS",
+        description="Número máximo de consultas normalizadas distintas com estatísticas de latência em memória."
+    )
 
     # --- CORS (Cross-Origin Resource Sharing) ---
     ORIGEM_CORS: Union[str, List[str]] = Field(
@@ -97,6 +353,42 @@ class Configuracoes(BaseSettings):
                 f"@{self.HOST_BANCO_DE_DADOS}:{self.PORTA_BANCO_DE_DADOS}"
                 f"/{self.NOME_BANCO_DE_DADOS}")
 
+    @property
+    def URL_BANCO_DE_DADOS_ASYNC(self) -> str:
+        """URL do banco principal com o driver assíncrono do dialeto (aiomysql ou asyncpg)."""
+        if self.URL_BANCO_DE_DADOS_ASYNC_PERSONALIZADA:
+            return self.URL_BANCO_DE_DADOS_ASYNC_PERSONALIZADA
+        driver = {"mysql": "aiomysql", "postgresql": "asyncpg"}[self.DIALETO_BANCO_DE_DADOS]
+        senha_encoded = quote_plus(self.SENHA_BANCO_DE_DADOS)
+        return (f"{self.DIALETO_BANCO_DE_DADOS}+{driver}://"
+                f"{self.USUARIO_BANCO_DE_DADOS}:{senha_encoded}"
+                f"@{self.HOST_BANCO_DE_DADOS}:{self.PORTA_BANCO_DE_DADOS}"
+                f"/{self.NOME_BANCO_DE_DADOS}")
+
+    @property
+    def LISTA_URLS_REPLICAS(self) -> List[str]:
+        """URLs das réplicas de leitura configuradas."""
+        return [url.strip() for url in self.URLS_REPLICAS_LEITURA.split(",") if url.strip()]
+
+    @property
+    def LISTA_PROXIES_CONFIAVEIS(self) -> List[Union[IPv4Network, IPv6Network]]:
+        """Redes dos proxies reversos confiáveis."""
+        return [ip_network(proxy.strip(), strict=False) for proxy in self.PROXIES_CONFIAVEIS.split(",") if proxy.strip()]
+
+    @property
+    def PARAMETROS_POOL(self) -> dict:
+        """Parâmetros do pool de conexões: preset do ambiente sobrescrito pelas variáveis definidas."""
+        parametros = dict(PRESETS_POOL[self.NODE_ENV])
+        sobrescritas = {
+            "pool_size": self.TAMANHO_POOL,
+            "max_overflow": self.OVERFLOW_MAXIMO_POOL,
+            "pool_recycle": self.RECICLAGEM_POOL,
+            "pool_pre_ping": self.PRE_PING_POOL,
+            "pool_timeout": self.TIMEOUT_POOL,
+        }
+        parametros.update({chave: valor for chave, valor in sobrescritas.items() if valor is not None})
+        return parametros
+
     # Configuração para carregar do arquivo .env
     _env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
     model_config = SettingsConfigDict(env_file=_env_path, env_file_encoding='utf-8', extra='ignore')
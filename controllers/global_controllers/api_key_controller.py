@@ -0,0 +1,25 @@
+# backend_python/controllers/global_controllers/api_key_controller.py
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from database.connection import get_db
+from schemas.api_key_schema import ApiKeyCreate, ApiKeyResponse, ApiKeyCreatedResponse
+from services import api_key_service
+from controllers.global_controllers.super_admin_controller import get_current_super_admin
+
+router = APIRouter()
+
+@router.post("/", response_model=ApiKeyCreatedResponse, status_code=status.HTTP_201_CREATED, summary="Cria uma chave de API para integrações")
+def create_api_key(dados: ApiKeyCreate, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_super_admin)):
+    """Cria uma chave de API vinculada a uma loja. A chave é exibida apenas nesta resposta."""
+    return api_key_service.criar_chave_api(db=db, dados=dados)
+
+@router.get("/", response_model=List[ApiKeyResponse], summary="Lista as chaves de API")
+def list_api_keys(id_loja: Optional[int] = None, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_super_admin)):
+    return api_key_service.listar_chaves_api(db=db, id_loja=id_loja)
+
+@router.delete("/{chave_id}", status_code=status.HTTP_200_OK, summary="Revoga uma chave de API")
+def revoke_api_key(chave_id: int, db: Session = Depends(get_db), current_admin: dict = Depends(get_current_super_admin)):
+    return api_key_service.revogar_chave_api(db=db, chave_id=chave_id)
@@ -1,69 +1,61 @@
 # backend_python/controllers/global/checkin_controller.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from database import connection
+from database.connection import get_db
+from database.retry import repetir_em_conflito
+from database.upsert import upsert
 from services import sessao_maconica_service
+from services.checkin_buffer_service import buffer_checkins
 from schemas import presenca_sessao_schema
 from middleware.attendance_middleware import check_attendance_window
-from models import models # Import models
+from models import models
 from datetime import datetime
-from middleware import authorize_middleware # Importar o middleware de autorização
+from middleware import authorize_middleware
 
 router = APIRouter()
 
-def get_db():
-    db = connection.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/checkin", response_model=presenca_sessao_schema.PresencaSessao, dependencies=[Depends(check_attendance_window)])
-async def checkin(
+@repetir_em_conflito()
+def checkin(
     loja_id: int, 
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: dict = Depends(authorize_middleware.get_current_user) # Usar o get_current_user do middleware
+    current_user: dict = Depends(authorize_middleware.get_current_user)
 ):
-    # This is a simplified implementation. More robust logic is needed.
-    # It should check if the user is a member or a visitor.
-    # It should also check if there is an active session for the lodge.
+    # O membro só registra presença na loja do próprio token (a sessão do banco já aponta para o shard dessa loja)
+    if loja_id != current_user["claims"].get("lodgeId"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="O check-in só é permitido na loja do token.")
 
-    # For now, let's assume the current_user is a member and we are creating a presence for them.
-    # We need to find the active session for the given loja_id.
-    # This part needs to be implemented based on how active sessions are determined.
-    # For simplicity, let's assume we get the latest session for the lodge.
-    sessao = db.query(models.SessaoMaconica).filter(models.SessaoMaconica.id_loja == loja_id).order_by(models.SessaoMaconica.data_sessao.desc()).first()
+    sessao = sessao_maconica_service.sessao_atual(db, loja_id)
 
     if not sessao:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No active session found for this lodge.")
+    id_sessao, _ = sessao
 
-    # Assuming current_user contains id_membro
-    id_membro = current_user.get("user").id # Adjust based on actual user object structure
-
-    # Check if attendance already exists for this member in this session
-    existing_presenca = db.query(models.PresencaSessao).filter(
-        models.PresencaSessao.id_sessao == sessao.id,
-        models.PresencaSessao.id_membro == id_membro
-    ).first()
+    id_membro = current_user.get("user").id
 
-    if existing_presenca:
-        # Update existing attendance to 'Presente'
-        existing_presenca.status_presenca = "Presente"
-        existing_presenca.data_hora_checkin = datetime.now()
-        db.commit()
-        db.refresh(existing_presenca)
-        return existing_presenca
-    else:
-        # Create new attendance record
-        presenca_data = presenca_sessao_schema.PresencaSessaoCreate(
-            id_sessao=sessao.id,
-            id_membro=id_membro,
-            status_presenca="Presente",
-            data_hora_checkin=datetime.now()
+    if buffer_checkins.ativo:
+        # Modo write-behind: o check-in fica durável no disco local e chega ao banco no próximo lote
+        data_hora_checkin = datetime.now()
+        buffer_checkins.registrar(loja_id, id_sessao, id_membro, data_hora_checkin)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return presenca_sessao_schema.PresencaSessao(
+            id_sessao=id_sessao, id_membro=id_membro, status_presenca="Presente", data_hora_checkin=data_hora_checkin
         )
-        db_presenca = models.PresencaSessao(**presenca_data.dict())
-        db.add(db_presenca)
-        db.commit()
-        db.refresh(db_presenca)
-        return db_presenca
\ No newline at end of file
+
+    # Insere ou atualiza a presença do membro num único comando (chave única em id_sessao + id_membro):
+    # toques simultâneos não criam duplicatas e a operação pode ser repetida com segurança
+    presenca_data = presenca_sessao_schema.PresencaSessaoCreate(
+        id_sessao=id_sessao,
+        id_membro=id_membro,
+        status_presenca="Presente",
+        data_hora_checkin=datetime.now()
+    )
+    id_presenca = upsert(
+        db, models.PresencaSessao, presenca_data.model_dump(),
+        chaves=["id_sessao", "id_membro"],
+        atualizar={"status_presenca": presenca_data.status_presenca, "data_hora_checkin": presenca_data.data_hora_checkin},
+    )
+    db.commit()
+    return presenca_sessao_schema.PresencaSessao(id=id_presenca, **presenca_data.model_dump())
\ No newline at end of file
@@ -2,25 +2,18 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import connection
+from database.connection import get_db, get_db_leitura
 from services import loja_externa_service
 from schemas import loja_externa_schema
 
 router = APIRouter()
 
-def get_db():
-    db = connection.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/lojas-externas/", response_model=loja_externa_schema.LojaExterna)
 def create_loja_externa(loja_externa: loja_externa_schema.LojaExternaCreate, db: Session = Depends(get_db)):
     return loja_externa_service.create_loja_externa(db=db, loja_externa=loja_externa)
 
 @router.get("/lojas-externas/", response_model=list[loja_externa_schema.LojaExterna])
-def read_lojas_externas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_lojas_externas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db_leitura)):
     lojas_externas = loja_externa_service.get_lojas_externas(db, skip=skip, limit=limit)
     return lojas_externas
 
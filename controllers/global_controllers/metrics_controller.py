@@ -0,0 +1,77 @@
+# backend_python/controllers/global_controllers/metrics_controller.py
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from config.settings import config
+from database.connection import engine, engines_replicas, obter_metricas_replicas
+from database.pool_monitor import obter_metricas_pool
+from database.sharding import engines_shards
+from database import retry, slow_query_monitor
+from middleware.authorize_middleware import obter_metricas_cache_autenticacao
+from controllers.global_controllers.super_admin_controller import get_current_super_admin
+from services import password_service, tenant_registry_service, api_key_service, login_admission_service, token_revocation_service, shard_service, checkin_buffer_service
+
+router = APIRouter()
+
+@router.get("/auth-cache", response_model=dict, summary="Métricas dos caches de autenticação")
+def get_auth_cache_metrics(current_admin: dict = Depends(get_current_super_admin)):
+    """Retorna acertos, falhas e invalidações dos caches de tokens e usuários."""
+    metricas = obter_metricas_cache_autenticacao()
+    metricas["chaves_api"] = api_key_service.obter_metricas()
+    return metricas
+
+@router.get("/password-hashing", response_model=dict, summary="Métricas do pool de hash de senhas")
+def get_password_hashing_metrics(current_admin: dict = Depends(get_current_super_admin)):
+    """Retorna profundidade da fila, operações em andamento e latência do bcrypt."""
+    return password_service.obter_metricas()
+
+@router.get("/tenant-cache", response_model=dict, summary="Métricas do cache de tenants")
+def get_tenant_cache_metrics(current_admin: dict = Depends(get_current_super_admin)):
+    """Retorna acertos, falhas e invalidações do cache de lojas (incluindo o cache negativo)."""
+    return tenant_registry_service.obter_metricas()
+
+@router.get("/login-admission", response_model=dict, summary="Métricas do controle de admissão de login")
+def get_login_admission_metrics(current_admin: dict = Depends(get_current_super_admin)):
+    """Retorna tentativas admitidas, recusadas (por IP e por e-mail) e a CPU de bcrypt poupada."""
+    return login_admission_service.obter_metricas()
+
+@router.get("/token-revocation", response_model=dict, summary="Métricas da revogação de tokens")
+def get_token_revocation_metrics(current_admin: dict = Depends(get_current_super_admin)):
+    """Retorna as verificações de revogação, quantas o filtro de Bloom resolveu sozinho e os falsos positivos."""
+    return token_revocation_service.obter_metricas()
+
+@router.get("/db-pool", response_model=dict, summary="Métricas do pool de conexões com o banco")
+def get_db_pool_metrics(current_admin: dict = Depends(get_current_super_admin)):
+    """Retorna conexões em uso e em overflow, timeouts e o tempo de espera por uma conexão livre."""
+    metricas = obter_metricas_pool(engine)
+    metricas["parametros"] = config.PARAMETROS_POOL
+    metricas["leitura"] = obter_metricas_replicas()
+    metricas["leitura"]["pools_replicas"] = [obter_metricas_pool(replica) for replica in engines_replicas]
+    metricas["shards"] = {nome: obter_metricas_pool(engine_shard) for nome, engine_shard in engines_shards.items()}
+    return metricas
+
+@router.get("/shards", response_model=dict, summary="Configuração e cache do mapa de shards")
+def get_shard_metrics(current_admin: dict = Depends(get_current_super_admin)):
+    """Retorna os shards configurados, o shard padrão de novas lojas e os contadores do cache do mapa."""
+    return shard_service.obter_metricas()
+
+@router.get("/slow-queries", response_model=dict, summary="Latência por consulta SQL normalizada")
+def get_slow_query_metrics(
+    limite: int = Query(50, ge=1, le=500),
+    ordenar_por: Literal["tempo_total", "p99", "execucoes", "lentas"] = "tempo_total",
+    current_admin: dict = Depends(get_current_super_admin),
+):
+    """Retorna, por consulta normalizada, execuções, p50, p99, máximo, ocorrências lentas e o último plano capturado."""
+    return slow_query_monitor.obter_metricas(limite, ordenar_por)
+
+@router.get("/db-retries", response_model=dict, summary="Repetições de transações em conflito")
+def get_db_retry_metrics(current_admin: dict = Depends(get_current_super_admin)):
+    """Retorna, por operação, deadlocks e timeouts de bloqueio repetidos com sucesso e as tentativas esgotadas."""
+    return retry.obter_metricas()
+
+@router.get("/checkin-buffer", response_model=dict, summary="Métricas do buffer de check-ins")
+def get_checkin_buffer_metrics(current_admin: dict = Depends(get_current_super_admin)):
+    """Retorna, para este processo, check-ins aceitos e gravados, lotes, falhas, pendentes e check-ins por segundo."""
+    return checkin_buffer_service.obter_metricas()
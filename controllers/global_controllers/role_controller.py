@@ -27,7 +27,7 @@ async def get_current_super_admin(current_user_data: dict = Depends(get_current_
     status_code=status.HTTP_201_CREATED, 
     summary="Cria um novo cargo"
 )
-async def criar_cargo(
+def criar_cargo(
     cargo: RoleCreate, 
     db: Session = Depends(get_db),
     current_admin: SuperAdministrador = Depends(get_current_super_admin)
@@ -40,7 +40,7 @@ async def criar_cargo(
     response_model=List[RoleResponse], 
     summary="Lista todos os cargos"
 )
-async def listar_cargos(
+def listar_cargos(
     db: Session = Depends(get_db),
     current_admin: SuperAdministrador = Depends(get_current_super_admin)
 ):
@@ -52,7 +52,7 @@ async def listar_cargos(
     response_model=RoleResponse, 
     summary="Obtém um cargo pelo ID"
 )
-async def obter_cargo_por_id(
+def obter_cargo_por_id(
     cargo_id: int, 
     db: Session = Depends(get_db),
     current_admin: SuperAdministrador = Depends(get_current_super_admin)
@@ -68,7 +68,7 @@ async def obter_cargo_por_id(
     response_model=RoleResponse, 
     summary="Atualiza um cargo"
 )
-async def atualizar_cargo(
+def atualizar_cargo(
     cargo_id: int, 
     cargo_atualizacao: RoleUpdate, 
     db: Session = Depends(get_db),
@@ -82,7 +82,7 @@ async def atualizar_cargo(
     status_code=status.HTTP_204_NO_CONTENT, 
     summary="Deleta um cargo"
 )
-async def deletar_cargo(
+def deletar_cargo(
     cargo_id: int, 
     db: Session = Depends(get_db),
     current_admin: SuperAdministrador = Depends(get_current_super_admin)
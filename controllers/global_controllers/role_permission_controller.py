@@ -8,7 +8,7 @@ from database.connection import get_db
 from schemas.role_permission_schema import RolePermissionCreate
 from schemas.permission_schema import PermissionResponse
 from schemas.role_schema import RoleResponse
-from services import role_permission_service
+from services import role_permission_service, role_hierarchy_service
 
 router = APIRouter()
 
@@ -58,4 +58,42 @@ async def obter_cargos_por_permissao(
     db: Session = Depends(get_db)
 ):
     """Retorna todos os cargos que possuem uma permissão específica."""
-    return role_permission_service.obter_cargos_por_permissao(db=db, permission_id=permission_id)
\ No newline at end of file
+    return role_permission_service.obter_cargos_por_permissao(db=db, permission_id=permission_id)
+
+@router.post(
+    "/roles/{role_id}/inherits/{inherited_role_id}", 
+    status_code=status.HTTP_201_CREATED, 
+    summary="Faz um cargo herdar as permissões de outro"
+)
+async def adicionar_heranca_cargo(
+    role_id: int, 
+    inherited_role_id: int, 
+    db: Session = Depends(get_db)
+):
+    """Adiciona uma herança entre cargos (rejeita ciclos)."""
+    return role_hierarchy_service.adicionar_heranca(db=db, role_id=role_id, inherited_role_id=inherited_role_id)
+
+@router.delete(
+    "/roles/{role_id}/inherits/{inherited_role_id}", 
+    status_code=status.HTTP_200_OK, 
+    summary="Remove a herança entre dois cargos"
+)
+async def remover_heranca_cargo(
+    role_id: int, 
+    inherited_role_id: int, 
+    db: Session = Depends(get_db)
+):
+    """Remove uma herança entre cargos."""
+    return role_hierarchy_service.remover_heranca(db=db, role_id=role_id, inherited_role_id=inherited_role_id)
+
+@router.get(
+    "/roles/{role_id}/inherits", 
+    response_model=List[RoleResponse], 
+    summary="Obtém os cargos herdados diretamente por um cargo"
+)
+async def obter_cargos_herdados(
+    role_id: int, 
+    db: Session = Depends(get_db)
+):
+    """Retorna os cargos dos quais o cargo herda permissões."""
+    return role_hierarchy_service.obter_cargos_herdados(db=db, role_id=role_id)
\ No newline at end of file
@@ -1,8 +1,7 @@
 # backend_python/controllers/global/super_admin_controller.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-import bcrypt
 from datetime import timedelta
 from typing import List
 
@@ -11,7 +10,10 @@ from models.models import SuperAdministrador
 from schemas.super_admin_schema import SuperAdminCreate, SuperAdminLogin, SuperAdminUpdate, SuperAdminResponse
 from config.settings import config
 from utils.auth_utils import criar_token_acesso
-from middleware.authorize_middleware import get_current_user
+from utils.ip_utils import ip_do_cliente
+from middleware.authorize_middleware import get_current_user, invalidar_usuario_em_cache
+from services import password_service, login_admission_service
+from services.token_revocation_service import revogar_token
 
 router = APIRouter()
 
@@ -31,17 +33,20 @@ async def get_current_super_admin(current_user_data: dict = Depends(get_current_
 )
 async def login_super_admin(
     dados_login: SuperAdminLogin, 
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Autentica um super administrador e retorna um token de acesso JWT.""" 
+    login_admission_service.admitir_login(ip_do_cliente(request), dados_login.email)
     super_admin = db.query(SuperAdministrador).filter(SuperAdministrador.email == dados_login.email).first()
 
-    if not super_admin or not bcrypt.checkpw(dados_login.password.encode('utf-8'), super_admin.senha_hash.encode('utf-8')):
+    if not super_admin or not await password_service.verificar_senha(dados_login.password, super_admin.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha inválidos.",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    password_service.agendar_rehash_se_necessario(SuperAdministrador, super_admin.id, dados_login.password, super_admin.senha_hash)
 
     # CORRIGIDO: Usa a variável de configuração correta (EXPIRACAO_JWT)
     exp_hours = int(config.EXPIRACAO_JWT.replace('h', ''))
@@ -57,6 +62,20 @@ async def login_super_admin(
     )
     return {"token_de_acesso": token_acesso, "tipo_token": "bearer"}
 
+@router.post(
+    "/logout",
+    status_code=status.HTTP_200_OK,
+    summary="Encerra a sessão do super administrador revogando o token atual"
+)
+def logout_super_admin(
+    db: Session = Depends(get_db),
+    current_user_data: dict = Depends(get_current_user)
+):
+    """Revoga o token de acesso atual antes da sua expiração."""
+    if current_user_data.get("perfil") != "super_admin" or not revogar_token(db, current_user_data["claims"]):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Este token não pode ser revogado.")
+    return {"message": "Logout realizado com sucesso."}
+
 @router.post(
     "/",
     response_model=SuperAdminResponse,
@@ -75,17 +94,16 @@ async def criar_super_admin(
             detail="Um super administrador com este email já existe."
         )
 
-    senha_hash = bcrypt.hashpw(dados_registro.password.encode('utf-8'), bcrypt.gensalt())
+    senha_hash = await password_service.hash_senha(dados_registro.password)
 
     novo_super_admin = SuperAdministrador(
         nome_usuario=dados_registro.nome_usuario,
         email=dados_registro.email,
-        senha_hash=senha_hash.decode('utf-8')
+        senha_hash=senha_hash
     )
 
     db.add(novo_super_admin)
     db.commit()
-    db.refresh(novo_super_admin)
 
     return novo_super_admin
 
@@ -108,18 +126,17 @@ async def registrar_super_admin_inicial(
             detail="Um super administrador já existe. Não é possível registrar outro."
         )
 
-    senha_hash = bcrypt.hashpw(dados_registro.password.encode('utf-8'), bcrypt.gensalt())
+    senha_hash = await password_service.hash_senha(dados_registro.password)
 
     novo_super_admin = SuperAdministrador(
         nome_usuario=dados_registro.nome_usuario,
         email=dados_registro.email,
-        senha_hash=senha_hash.decode('utf-8'),
+        senha_hash=senha_hash,
         is_root=True # Marca o primeiro como root
     )
 
     db.add(novo_super_admin)
     db.commit()
-    db.refresh(novo_super_admin)
 
     return novo_super_admin
 
@@ -128,7 +145,7 @@ async def registrar_super_admin_inicial(
     response_model=List[SuperAdminResponse], 
     summary="Lista todos os super administradores (Requer autenticação de SuperAdmin)"
 )
-async def listar_super_administradores(
+def listar_super_administradores(
     db: Session = Depends(get_db),
     current_admin: SuperAdministrador = Depends(get_current_super_admin)
 ):
@@ -141,7 +158,7 @@ async def listar_super_administradores(
     response_model=SuperAdminResponse, 
     summary="Obtém um super administrador pelo ID (Requer autenticação de SuperAdmin)"
 )
-async def obter_super_admin_por_id(
+def obter_super_admin_por_id(
     super_admin_id: int, 
     db: Session = Depends(get_db),
     current_admin: SuperAdministrador = Depends(get_current_super_admin)
@@ -174,7 +191,7 @@ async def atualizar_super_admin(
 
     update_data = dados_atualizacao.model_dump(exclude_unset=True)
     if "password" in update_data and update_data["password"]:
-        update_data["senha_hash"] = bcrypt.hashpw(update_data["password"].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        update_data["senha_hash"] = await password_service.hash_senha(update_data["password"])
         del update_data["password"]
     
     for key, value in update_data.items():
@@ -182,7 +199,7 @@ async def atualizar_super_admin(
 
     db.add(super_admin)
     db.commit()
-    db.refresh(super_admin)
+    invalidar_usuario_em_cache("super_admin", super_admin.id)
     return super_admin
 
 @router.delete(
@@ -190,7 +207,7 @@ async def atualizar_super_admin(
     status_code=status.HTTP_204_NO_CONTENT, 
     summary="Deleta um super administrador (Requer autenticação de SuperAdmin)"
 )
-async def deletar_super_admin(
+def deletar_super_admin(
     super_admin_id: int, 
     db: Session = Depends(get_db),
     current_admin: SuperAdministrador = Depends(get_current_super_admin)
@@ -205,4 +222,5 @@ async def deletar_super_admin(
     
     db.delete(super_admin)
     db.commit()
+    invalidar_usuario_em_cache("super_admin", super_admin_id)
     return None
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
 from typing import List
 
-from database.connection import get_db
+from database.connection import get_db, get_db_leitura
 from schemas.tenant_schema import TenantCreate, TenantUpdate, TenantResponse
 from services import tenant_service
 from controllers.global_controllers.super_admin_controller import get_current_super_admin
@@ -16,7 +16,7 @@ def create_tenant(tenant: TenantCreate, db: Session = Depends(get_db), current_a
     return tenant_service.create_tenant(db=db, tenant=tenant)
 
 @router.get("/", response_model=List[TenantResponse], summary="Lista todas as Lojas (Tenants)")
-def get_all_tenants(db: Session = Depends(get_db), current_admin: dict = Depends(get_current_super_admin)):
+def get_all_tenants(db: Session = Depends(get_db_leitura), current_admin: dict = Depends(get_current_super_admin)):
     return tenant_service.get_all_tenants(db=db)
 
 @router.get("/{tenant_id}", response_model=TenantResponse, summary="Busca uma Loja por ID")
@@ -2,21 +2,16 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import connection
+from database.connection import get_db, get_db_leitura
+from middleware.tenant_middleware import get_current_tenant
 from services import visitante_service
 from schemas import visitante_schema
 
-router = APIRouter()
-
-def get_db():
-    db = connection.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Visitantes ficam no banco da loja em que foram registrados (shard do tenant)
+router = APIRouter(dependencies=[Depends(get_current_tenant)])
 
 @router.get("/visitantes/", response_model=list[visitante_schema.Visitante])
-def read_visitantes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_visitantes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db_leitura)):
     visitantes = visitante_service.get_visitantes(db, skip=skip, limit=limit)
     return visitantes
 
@@ -14,7 +14,7 @@ router = APIRouter()
     response_model=WebmasterResetPasswordResponse, 
     summary="Reseta a senha de um webmaster"
 )
-async def resetar_senha_webmaster(
+def resetar_senha_webmaster(
     webmaster_id: int, 
     db: Session = Depends(get_db)
 ):
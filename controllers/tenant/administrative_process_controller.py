@@ -6,11 +6,13 @@ from typing import List
 
 from database.connection import get_db
 from schemas.administrative_process_schema import AdministrativeProcessCreate, AdministrativeProcessUpdate, AdministrativeProcessResponse
+from middleware.tenant_middleware import get_current_tenant
 from services import administrative_process_service
 # A função 'has_hierarchical_access' não está implementada, então a importação e uso foram comentados.
 from middleware.authorize_middleware import get_current_user #, has_hierarchical_access
 
-router = APIRouter()
+# Todas as rotas operam sobre dados da loja: a sessão é apontada para o shard do tenant antes do endpoint
+router = APIRouter(dependencies=[Depends(get_current_tenant)])
 
 @router.post("/", response_model=AdministrativeProcessResponse, status_code=status.HTTP_201_CREATED)
 def create_administrative_process(
@@ -1,13 +1,16 @@
 # backend_python/controllers/tenant/auth_controller.py
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from database.connection import get_db
+from database.async_connection import get_async_db
 from schemas.auth_schema import LodgeMemberLogin, LodgeMemberSelectLodge, LodgeMemberForgotPassword, LodgeMemberResetPassword, LodgeMemberAuthResponse
 from services import auth_service
-from middleware.tenant_middleware import get_current_tenant
+from middleware.tenant_middleware import get_current_tenant_async
 from middleware.authorize_middleware import get_current_user # Para refresh_token e select_lodge
+from utils.ip_utils import ip_do_cliente
 
 router = APIRouter()
 
@@ -18,19 +21,20 @@ router = APIRouter()
 )
 async def login_membro_loja(
     dados_login: LodgeMemberLogin, 
-    db: Session = Depends(get_db),
-    tenant: dict = Depends(get_current_tenant) # Garante que o tenant está no contexto
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    tenant: dict = Depends(get_current_tenant_async) # Garante que o tenant está no contexto
 ):
     """Autentica um membro da loja e retorna um token de acesso JWT."""
-    # O tenant_id já está no contexto via get_current_tenant, pode ser usado no serviço se necessário
-    return auth_service.login_membro_loja(db=db, dados_login=dados_login)
+    # O tenant_id já está no contexto via get_current_tenant_async, pode ser usado no serviço se necessário
+    return await auth_service.login_membro_loja_async(db=db, dados_login=dados_login, ip_cliente=ip_do_cliente(request))
 
 @router.post(
     "/select-lodge", 
     response_model=LodgeMemberAuthResponse, 
     summary="Permite que um membro selecione uma loja (se tiver múltiplas associações)"
 )
-async def selecionar_loja_membro(
+def selecionar_loja_membro(
     dados_selecao: LodgeMemberSelectLodge, 
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user) # Requer autenticação prévia
@@ -43,19 +47,31 @@ async def selecionar_loja_membro(
     response_model=LodgeMemberAuthResponse, 
     summary="Atualiza o token de acesso de um membro da loja"
 )
-async def refresh_token(
+def refresh_token(
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user) # Requer autenticação prévia
 ):
     """Gera um novo token de acesso para o usuário atual."""
     return auth_service.refresh_token(db=db, current_user=current_user)
 
+@router.post(
+    "/logout", 
+    status_code=status.HTTP_200_OK, 
+    summary="Encerra a sessão revogando o token de acesso atual"
+)
+def logout(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Revoga o token de acesso atual antes da sua expiração."""
+    return auth_service.logout(db=db, current_user=current_user)
+
 @router.post(
     "/forgot-password", 
     status_code=status.HTTP_200_OK, 
     summary="Inicia o processo de recuperação de senha"
 )
-async def esqueci_senha(
+def esqueci_senha(
     dados_esqueci_senha: LodgeMemberForgotPassword, 
     db: Session = Depends(get_db)
 ):
@@ -72,4 +88,4 @@ async def resetar_senha(
     db: Session = Depends(get_db)
 ):
     """Reseta a senha de um membro da loja usando um token de recuperação."""
-    return auth_service.reset_password(db=db, dados_reset_senha=dados_reset_senha)
+    return await auth_service.reset_password(db=db, dados_reset_senha=dados_reset_senha)
@@ -6,10 +6,12 @@ from typing import List
 
 from database.connection import get_db
 from schemas.historico_cargo_schema import HistoricoCargoCreate, HistoricoCargoUpdate, HistoricoCargoResponse
+from middleware.tenant_middleware import get_current_tenant
 from services import historico_cargo_service
 from middleware.authorize_middleware import get_current_user
 
-router = APIRouter()
+# Todas as rotas operam sobre dados da loja: a sessão é apontada para o shard do tenant antes do endpoint
+router = APIRouter(dependencies=[Depends(get_current_tenant)])
 
 @router.post(
     "/", 
@@ -1,14 +1,16 @@
 # backend_python/controllers/tenant/lodge_member_controller.py
 
 from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
 from database.connection import get_db
+from database.async_connection import get_async_db
 from schemas.lodge_member_schema import LodgeMemberCreate, LodgeMemberUpdate, LodgeMemberResponse
 from services import lodge_member_service
-from middleware.tenant_middleware import get_current_tenant
-from middleware.authorize_middleware import has_permission
+from middleware.tenant_middleware import get_current_tenant, get_current_tenant_async
+from middleware.authorize_middleware import has_permission, has_permission_async
 
 router = APIRouter()
 
@@ -18,7 +20,7 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED, 
     summary="Cria um novo membro da loja"
 )
-async def criar_membro_loja(
+def criar_membro_loja(
     membro: LodgeMemberCreate, 
     db: Session = Depends(get_db),
     tenant: dict = Depends(get_current_tenant) # Garante que o tenant está no contexto
@@ -32,19 +34,19 @@ async def criar_membro_loja(
     summary="Lista todos os membros da loja"
 )
 async def listar_membros_loja(
-    db: Session = Depends(get_db),
-    tenant: dict = Depends(get_current_tenant),
-    current_user: dict = Depends(has_permission(['read:lodge_members'])) # Requer permissão
+    db: AsyncSession = Depends(get_async_db),
+    tenant: dict = Depends(get_current_tenant_async),
+    current_user: dict = Depends(has_permission_async(['read:lodge_members'])) # Requer permissão
 ):
     """Retorna uma lista de todos os membros da loja para o tenant atual."""
-    return lodge_member_service.obter_todos_membros_loja(db=db, tenant_id=tenant.id)
+    return await lodge_member_service.obter_todos_membros_loja_async(db=db, tenant_id=tenant.id)
 
 @router.get(
     "/{membro_id}", 
     response_model=LodgeMemberResponse, 
     summary="Obtém um membro da loja pelo ID"
 )
-async def obter_membro_loja_por_id(
+def obter_membro_loja_por_id(
     membro_id: int, 
     db: Session = Depends(get_db),
     tenant: dict = Depends(get_current_tenant),
@@ -58,7 +60,7 @@ async def obter_membro_loja_por_id(
     response_model=LodgeMemberResponse, 
     summary="Atualiza um membro da loja"
 )
-async def atualizar_membro_loja(
+def atualizar_membro_loja(
     membro_id: int, 
     membro_atualizacao: LodgeMemberUpdate, 
     db: Session = Depends(get_db),
@@ -73,7 +75,7 @@ async def atualizar_membro_loja(
     status_code=status.HTTP_200_OK, 
     summary="Deleta um membro da loja"
 )
-async def deletar_membro_loja(
+def deletar_membro_loja(
     membro_id: int, 
     db: Session = Depends(get_db),
     tenant: dict = Depends(get_current_tenant),
@@ -6,10 +6,12 @@ from typing import List
 
 from database.connection import get_db
 from schemas.membro_schema import MembroCreate, MembroUpdate, MembroResponse
+from middleware.tenant_middleware import get_current_tenant
 from services import membro_service
 from middleware.authorize_middleware import get_current_user # Usaremos a dependência principal de autorização
 
-router = APIRouter()
+# Todas as rotas operam sobre dados da loja: a sessão é apontada para o shard do tenant antes do endpoint
+router = APIRouter(dependencies=[Depends(get_current_tenant)])
 
 @router.post(
     "/", 
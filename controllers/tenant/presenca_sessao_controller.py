@@ -2,25 +2,20 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import connection
+from database.connection import get_db, get_db_leitura
+from middleware.tenant_middleware import get_current_tenant
 from services import presenca_sessao_service
 from schemas import presenca_sessao_schema
 
-router = APIRouter()
-
-def get_db():
-    db = connection.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Todas as rotas operam sobre dados da loja: a sessão é apontada para o shard do tenant antes do endpoint
+router = APIRouter(dependencies=[Depends(get_current_tenant)])
 
 @router.post("/presencas/", response_model=presenca_sessao_schema.PresencaSessao)
 def create_presenca_sessao(presenca_sessao: presenca_sessao_schema.PresencaSessaoCreate, db: Session = Depends(get_db)):
     return presenca_sessao_service.create_presenca_sessao(db=db, presenca_sessao=presenca_sessao)
 
 @router.get("/presencas/", response_model=list[presenca_sessao_schema.PresencaSessao])
-def read_presencas_sessao(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_presencas_sessao(skip: int = 0, limit: int = 100, db: Session = Depends(get_db_leitura)):
     presencas_sessao = presenca_sessao_service.get_presencas_sessao(db, skip=skip, limit=limit)
     return presencas_sessao
 
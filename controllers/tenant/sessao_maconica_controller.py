@@ -1,55 +1,53 @@
 # backend_python/controllers/tenant/sessao_maconica_controller.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import connection
+from database.connection import get_db, get_db_leitura
+from database.async_connection import get_async_db
 from services import sessao_maconica_service
 from schemas import sessao_maconica_schema, presenca_sessao_schema, visitante_schema
 from datetime import datetime
 from middleware.attendance_middleware import check_attendance_window
+from middleware.tenant_middleware import get_current_tenant, get_current_tenant_async, get_db_da_loja
 
 router = APIRouter()
 
-def get_db():
-    db = connection.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/sessoes/", response_model=sessao_maconica_schema.SessaoMaconica)
-def create_sessao(sessao: sessao_maconica_schema.SessaoMaconicaCreate, loja_id: int, db: Session = Depends(get_db)):
+def create_sessao(sessao: sessao_maconica_schema.SessaoMaconicaCreate, loja_id: int, db: Session = Depends(get_db_da_loja)):
     return sessao_maconica_service.create_sessao(db=db, sessao=sessao, loja_id=loja_id)
 
-@router.get("/sessoes/", response_model=list[sessao_maconica_schema.SessaoMaconica])
-def read_sessoes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/sessoes/", response_model=list[sessao_maconica_schema.SessaoMaconica], dependencies=[Depends(get_current_tenant)])
+def read_sessoes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db_leitura)):
     sessoes = sessao_maconica_service.get_sessoes(db, skip=skip, limit=limit)
     return sessoes
 
 @router.get("/sessoes/{sessao_id}", response_model=sessao_maconica_schema.SessaoMaconica)
-def read_sessao(sessao_id: int, db: Session = Depends(get_db)):
-    db_sessao = sessao_maconica_service.get_sessao(db, sessao_id=sessao_id)
+async def read_sessao(sessao_id: int, db: AsyncSession = Depends(get_async_db), tenant=Depends(get_current_tenant_async)):
+    db_sessao = await sessao_maconica_service.get_sessao_async(db, sessao_id=sessao_id)
     if db_sessao is None:
         raise HTTPException(status_code=404, detail="Sessao not found")
     return db_sessao
 
 @router.put("/sessoes/{sessao_id}/attendance", response_model=sessao_maconica_schema.SessaoMaconica, dependencies=[Depends(check_attendance_window)])
-def update_sessa_attendance(sessao_id: int, attendance_data: list[presenca_sessao_schema.PresencaSessaoBase], db: Session = Depends(get_db)):
-    return sessao_maconica_service.update_session_attendance(db=db, sessao_id=sessao_id, attendance_data=attendance_data)
+def update_sessa_attendance(sessao_id: int, attendance_data: list[presenca_sessao_schema.PresencaSessaoBase], response: Response, db: Session = Depends(get_db)):
+    sessao, linhas_alteradas = sessao_maconica_service.update_session_attendance(db=db, sessao_id=sessao_id, attendance_data=attendance_data)
+    response.headers["X-Linhas-Alteradas"] = str(linhas_alteradas)
+    return sessao
 
 @router.post("/sessoes/{sessao_id}/visitors", response_model=presenca_sessao_schema.PresencaSessao, dependencies=[Depends(check_attendance_window)])
 def manage_session_visitor(sessao_id: int, visitor_data: visitante_schema.VisitanteCreate, db: Session = Depends(get_db)):
     return sessao_maconica_service.manage_session_visitor(db=db, sessao_id=sessao_id, visitor_data=visitor_data)
 
-@router.delete("/sessoes/visitors/{visitor_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/sessoes/visitors/{visitor_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(get_current_tenant)])
 def remove_session_visitor(visitor_id: int, db: Session = Depends(get_db)):
     sessao_maconica_service.remove_session_visitor(db=db, visitor_id=visitor_id)
     return None
 
 @router.get("/sessoes/suggest-next-date/{loja_id}", response_model=datetime)
-def suggest_next_session_date(loja_id: int, db: Session = Depends(get_db)):
+def suggest_next_session_date(loja_id: int, db: Session = Depends(get_db_da_loja)):
     return sessao_maconica_service.suggest_next_session_date(db=db, loja_id=loja_id)
 
-@router.put("/sessoes/{sessao_id}/status", response_model=sessao_maconica_schema.SessaoMaconica)
+@router.put("/sessoes/{sessao_id}/status", response_model=sessao_maconica_schema.SessaoMaconica, dependencies=[Depends(get_current_tenant)])
 def update_sessao_status(sessao_id: int, new_status: str, db: Session = Depends(get_db)):
     return sessao_maconica_service.update_sessao_status(db=db, sessao_id=sessao_id, new_status=new_status)
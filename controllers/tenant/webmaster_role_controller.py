@@ -6,11 +6,13 @@ from typing import List
 
 from database.connection import get_db
 from schemas.webmaster_role_schema import WebmasterRoleAssignment, WebmasterRoleResponse
+from middleware.tenant_middleware import get_current_tenant
 from services import webmaster_role_service
 # A função 'has_permission' não está implementada, então a importação e uso foram comentados.
 from middleware.authorize_middleware import get_current_user #, has_permission
 
-router = APIRouter()
+# Todas as rotas operam sobre dados da loja: a sessão é apontada para o shard do tenant antes do endpoint
+router = APIRouter(dependencies=[Depends(get_current_tenant)])
 
 @router.post("/assign", response_model=WebmasterRoleResponse, status_code=status.HTTP_201_CREATED)
 def assign_role_to_webmaster(
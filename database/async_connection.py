@@ -0,0 +1,88 @@
+# backend_python/database/async_connection.py
+
+import threading
+from typing import Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from config.settings import config
+from utils.logger import logger
+from utils.request_context import instrumentar_engine
+
+# O engine assíncrono é criado sob demanda: o driver (aiomysql/asyncpg/aiosqlite) só é importado
+# se algum endpoint usar o caminho assíncrono.
+_engine_async: Optional[AsyncEngine] = None
+_fabrica_sessoes_async: Optional[async_sessionmaker] = None
+_engines_async_shards: dict[str, AsyncEngine] = {}
+_lock = threading.Lock()
+
+# Driver síncrono -> driver assíncrono equivalente
+_DRIVERS_ASYNC = {"mysql": "mysql+aiomysql", "postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def _url_async(url: str) -> str:
+    """Converte a URL de um engine síncrono (ex: mysql+pymysql) para o driver assíncrono do mesmo dialeto."""
+    url_sync = make_url(url)
+    return url_sync.set(drivername=_DRIVERS_ASYNC[url_sync.get_backend_name()]).render_as_string(hide_password=False)
+
+def _criar_engine_async(url: str, nome: str) -> AsyncEngine:
+    from database.sharding import configurar_ids_intercalados
+    # O SQLite não aceita os parâmetros de dimensionamento de pool
+    parametros = {} if url.startswith("sqlite") else config.PARAMETROS_POOL
+    engine_async = create_async_engine(url, **parametros)
+    instrumentar_engine(engine_async.sync_engine)
+    configurar_ids_intercalados(engine_async.sync_engine, nome)
+    return engine_async
+
+def obter_engine_async() -> AsyncEngine:
+    """Retorna o engine assíncrono, criando-o na primeira chamada com os mesmos parâmetros de pool do síncrono."""
+    global _engine_async, _fabrica_sessoes_async
+    if _engine_async is None:
+        with _lock:
+            if _engine_async is None:
+                from database.sharding import SHARD_DIRETORIO, entidades_globais
+                _engine_async = _criar_engine_async(config.URL_BANCO_DE_DADOS_ASYNC, SHARD_DIRETORIO)
+                # Como no síncrono, as tabelas globais ficam presas ao banco diretório
+                _fabrica_sessoes_async = async_sessionmaker(
+                    _engine_async,
+                    binds={entidade: _engine_async for entidade in entidades_globais()},
+                    expire_on_commit=False,
+                    autoflush=False,
+                )
+                logger.info(f"[AsyncDB] Engine assíncrono criado ({_engine_async.dialect.name}+{_engine_async.dialect.driver}).")
+    return _engine_async
+
+def obter_engine_async_shard(nome: str) -> AsyncEngine:
+    """Engine assíncrono de um shard, criado sob demanda a partir da URL configurada em DB_SHARDS."""
+    from database.sharding import SHARD_DIRETORIO
+    if nome == SHARD_DIRETORIO:
+        return obter_engine_async()
+    if nome not in _engines_async_shards:
+        with _lock:
+            if nome not in _engines_async_shards:
+                _engines_async_shards[nome] = _criar_engine_async(_url_async(config.SHARDS_BANCO_DE_DADOS[nome]), nome)
+    return _engines_async_shards[nome]
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Cria uma sessão assíncrona a partir da fábrica (inicializando o engine se necessário)."""
+    obter_engine_async()
+    return _fabrica_sessoes_async()
+
+# Dependência do FastAPI para obter a sessão assíncrona do banco de dados
+async def get_async_db():
+    """
+    Equivalente assíncrono de `get_db`: uma sessão por requisição, compartilhada pelas dependências
+    e fechada ao final. As consultas não bloqueiam o event loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def encerrar_engine_async():
+    """Libera as conexões do engine assíncrono (chamado no encerramento da aplicação)."""
+    global _engine_async, _fabrica_sessoes_async
+    for engine_shard in _engines_async_shards.values():
+        await engine_shard.dispose()
+    _engines_async_shards.clear()
+    if _engine_async is not None:
+        await _engine_async.dispose()
+        _engine_async = _fabrica_sessoes_async = None
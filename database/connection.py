@@ -1,27 +1,118 @@
 # backend_python/database/connection.py
 
-from sqlalchemy import create_engine
+import itertools
+
+from fastapi import Depends
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import Select
 from config.settings import config  # Importa a configuração centralizada
+from database.pool_monitor import QueuePoolMonitorado, registrar_eventos_pool
+from utils.cache_utils import CacheLRUTTL
+from utils.request_context import obter_contexto
+
+# Cria o engine do SQLAlchemy usando a URL e os parâmetros de pool (preset do NODE_ENV + sobrescritas)
+engine = create_engine(config.URL_BANCO_DE_DADOS, poolclass=QueuePoolMonitorado, **config.PARAMETROS_POOL)
+registrar_eventos_pool(engine)
+
+# Engines das réplicas de leitura (opcionais), usadas em rodízio
+engines_replicas = [
+    create_engine(url, poolclass=QueuePoolMonitorado, **config.PARAMETROS_POOL)
+    for url in config.LISTA_URLS_REPLICAS
+]
+for _replica in engines_replicas:
+    registrar_eventos_pool(_replica)
+_rodizio_replicas = itertools.cycle(engines_replicas) if engines_replicas else None
+
+# Clientes que escreveram recentemente (chave de aderência -> True) continuam lendo do primário
+_escritas_recentes = CacheLRUTTL("escritas_recentes", 100000, config.JANELA_LEITURA_APOS_ESCRITA)
+
+class SessaoRoteada(Session):
+    """
+    Sessão que envia consultas SELECT a uma réplica quando `info["usar_replica"]` está ativo.
+    Escritas, flushes e qualquer leitura posterior a uma escrita na mesma sessão vão ao primário.
+    As réplicas espelham o banco principal: consultas destinadas a um shard não são desviadas.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        bind = super().get_bind(mapper=mapper, clause=clause, **kw)
+        if (
+            bind is engine
+            and self.info.get("usar_replica")
+            and not self.info.get("escreveu")
+            and not self._flushing
+            and isinstance(clause, Select)
+        ):
+            # A réplica é escolhida uma vez por sessão, para não abrir conexões em várias
+            if "replica" not in self.info:
+                self.info["replica"] = next(_rodizio_replicas)
+            return self.info["replica"]
+        return bind
+
+@event.listens_for(SessaoRoteada, "after_flush")
+def _marcar_escrita_flush(session, flush_context):
+    session.info["escreveu"] = True
 
-# Cria o engine do SQLAlchemy usando a URL do arquivo de configuração
-engine = create_engine(config.URL_BANCO_DE_DADOS)
+@event.listens_for(SessaoRoteada, "do_orm_execute")
+def _marcar_escrita_em_massa(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["escreveu"] = True
 
-# Cria uma fábrica de sessões
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@event.listens_for(SessaoRoteada, "after_commit")
+def _registrar_aderencia(session):
+    # Read-your-writes: após um commit com escrita, o cliente lê do primário durante a janela configurada
+    if session.info.get("escreveu"):
+        contexto = obter_contexto()
+        if contexto is not None and contexto.chave_aderencia:
+            _escritas_recentes.definir(contexto.chave_aderencia, True)
+
+# Cria uma fábrica de sessões. Os objetos não expiram no commit: o que a aplicação acabou de gravar
+# continua disponível para a resposta sem um novo SELECT (exceto as colunas geradas pelo banco,
+# ver `carregar_colunas_geradas`).
+SessionLocal = sessionmaker(class_=SessaoRoteada, autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Cria uma classe Base para os modelos declarativos
 Base = declarative_base()
 
+# Colunas do ModeloBase preenchidas pelo banco (server_default / onupdate)
+COLUNAS_GERADAS = ["criado_em", "atualizado_em"]
+
+def carregar_colunas_geradas(db: Session, objeto):
+    """
+    Lê criado_em/atualizado_em de um objeto recém-gravado, em um único SELECT.
+    Usado apenas pelas escritas cuja resposta expõe essas colunas.
+    """
+    db.refresh(objeto, attribute_names=COLUNAS_GERADAS)
+    return objeto
+
 # Dependência do FastAPI para obter a sessão do banco de dados
 def get_db():
     """
     Cria e fornece uma sessão de banco de dados por requisição.
     Garante que a sessão seja sempre fechada após o uso.
+    O FastAPI resolve a dependência uma única vez por requisição, então controladores,
+    middlewares de dependência (autenticação, tenant, janela de presença) e serviços
+    compartilham a mesma sessão. A conexão só é retirada do pool na primeira consulta.
     """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_db_leitura(db: Session = Depends(get_db)):
+    """
+    Variante de `get_db` para endpoints somente leitura: a mesma sessão da requisição passa a
+    enviar os SELECTs a uma réplica, exceto se o cliente escreveu há pouco (read-your-writes).
+    Sem réplicas configuradas, equivale a `get_db`.
+    """
+    contexto = obter_contexto()
+    escreveu_ha_pouco = contexto is not None and _escritas_recentes.obter(contexto.chave_aderencia) is not None
+    if engines_replicas and not escreveu_ha_pouco:
+        db.info["usar_replica"] = True
+    return db
+
+def obter_metricas_replicas() -> dict:
+    """Número de réplicas e acertos do cache de aderência ao primário."""
+    return {"replicas": len(engines_replicas), "aderencia_primario": _escritas_recentes.metricas()}
@@ -0,0 +1,29 @@
+# backend_python/database/migrations/fecho_permissoes_cargos.py
+#
+# Cria as tabelas de herança entre cargos e de permissões efetivas, e popula o fecho
+# a partir das atribuições já existentes em `cargos_permissoes`.
+# Uso: python -m database.migrations.fecho_permissoes_cargos
+
+from database.connection import engine, SessionLocal
+from models.models import cargos_heranca, cargos_permissoes_efetivas
+from services.role_hierarchy_service import reconstruir_fechos
+
+def upgrade():
+    cargos_heranca.create(bind=engine, checkfirst=True)
+    cargos_permissoes_efetivas.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        reconstruir_fechos(db)
+        db.commit()
+    finally:
+        db.close()
+
+def downgrade():
+    cargos_permissoes_efetivas.drop(bind=engine, checkfirst=True)
+    cargos_heranca.drop(bind=engine, checkfirst=True)
+
+if __name__ == "__main__":
+    print("Criando tabelas de herança de cargos e calculando permissões efetivas...")
+    upgrade()
+    print("Migração concluída.")
@@ -0,0 +1,82 @@
+# backend_python/database/migrations/indice_bit_permissoes.py
+#
+# Índice de bit denso para as permissões (`permissoes.indice_bit`), usado pelo motor RBAC
+# no lugar do id: as permissões existentes recebem 0, 1, 2, ... em ordem de id.
+# Os bitsets embutidos nos tokens (claim `perms`) mudam de significado, então a versão de
+# permissões de todos os cargos é incrementada: tokens emitidos antes da migração são recusados
+# como desatualizados e o cliente obtém um novo.
+# Tabela global: aplicado apenas ao banco diretório. Requer `versao_permissoes_cargos` aplicada antes.
+# Uso: python -m database.migrations.indice_bit_permissoes [--downgrade]
+
+import sys
+
+from sqlalchemy import Index, MetaData, Table, inspect, select, text, update
+
+NOME_INDICE = "uq_permissoes_indice_bit"
+
+def _tem_coluna(engine) -> bool:
+    return any(coluna["name"] == "indice_bit" for coluna in inspect(engine).get_columns("permissoes"))
+
+def _tem_indice(engine) -> bool:
+    return any(indice["name"] == NOME_INDICE for indice in inspect(engine).get_indexes("permissoes"))
+
+def _exigir_nao_nulo(conexao):
+    # O SQLite não altera colunas existentes; a restrição fica apenas no modelo
+    if conexao.dialect.name == "mysql":
+        conexao.execute(text("ALTER TABLE permissoes MODIFY indice_bit INTEGER NOT NULL"))
+    elif conexao.dialect.name == "postgresql":
+        conexao.execute(text("ALTER TABLE permissoes ALTER COLUMN indice_bit SET NOT NULL"))
+
+def preencher(engine) -> int:
+    """Atribui os menores índices livres, em ordem de id, às permissões ainda sem índice."""
+    permissoes = Table("permissoes", MetaData(), autoload_with=engine)
+    with engine.begin() as conexao:
+        usados = set(conexao.execute(
+            select(permissoes.c.indice_bit).where(permissoes.c.indice_bit.is_not(None))
+        ).scalars())
+        pendentes = conexao.execute(
+            select(permissoes.c.id).where(permissoes.c.indice_bit.is_(None)).order_by(permissoes.c.id)
+        ).scalars().all()
+        indice = 0
+        for id_permissao in pendentes:
+            while indice in usados:
+                indice += 1
+            conexao.execute(update(permissoes).where(permissoes.c.id == id_permissao).values(indice_bit=indice))
+            usados.add(indice)
+        if pendentes:
+            conexao.execute(text("UPDATE cargos SET versao_permissoes = versao_permissoes + 1"))
+    return len(pendentes)
+
+def upgrade():
+    from database.connection import engine
+    from database.migrations.versao_permissoes_cargos import tem_coluna as tem_versao_permissoes
+    if not tem_versao_permissoes(engine):
+        raise SystemExit("Aplique antes a migração versao_permissoes_cargos (coluna cargos.versao_permissoes).")
+    if not _tem_coluna(engine):
+        with engine.begin() as conexao:
+            conexao.execute(text("ALTER TABLE permissoes ADD COLUMN indice_bit INTEGER NULL"))
+    print(f"Permissões com índice atribuído: {preencher(engine)}")
+    with engine.begin() as conexao:
+        _exigir_nao_nulo(conexao)
+    if not _tem_indice(engine):
+        permissoes = Table("permissoes", MetaData(), autoload_with=engine)
+        Index(NOME_INDICE, permissoes.c.indice_bit, unique=True).create(bind=engine)
+
+def downgrade():
+    from database.connection import engine
+    if _tem_indice(engine):
+        permissoes = Table("permissoes", MetaData(), autoload_with=engine)
+        Index(NOME_INDICE, permissoes.c.indice_bit, unique=True).drop(bind=engine)
+    if _tem_coluna(engine):
+        with engine.begin() as conexao:
+            conexao.execute(text("ALTER TABLE permissoes DROP COLUMN indice_bit"))
+            # Os tokens voltam a ser comparados com bitsets indexados por id
+            conexao.execute(text("UPDATE cargos SET versao_permissoes = versao_permissoes + 1"))
+
+if __name__ == "__main__":
+    if "--downgrade" in sys.argv:
+        downgrade()
+    else:
+        print("Atribuindo índices de bit densos às permissões...")
+        upgrade()
+    print("Migração concluída.")
@@ -0,0 +1,88 @@
+# backend_python/database/migrations/indices_tenant.py
+#
+# Índices compostos para os filtros mais frequentes das tabelas de loja, sempre
+# começando pela coluna mais seletiva do predicado (sessão, loja ou membro).
+# No InnoDB todo índice secundário já carrega a chave primária, então os índices abaixo
+# também cobrem as consultas que só leem `id` (ex: existência de presença, ids de sessões).
+# Aplicado ao banco principal e a todos os shards.
+# Uso: python -m database.migrations.indices_tenant [--downgrade]
+
+import sys
+
+from sqlalchemy import Index, MetaData, Table, inspect
+
+# (nome, tabela, colunas) — a ordem das colunas segue o predicado de igualdade e depois a ordenação
+INDICES = [
+    # Check-in e atualização de presença: WHERE id_sessao = ? AND id_membro = ?
+    # (substituído pelo índice único de `presenca_unica`; não é recriado se ele existir)
+    ("ix_presencas_sessao_sessao_membro", "presencas_sessao", ["id_sessao", "id_membro"]),
+    # Remoção/atualização de visitantes: WHERE id_visitante = ?
+    ("ix_presencas_sessao_visitante", "presencas_sessao", ["id_visitante"]),
+    # Sessão mais recente da loja: WHERE id_loja = ? ORDER BY data_sessao DESC (varredura reversa)
+    ("ix_sessoes_maconicas_loja_data", "sessoes_maconicas", ["id_loja", "data_sessao"]),
+    # Membros ativos da loja (criação de sessão): WHERE id_loja = ? AND situacao = ?
+    ("ix_membros_loja_loja_situacao", "membros_loja", ["id_loja", "situacao"]),
+    # Login de membros: WHERE email = ?
+    ("ix_membros_loja_email", "membros_loja", ["email"]),
+    ("ix_historico_cargos_membro", "historico_cargos", ["id_membro"]),
+    ("ix_condecoracoes_membro", "condecoracoes", ["id_membro"]),
+    # Tabela global (só existe no diretório): sincronização das revogações, WHERE criado_em >= ?
+    ("ix_tokens_revogados_criado_em", "tokens_revogados", ["criado_em"]),
+]
+
+def _indices_existentes(engine, tabela: str) -> dict[str, list[str]]:
+    return {indice["name"]: indice["column_names"] for indice in inspect(engine).get_indexes(tabela)}
+
+def _tabela(metadata: MetaData, nome_tabela: str, engine) -> Table:
+    if nome_tabela not in metadata.tables:
+        Table(nome_tabela, metadata, autoload_with=engine)
+    return metadata.tables[nome_tabela]
+
+def criar_indices(engine) -> list[str]:
+    """Cria os índices ausentes; ignora tabelas inexistentes e colunas já indexadas com o mesmo prefixo."""
+    criados = []
+    inspetor = inspect(engine)
+    metadata = MetaData()
+    for nome, nome_tabela, colunas in INDICES:
+        if not inspetor.has_table(nome_tabela):
+            continue
+        existentes = _indices_existentes(engine, nome_tabela)
+        if nome in existentes or colunas in existentes.values():
+            continue
+        tabela = _tabela(metadata, nome_tabela, engine)
+        Index(nome, *(tabela.c[coluna] for coluna in colunas)).create(bind=engine)
+        criados.append(nome)
+    return criados
+
+def remover_indices(engine) -> list[str]:
+    removidos = []
+    inspetor = inspect(engine)
+    metadata = MetaData()
+    for nome, nome_tabela, colunas in INDICES:
+        if not inspetor.has_table(nome_tabela) or nome not in _indices_existentes(engine, nome_tabela):
+            continue
+        tabela = _tabela(metadata, nome_tabela, engine)
+        Index(nome, *(tabela.c[coluna] for coluna in colunas)).drop(bind=engine)
+        removidos.append(nome)
+    return removidos
+
+def _engines():
+    from database.connection import engine
+    from database.sharding import SHARD_DIRETORIO, engines_shards
+    return {SHARD_DIRETORIO: engine, **engines_shards}
+
+def upgrade():
+    for nome, engine in _engines().items():
+        print(f"[{nome}] índices criados: {criar_indices(engine) or 'nenhum (já existentes)'}")
+
+def downgrade():
+    for nome, engine in _engines().items():
+        print(f"[{nome}] índices removidos: {remover_indices(engine) or 'nenhum'}")
+
+if __name__ == "__main__":
+    if "--downgrade" in sys.argv:
+        downgrade()
+    else:
+        print("Criando índices compostos das tabelas de loja...")
+        upgrade()
+    print("Migração concluída.")
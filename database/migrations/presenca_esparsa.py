@@ -0,0 +1,122 @@
+# backend_python/database/migrations/presenca_esparsa.py
+#
+# Modo de presença esparso: adiciona a `sessoes_maconicas` o rol da sessão (`membros_convocados`,
+# lista JSON de ids de membros) e compacta as sessões existentes: o rol passa a ser o conjunto
+# de membros com linha em `presencas_sessao`, e as linhas 'Ausente' sem check-in são removidas
+# (a leitura as deriva do rol). Cada sessão é compactada na sua própria transação.
+# O downgrade recria as linhas 'Ausente' a partir do rol e remove a coluna.
+# Aplicado ao banco principal e a todos os shards.
+# Uso: python -m database.migrations.presenca_esparsa [--somente-coluna | --downgrade]
+
+import json
+import sys
+
+from sqlalchemy import JSON, MetaData, Table, and_, delete, insert, inspect, select, text, update
+
+STATUS_AUSENTE = "Ausente"
+TAMANHO_LOTE = 500
+
+def _tabelas(engine):
+    metadata = MetaData()
+    return (
+        Table("sessoes_maconicas", metadata, autoload_with=engine),
+        Table("presencas_sessao", metadata, autoload_with=engine),
+    )
+
+def _tem_coluna(engine) -> bool:
+    return any(coluna["name"] == "membros_convocados" for coluna in inspect(engine).get_columns("sessoes_maconicas"))
+
+def adicionar_coluna(engine):
+    if _tem_coluna(engine):
+        return
+    tipo = JSON().compile(dialect=engine.dialect)
+    with engine.begin() as conexao:
+        conexao.execute(text(f"ALTER TABLE sessoes_maconicas ADD COLUMN membros_convocados {tipo} NULL"))
+
+def _lotes_de_sessoes(engine, sessoes, condicao):
+    """Ids das sessões que atendem à condição, em lotes por chave (a condição muda à medida que o lote é processado)."""
+    ultimo_id = 0
+    while True:
+        with engine.connect() as conexao:
+            ids = conexao.execute(
+                select(sessoes.c.id).where(condicao, sessoes.c.id > ultimo_id).order_by(sessoes.c.id).limit(TAMANHO_LOTE)
+            ).scalars().all()
+        if not ids:
+            return
+        yield ids
+        ultimo_id = ids[-1]
+
+def compactar(engine) -> dict:
+    sessoes, presencas = _tabelas(engine)
+    contagem = {"sessoes": 0, "linhas_removidas": 0}
+    for ids in _lotes_de_sessoes(engine, sessoes, sessoes.c.membros_convocados.is_(None)):
+        for id_sessao in ids:
+            with engine.begin() as conexao:
+                rol = conexao.execute(
+                    select(presencas.c.id_membro).distinct()
+                    .where(presencas.c.id_sessao == id_sessao, presencas.c.id_membro.is_not(None))
+                    .order_by(presencas.c.id_membro)
+                ).scalars().all()
+                conexao.execute(update(sessoes).where(sessoes.c.id == id_sessao).values(membros_convocados=rol))
+                removidas = conexao.execute(delete(presencas).where(
+                    presencas.c.id_sessao == id_sessao,
+                    presencas.c.id_membro.is_not(None),
+                    presencas.c.status_presenca == STATUS_AUSENTE,
+                    presencas.c.data_hora_checkin.is_(None),
+                ))
+            contagem["sessoes"] += 1
+            contagem["linhas_removidas"] += removidas.rowcount
+    return contagem
+
+def expandir(engine) -> dict:
+    sessoes, presencas = _tabelas(engine)
+    contagem = {"sessoes": 0, "linhas_criadas": 0}
+    for ids in _lotes_de_sessoes(engine, sessoes, sessoes.c.membros_convocados.is_not(None)):
+        for id_sessao in ids:
+            with engine.begin() as conexao:
+                rol = conexao.execute(select(sessoes.c.membros_convocados).where(sessoes.c.id == id_sessao)).scalar()
+                if isinstance(rol, str):
+                    rol = json.loads(rol)
+                com_registro = set(conexao.execute(
+                    select(presencas.c.id_membro).where(presencas.c.id_sessao == id_sessao, presencas.c.id_membro.is_not(None))
+                ).scalars())
+                faltantes = [
+                    {"id_sessao": id_sessao, "id_membro": id_membro, "status_presenca": STATUS_AUSENTE}
+                    for id_membro in rol or [] if id_membro not in com_registro
+                ]
+                if faltantes:
+                    conexao.execute(insert(presencas), faltantes)
+                conexao.execute(update(sessoes).where(sessoes.c.id == id_sessao).values(membros_convocados=None))
+            contagem["sessoes"] += 1
+            contagem["linhas_criadas"] += len(faltantes)
+    return contagem
+
+def _engines():
+    from database.connection import engine
+    from database.sharding import SHARD_DIRETORIO, engines_shards
+    return {SHARD_DIRETORIO: engine, **engines_shards}
+
+def upgrade(compactar_dados: bool = True):
+    for nome, engine in _engines().items():
+        if not inspect(engine).has_table("sessoes_maconicas"):
+            continue
+        adicionar_coluna(engine)
+        if compactar_dados:
+            print(f"[{nome}] compactação: {compactar(engine)}")
+
+def downgrade():
+    for nome, engine in _engines().items():
+        if not inspect(engine).has_table("sessoes_maconicas") or not _tem_coluna(engine):
+            continue
+        print(f"[{nome}] expansão: {expandir(engine)}")
+        with engine.begin() as conexao:
+            conexao.execute(text("ALTER TABLE sessoes_maconicas DROP COLUMN membros_convocados"))
+
+if __name__ == "__main__":
+    if "--downgrade" in sys.argv:
+        print("Recriando as ausências a partir do rol das sessões...")
+        downgrade()
+    else:
+        print("Adicionando o rol das sessões e compactando as presenças...")
+        upgrade(compactar_dados="--somente-coluna" not in sys.argv)
+    print("Migração concluída.")
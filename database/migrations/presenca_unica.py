@@ -0,0 +1,89 @@
+# backend_python/database/migrations/presenca_unica.py
+#
+# Garante uma única presença por membro em cada sessão: remove as duplicatas de
+# (id_sessao, id_membro) e cria o índice único que o check-in usa como alvo do upsert.
+# Das duplicatas, fica a linha com informação mais recente: status diferente de 'Ausente',
+# depois o check-in mais recente, depois o maior id. O índice único também atende às consultas
+# por (id_sessao, id_membro), então o índice simples criado por `indices_tenant` é removido.
+# Linhas de visitantes (id_membro nulo) não são afetadas: nulos não conflitam no índice único.
+# Se o check-in antigo gravar novas duplicatas entre a limpeza e a criação do índice, basta executar de novo.
+# Aplicado ao banco principal e a todos os shards.
+# Uso: python -m database.migrations.presenca_unica [--downgrade]
+
+import sys
+from datetime import datetime
+
+from sqlalchemy import Index, MetaData, Table, delete, func, inspect, select
+
+NOME_INDICE_UNICO = "uq_presencas_sessao_sessao_membro"
+NOME_INDICE_SIMPLES = "ix_presencas_sessao_sessao_membro"
+COLUNAS = ("id_sessao", "id_membro")
+
+def _tabela(engine) -> Table:
+    return Table("presencas_sessao", MetaData(), autoload_with=engine)
+
+def _indices(engine) -> set[str]:
+    return {indice["name"] for indice in inspect(engine).get_indexes("presencas_sessao")}
+
+def _prioridade(linha):
+    return (linha.status_presenca != "Ausente", linha.data_hora_checkin or datetime.min, linha.id)
+
+def remover_duplicatas(engine) -> int:
+    presencas = _tabela(engine)
+    with engine.connect() as conexao:
+        grupos = conexao.execute(
+            select(presencas.c.id_sessao, presencas.c.id_membro)
+            .where(presencas.c.id_membro.is_not(None))
+            .group_by(presencas.c.id_sessao, presencas.c.id_membro)
+            .having(func.count() > 1)
+        ).all()
+    removidas = 0
+    for id_sessao, id_membro in grupos:
+        with engine.begin() as conexao:
+            linhas = conexao.execute(
+                select(presencas.c.id, presencas.c.status_presenca, presencas.c.data_hora_checkin)
+                .where(presencas.c.id_sessao == id_sessao, presencas.c.id_membro == id_membro)
+            ).all()
+            mantida = max(linhas, key=_prioridade)
+            descartadas = [linha.id for linha in linhas if linha.id != mantida.id]
+            conexao.execute(delete(presencas).where(presencas.c.id.in_(descartadas)))
+            removidas += len(descartadas)
+    return removidas
+
+def upgrade():
+    for nome, engine in _engines().items():
+        if not inspect(engine).has_table("presencas_sessao"):
+            continue
+        removidas = remover_duplicatas(engine)
+        presencas = _tabela(engine)
+        indices = _indices(engine)
+        if NOME_INDICE_UNICO not in indices:
+            Index(NOME_INDICE_UNICO, *(presencas.c[coluna] for coluna in COLUNAS), unique=True).create(bind=engine)
+        if NOME_INDICE_SIMPLES in indices:
+            Index(NOME_INDICE_SIMPLES, *(presencas.c[coluna] for coluna in COLUNAS)).drop(bind=engine)
+        print(f"[{nome}] duplicatas removidas: {removidas}; índice único {NOME_INDICE_UNICO} ativo.")
+
+def downgrade():
+    for nome, engine in _engines().items():
+        if not inspect(engine).has_table("presencas_sessao"):
+            continue
+        presencas = _tabela(engine)
+        indices = _indices(engine)
+        if NOME_INDICE_SIMPLES not in indices:
+            Index(NOME_INDICE_SIMPLES, *(presencas.c[coluna] for coluna in COLUNAS)).create(bind=engine)
+        if NOME_INDICE_UNICO in indices:
+            Index(NOME_INDICE_UNICO, *(presencas.c[coluna] for coluna in COLUNAS), unique=True).drop(bind=engine)
+        print(f"[{nome}] índice único removido; índice simples {NOME_INDICE_SIMPLES} restaurado.")
+
+def _engines():
+    from database.connection import engine
+    from database.sharding import SHARD_DIRETORIO, engines_shards
+    return {SHARD_DIRETORIO: engine, **engines_shards}
+
+if __name__ == "__main__":
+    if "--downgrade" in sys.argv:
+        downgrade()
+    else:
+        print("Removendo presenças duplicadas e criando o índice único de (sessão, membro)...")
+        upgrade()
+    print("Migração concluída.")
@@ -0,0 +1,39 @@
+# backend_python/database/migrations/versao_permissoes_cargos.py
+#
+# Versão de permissões por cargo (`cargos.versao_permissoes`), incrementada a cada alteração
+# nas permissões efetivas do cargo e comparada com o claim `pv` dos tokens com permissões embutidas.
+# Deve ser aplicada antes de `indice_bit_permissoes`, que incrementa essa coluna.
+# Tabela global: aplicado apenas ao banco diretório.
+# Uso: python -m database.migrations.versao_permissoes_cargos [--downgrade]
+
+import sys
+
+from sqlalchemy import inspect, text
+
+def tem_coluna(engine) -> bool:
+    return any(coluna["name"] == "versao_permissoes" for coluna in inspect(engine).get_columns("cargos"))
+
+def upgrade():
+    from database.connection import engine
+    if tem_coluna(engine):
+        print("Coluna 'cargos.versao_permissoes' já existe.")
+        return
+    with engine.begin() as conexao:
+        conexao.execute(text("ALTER TABLE cargos ADD COLUMN versao_permissoes INTEGER NOT NULL DEFAULT 1"))
+    print("Coluna 'cargos.versao_permissoes' criada.")
+
+def downgrade():
+    from database.connection import engine
+    if not tem_coluna(engine):
+        return
+    with engine.begin() as conexao:
+        conexao.execute(text("ALTER TABLE cargos DROP COLUMN versao_permissoes"))
+    print("Coluna 'cargos.versao_permissoes' removida.")
+
+if __name__ == "__main__":
+    if "--downgrade" in sys.argv:
+        downgrade()
+    else:
+        print("Adicionando a versão de permissões aos cargos...")
+        upgrade()
+    print("Migração concluída.")
@@ -0,0 +1,74 @@
+# backend_python/database/pool_monitor.py
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+class QueuePoolMonitorado(QueuePool):
+    """QueuePool que mede o tempo de espera por uma conexão livre e conta os timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metricas_lock = threading.Lock()
+        self.metricas = {
+            "checkouts": 0,
+            "checkins": 0,
+            "conexoes_abertas": 0,
+            "conexoes_invalidadas": 0,
+            "timeouts": 0,
+            "espera_total_ms": 0.0,
+            "espera_max_ms": 0.0,
+        }
+
+    def recreate(self):
+        # Mantém os contadores quando o pool é recriado (ex: após uma desconexão em massa)
+        novo = super().recreate()
+        novo.metricas, novo.metricas_lock = self.metricas, self.metricas_lock
+        return novo
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.incrementar("timeouts")
+            raise
+        finally:
+            espera_ms = (time.perf_counter() - inicio) * 1000
+            with self.metricas_lock:
+                self.metricas["espera_total_ms"] += espera_ms
+                self.metricas["espera_max_ms"] = max(self.metricas["espera_max_ms"], espera_ms)
+
+    def incrementar(self, contador: str):
+        with self.metricas_lock:
+            self.metricas[contador] += 1
+
+def registrar_eventos_pool(engine):
+    """Associa aos eventos do pool os contadores de checkout, checkin, conexões novas e invalidadas."""
+    contadores = {"checkout": "checkouts", "checkin": "checkins", "connect": "conexoes_abertas", "invalidate": "conexoes_invalidadas"}
+    for nome_evento, contador in contadores.items():
+        def _ouvinte(*_args, _contador=contador):
+            if isinstance(engine.pool, QueuePoolMonitorado):
+                engine.pool.incrementar(_contador)
+        event.listen(engine, nome_evento, _ouvinte)
+
+def obter_metricas_pool(engine) -> dict:
+    """Estado atual do pool (em uso, overflow) e contadores acumulados desde a inicialização."""
+    pool = engine.pool
+    metricas = {
+        "tamanho": pool.size(),
+        "em_uso": pool.checkedout(),
+        "ociosas": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "timeout_segundos": pool.timeout(),
+    }
+    if isinstance(pool, QueuePoolMonitorado):
+        with pool.metricas_lock:
+            acumuladas = dict(pool.metricas)
+        checkouts = acumuladas["checkouts"]
+        acumuladas["espera_media_ms"] = round(acumuladas["espera_total_ms"] / checkouts, 3) if checkouts else 0.0
+        metricas.update(acumuladas)
+    return metricas
@@ -0,0 +1,128 @@
+# backend_python/database/retry.py
+
+import functools
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from config.settings import config
+from utils.logger import logger
+
+# Códigos de erro que indicam conflito transitório entre transações: repetir a operação inteira resolve
+_ERROS_MYSQL = {1213: "deadlock", 1205: "timeout_bloqueio"}
+_ERROS_POSTGRES = {"40P01": "deadlock", "40001": "serializacao", "55P03": "timeout_bloqueio"}
+
+_metricas_lock = threading.Lock()
+_metricas = defaultdict(lambda: {
+    "execucoes": 0, "repeticoes": 0, "sucessos_apos_repeticao": 0, "esgotadas": 0,
+    "por_tipo": defaultdict(int),
+})
+
+def classificar_erro(erro: BaseException) -> Optional[str]:
+    """Retorna o tipo do conflito ('deadlock', 'timeout_bloqueio', 'serializacao') ou None se o erro não for repetível."""
+    if not isinstance(erro, DBAPIError) or erro.connection_invalidated:
+        return None
+    original = erro.orig
+    # PostgreSQL: psycopg2 expõe `pgcode`; psycopg 3 e asyncpg, `sqlstate`
+    codigo_pg = getattr(original, "pgcode", None) or getattr(original, "sqlstate", None)
+    if codigo_pg in _ERROS_POSTGRES:
+        return _ERROS_POSTGRES[codigo_pg]
+    # MySQL (pymysql/aiomysql/mysqlclient): o código numérico é o primeiro argumento
+    argumentos = getattr(original, "args", ())
+    if argumentos and isinstance(argumentos[0], int) and argumentos[0] in _ERROS_MYSQL:
+        return _ERROS_MYSQL[argumentos[0]]
+    # SQLite: escritores concorrentes recebem 'database is locked' após o busy timeout
+    if "database is locked" in str(original):
+        return "timeout_bloqueio"
+    return None
+
+def _espera_backoff(tentativa: int) -> float:
+    """Backoff exponencial com jitter total: um valor aleatório entre 0 e base * 2^(tentativa-1), limitado ao máximo."""
+    teto_ms = min(config.ESPERA_MAXIMA_REPETICAO_MS, config.ESPERA_BASE_REPETICAO_MS * 2 ** (tentativa - 1))
+    return random.uniform(0, teto_ms) / 1000
+
+def _sessao_dos_argumentos(args, kwargs) -> Session:
+    sessao = kwargs.get("db")
+    if sessao is None:
+        sessao = next((argumento for argumento in args if isinstance(argumento, Session)), None)
+    if sessao is None:
+        raise TypeError("A operação com repetição precisa receber a sessão (parâmetro 'db').")
+    return sessao
+
+def repetir_em_conflito(max_tentativas: Optional[int] = None):
+    """
+    Decorador para operações de escrita idempotentes: se a transação falhar por deadlock,
+    timeout de bloqueio ou falha de serialização, desfaz a transação da sessão e executa
+    a função de novo, com backoff exponencial e jitter, até `max_tentativas`
+    (padrão: DB_RETRY_MAX_ATTEMPTS). Esgotadas as tentativas, responde 503 com Retry-After
+    em vez de 500.
+
+    A função decorada deve fazer todas as leituras e escritas da transação e o commit:
+    tudo o que ela leu antes do conflito é descartado e relido. Chamadas aninhadas de funções
+    decoradas não repetem sozinhas; a mais externa repete a transação inteira.
+    """
+    def decorador(funcao):
+        nome = f"{funcao.__module__}.{funcao.__qualname__}"
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            db = _sessao_dos_argumentos(args, kwargs)
+            if db.info.get("repeticao_ativa"):
+                return funcao(*args, **kwargs)
+
+            limite = max_tentativas or config.MAX_TENTATIVAS_REPETICAO
+            db.info["repeticao_ativa"] = True
+            try:
+                for tentativa in range(1, limite + 1):
+                    try:
+                        resultado = funcao(*args, **kwargs)
+                    except DBAPIError as e:
+                        tipo = classificar_erro(e)
+                        if tipo is None:
+                            raise
+                        db.rollback()
+                        with _metricas_lock:
+                            _metricas[nome]["por_tipo"][tipo] += 1
+                            if tentativa == limite:
+                                _metricas[nome]["execucoes"] += 1
+                                _metricas[nome]["esgotadas"] += 1
+                            else:
+                                _metricas[nome]["repeticoes"] += 1
+                        if tentativa == limite:
+                            logger.error(f"[Retry] {nome}: {tipo} persistiu após {limite} tentativas.")
+                            raise HTTPException(
+                                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="O sistema está com alta concorrência nesta operação. Tente novamente em instantes.",
+                                headers={"Retry-After": "1"},
+                            ) from e
+                        espera = _espera_backoff(tentativa)
+                        logger.warning(f"[Retry] {nome}: {tipo} na tentativa {tentativa}/{limite}; repetindo em {espera * 1000:.0f} ms.")
+                        time.sleep(espera)
+                        continue
+                    with _metricas_lock:
+                        _metricas[nome]["execucoes"] += 1
+                        if tentativa > 1:
+                            _metricas[nome]["sucessos_apos_repeticao"] += 1
+                    return resultado
+            finally:
+                db.info.pop("repeticao_ativa", None)
+
+        return envoltorio
+    return decorador
+
+def obter_metricas() -> dict:
+    """Por operação: execuções, repetições, sucessos após repetição, tentativas esgotadas e conflitos por tipo."""
+    with _metricas_lock:
+        return {
+            "max_tentativas": config.MAX_TENTATIVAS_REPETICAO,
+            "operacoes": {
+                nome: {**valores, "por_tipo": dict(valores["por_tipo"])}
+                for nome, valores in _metricas.items()
+            },
+        }
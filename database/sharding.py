@@ -0,0 +1,84 @@
+# backend_python/database/sharding.py
+
+from sqlalchemy import create_engine, event
+
+from config.settings import config
+from database.connection import SessionLocal, engine
+from database.pool_monitor import QueuePoolMonitorado, registrar_eventos_pool
+from models import models
+
+# Nome reservado para o banco principal, que guarda as tabelas globais e as lojas não mapeadas
+SHARD_DIRETORIO = "diretorio"
+
+# Entidades globais: sempre lidas/escritas no banco diretório, qualquer que seja o shard da requisição
+ENTIDADES_GLOBAIS = [
+    "Potencia", "Loja", "Classe", "Cargo", "Permissao", "SuperAdministrador", "Webmaster",
+    "ChaveApi", "TokenRevogado", "MapaShard",
+    "cargos_permissoes", "cargos_heranca", "cargos_permissoes_efetivas",
+]
+
+def entidades_globais() -> list:
+    """Classes/tabelas globais existentes nesta versão dos modelos."""
+    return [getattr(models, nome) for nome in ENTIDADES_GLOBAIS if hasattr(models, nome)]
+
+def nomes_tabelas_globais() -> set[str]:
+    return {
+        entidade.name if hasattr(entidade, "name") else entidade.__tablename__
+        for entidade in entidades_globais()
+    }
+
+def _validar_ids_intercalados(nomes: set[str]):
+    passo, deslocamentos = config.PASSO_IDS_SHARDS, config.DESLOCAMENTOS_IDS_SHARDS
+    if passo <= 1:
+        return
+    if set(deslocamentos) != nomes:
+        raise ValueError(f"DB_SHARD_ID_OFFSETS deve definir um deslocamento para cada banco: {sorted(nomes)}.")
+    if len(set(deslocamentos.values())) != len(deslocamentos) or not all(1 <= d <= passo for d in deslocamentos.values()):
+        raise ValueError(f"Os deslocamentos de DB_SHARD_ID_OFFSETS devem ser distintos e estar entre 1 e {passo}.")
+
+def configurar_ids_intercalados(engine_banco, nome: str):
+    """
+    Ids globais: com DB_SHARD_ID_STRIDE > 1, cada banco (diretório e shards) gera auto_increment
+    apenas na sua própria sequência (passo, deslocamento). Uma loja movida entre shards mantém ids
+    que nenhum outro banco gera. As variáveis são de sessão no MySQL: aplicadas a cada conexão nova.
+    """
+    if config.PASSO_IDS_SHARDS <= 1 or engine_banco.dialect.name != "mysql":
+        return
+    comando = (
+        f"SET SESSION auto_increment_increment = {config.PASSO_IDS_SHARDS}, "
+        f"auto_increment_offset = {config.DESLOCAMENTOS_IDS_SHARDS[nome]}"
+    )
+
+    @event.listens_for(engine_banco, "connect")
+    def _definir_incremento(conexao_dbapi, _registro):
+        cursor = conexao_dbapi.cursor()
+        cursor.execute(comando)
+        cursor.close()
+
+if SHARD_DIRETORIO in config.SHARDS_BANCO_DE_DADOS:
+    raise ValueError(f"'{SHARD_DIRETORIO}' é reservado para o banco principal e não pode nomear um shard.")
+_validar_ids_intercalados({SHARD_DIRETORIO, *config.SHARDS_BANCO_DE_DADOS})
+
+engines_shards = {
+    nome: create_engine(url, poolclass=QueuePoolMonitorado, **config.PARAMETROS_POOL)
+    for nome, url in config.SHARDS_BANCO_DE_DADOS.items()
+}
+for _nome_shard, _engine_shard in engines_shards.items():
+    registrar_eventos_pool(_engine_shard)
+    configurar_ids_intercalados(_engine_shard, _nome_shard)
+configurar_ids_intercalados(engine, SHARD_DIRETORIO)
+
+if config.SHARD_PADRAO and config.SHARD_PADRAO not in engines_shards:
+    raise ValueError(f"DB_DEFAULT_SHARD '{config.SHARD_PADRAO}' não está em DB_SHARDS.")
+
+def shard_da_sessao(db) -> str:
+    """Shard para o qual a sessão foi apontada por `selecionar_shard` (o diretório, se nenhum)."""
+    return db.info.get("shard", SHARD_DIRETORIO)
+
+def engine_do_shard(nome: str):
+    """Engine síncrono do shard (o banco principal para SHARD_DIRETORIO)."""
+    return engine if nome == SHARD_DIRETORIO else engines_shards[nome]
+
+# As tabelas globais ficam presas ao diretório; as demais seguem o `bind` da sessão,
+# que é trocado para o engine do shard quando a loja da requisição é identificada.
+SessionLocal.configure(binds={entidade: engine for entidade in entidades_globais()})
@@ -0,0 +1,193 @@
+# backend_python/database/slow_query_monitor.py
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from config.settings import config
+from utils.logger import logger, slow_query_logger
+from utils.request_context import observar_consultas
+from utils.sql_utils import normalizar_sql
+
+# Amostras mais recentes de duração guardadas por assinatura (base dos percentis)
+AMOSTRAS_POR_ASSINATURA = 512
+# EXPLAINs aguardando execução além dos quais novos pedidos são descartados
+MAX_EXPLAINS_PENDENTES = 4
+# Módulos da aplicação considerados ao procurar quem originou a consulta, em ordem de preferência
+_PREFIXOS_CHAMADOR = ("services.", "controllers.", "middleware.")
+
+class EstatisticaAssinatura:
+    """Contadores e amostras de duração de uma consulta normalizada."""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.execucoes = 0
+        self.lentas = 0
+        self.tempo_total = 0.0
+        self.tempo_max = 0.0
+        self.amostras = deque(maxlen=AMOSTRAS_POR_ASSINATURA)
+        self.ultimo_plano = None
+        self.ultimo_explain = 0.0
+
+_estatisticas: dict[str, EstatisticaAssinatura] = {}
+_lock = threading.Lock()
+_metricas = {"assinaturas_descartadas": 0, "consultas_lentas": 0, "explains_executados": 0, "explains_ignorados": 0, "explains_com_erro": 0}
+# Uma única thread: os EXPLAINs nunca competem entre si nem ocupam mais de uma conexão
+_executor_explain = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+_explains_pendentes = 0
+
+@lru_cache(maxsize=4096)
+def _assinatura(instrucao: str) -> tuple[str, str]:
+    # As instruções geradas pelo SQLAlchemy se repetem (cache de compilação); a normalização também
+    sql = normalizar_sql(instrucao)
+    return hashlib.blake2b(sql.encode(), digest_size=8).hexdigest(), sql
+
+def _formato_parametros(parametros, executemany: bool):
+    """Descreve os parâmetros só pelos tipos, sem expor valores (e-mails, senhas, CIMs) no log."""
+    if executemany:
+        lista = list(parametros or [])
+        return {"lote": len(lista), "item": _formato_parametros(lista[0], False) if lista else None}
+    if isinstance(parametros, dict):
+        return {chave: type(valor).__name__ for chave, valor in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [type(valor).__name__ for valor in parametros]
+    return type(parametros).__name__
+
+def _chamador() -> str:
+    """Primeira função de serviço (ou, na falta, de controlador/middleware) na pilha de chamadas."""
+    encontrados = {}
+    quadro = sys._getframe(2)
+    while quadro is not None:
+        modulo = quadro.f_globals.get("__name__", "")
+        for prefixo in _PREFIXOS_CHAMADOR:
+            if modulo.startswith(prefixo) and prefixo not in encontrados:
+                encontrados[prefixo] = f"{modulo}.{quadro.f_code.co_name}"
+        if _PREFIXOS_CHAMADOR[0] in encontrados:
+            break
+        quadro = quadro.f_back
+    return next((encontrados[prefixo] for prefixo in _PREFIXOS_CHAMADOR if prefixo in encontrados), "desconhecido")
+
+def _executar_explain(engine, assinatura: str, instrucao: str, parametros, id_requisicao):
+    global _explains_pendentes
+    prefixo = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        with engine.connect() as conexao:
+            plano = [list(linha) for linha in conexao.exec_driver_sql(prefixo + instrucao, parametros).all()]
+        with _lock:
+            _estatisticas[assinatura].ultimo_plano = plano
+            _metricas["explains_executados"] += 1
+        slow_query_logger.info(json.dumps(
+            {"tipo": "explain", "assinatura": assinatura, "id_requisicao": id_requisicao, "plano": plano},
+            ensure_ascii=False, default=str,
+        ))
+    except Exception as e:
+        with _lock:
+            _metricas["explains_com_erro"] += 1
+        logger.warning(f"[SlowQuery] Falha no EXPLAIN da consulta {assinatura}: {e}")
+    finally:
+        with _lock:
+            _explains_pendentes -= 1
+
+def _agendar_explain(conn, estatistica: EstatisticaAssinatura, assinatura: str, instrucao: str, parametros, executemany, contexto):
+    """Agenda o EXPLAIN de uma consulta lenta, no máximo uma vez por intervalo para cada assinatura."""
+    global _explains_pendentes
+    agora = time.monotonic()
+    # Só leituras: um EXPLAIN de DML pode bloquear linhas; os engines assíncronos não aceitam uso síncrono fora do loop
+    if executemany or conn.dialect.is_async or not instrucao.lstrip().upper().startswith(("SELECT", "WITH")):
+        return
+    with _lock:
+        if agora - estatistica.ultimo_explain < config.INTERVALO_EXPLAIN_CONSULTA_LENTA:
+            return
+        if _explains_pendentes >= MAX_EXPLAINS_PENDENTES:
+            _metricas["explains_ignorados"] += 1
+            return
+        estatistica.ultimo_explain = agora
+        _explains_pendentes += 1
+    id_requisicao = contexto.id_requisicao if contexto is not None else None
+    _executor_explain.submit(_executar_explain, conn.engine, assinatura, instrucao, parametros, id_requisicao)
+
+def _observar_consulta(conn, instrucao: str, parametros, executemany: bool, duracao: float, contexto):
+    if instrucao.startswith("EXPLAIN"):
+        return
+    assinatura, sql = _assinatura(instrucao)
+    lenta = duracao * 1000 >= config.LIMIAR_CONSULTA_LENTA_MS
+    with _lock:
+        if lenta:
+            _metricas["consultas_lentas"] += 1
+        estatistica = _estatisticas.get(assinatura)
+        if estatistica is None:
+            if len(_estatisticas) < config.MAX_ASSINATURAS_CONSULTAS:
+                estatistica = _estatisticas[assinatura] = EstatisticaAssinatura(sql)
+            else:
+                # Sem estatísticas para a assinatura nova, mas uma consulta lenta continua sendo registrada
+                _metricas["assinaturas_descartadas"] += 1
+        if estatistica is not None:
+            estatistica.execucoes += 1
+            estatistica.tempo_total += duracao
+            estatistica.tempo_max = max(estatistica.tempo_max, duracao)
+            estatistica.amostras.append(duracao)
+            if lenta:
+                estatistica.lentas += 1
+    if not lenta:
+        return
+
+    slow_query_logger.info(json.dumps({
+        "tipo": "consulta_lenta",
+        "assinatura": assinatura,
+        "duracao_ms": round(duracao * 1000, 1),
+        "sql": sql,
+        "parametros": _formato_parametros(parametros, executemany),
+        "chamador": _chamador(),
+        "id_loja": contexto.id_loja if contexto is not None else None,
+        "rota": f"{contexto.metodo} {contexto.caminho}" if contexto is not None else None,
+        "id_requisicao": contexto.id_requisicao if contexto is not None else None,
+        "banco": f"{conn.engine.dialect.name}:{conn.engine.url.database}",
+    }, ensure_ascii=False))
+    # O intervalo entre EXPLAINs é controlado pela estatística: assinaturas não acompanhadas ficam sem plano
+    if estatistica is not None:
+        _agendar_explain(conn, estatistica, assinatura, instrucao, parametros, executemany, contexto)
+
+def _percentil(valores: list, fracao: float) -> float:
+    return valores[min(len(valores) - 1, int(fracao * len(valores)))]
+
+def obter_metricas(limite: int = 50, ordenar_por: str = "tempo_total") -> dict:
+    """Estatísticas por consulta normalizada (execuções, p50, p99, máximo, lentas e o último plano)."""
+    with _lock:
+        copia = [
+            (assinatura, estatistica, sorted(estatistica.amostras))
+            for assinatura, estatistica in _estatisticas.items()
+        ]
+        metricas = dict(_metricas)
+    consultas = [
+        {
+            "assinatura": assinatura,
+            "sql": estatistica.sql,
+            "execucoes": estatistica.execucoes,
+            "lentas": estatistica.lentas,
+            "tempo_total_ms": round(estatistica.tempo_total * 1000, 1),
+            "p50_ms": round(_percentil(amostras, 0.50) * 1000, 2) if amostras else None,
+            "p99_ms": round(_percentil(amostras, 0.99) * 1000, 2) if amostras else None,
+            "max_ms": round(estatistica.tempo_max * 1000, 2),
+            "ultimo_plano": estatistica.ultimo_plano,
+        }
+        for assinatura, estatistica, amostras in copia
+    ]
+    chave = {"tempo_total": "tempo_total_ms", "p99": "p99_ms", "execucoes": "execucoes", "lentas": "lentas"}[ordenar_por]
+    consultas.sort(key=lambda consulta: consulta[chave] or 0, reverse=True)
+    return {
+        "limiar_ms": config.LIMIAR_CONSULTA_LENTA_MS,
+        "assinaturas": len(copia),
+        **metricas,
+        "consultas": consultas[:limite],
+    }
+
+def encerrar():
+    """Descarta os EXPLAINs pendentes e encerra a thread (chamado no encerramento da aplicação)."""
+    _executor_explain.shutdown(wait=False, cancel_futures=True)
+
+observar_consultas(_observar_consulta)
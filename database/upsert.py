@@ -0,0 +1,54 @@
+# backend_python/database/upsert.py
+
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Dialetos com INSERT ... ON CONFLICT (índice único informado explicitamente) e RETURNING
+_ON_CONFLICT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def _dialeto(db: Session, modelo) -> str:
+    # O engine depende do shard selecionado para a requisição
+    return db.get_bind(mapper=modelo).dialect.name
+
+def upsert(db: Session, modelo, valores: dict, chaves: list[str], atualizar: dict) -> int:
+    """
+    Insere uma linha de `modelo` ou, se já existir uma com os mesmos valores nas colunas `chaves`
+    (cobertas por um índice único), aplica `atualizar` nela. Um único comando, seguro sob concorrência.
+    Retorna o id da linha inserida ou atualizada. Não faz commit.
+    """
+    tabela = modelo.__table__
+    dialeto = _dialeto(db, modelo)
+    if dialeto == "mysql":
+        # LAST_INSERT_ID(id) faz o id da linha atualizada aparecer como lastrowid, como numa inserção
+        comando = mysql.insert(tabela).values(**valores)
+        comando = comando.on_duplicate_key_update(**atualizar, id=func.last_insert_id(tabela.c.id))
+        return db.execute(comando).lastrowid
+    if dialeto in _ON_CONFLICT:
+        comando = _ON_CONFLICT[dialeto](tabela).values(**valores)
+        comando = comando.on_conflict_do_update(index_elements=chaves, set_=atualizar).returning(tabela.c.id)
+        return db.execute(comando).scalar_one()
+    raise NotImplementedError(f"Upsert não suportado para o dialeto '{dialeto}'.")
+
+def upsert_em_massa(db: Session, modelo, linhas: list[dict], chaves: list[str], colunas_atualizar: list[str]) -> int:
+    """
+    Versão em lote de `upsert`: um único INSERT de várias linhas em que, para as que já existem,
+    as `colunas_atualizar` recebem os valores enviados. Retorna quantas linhas foram enviadas.
+    """
+    if not linhas:
+        return 0
+    tabela = modelo.__table__
+    dialeto = _dialeto(db, modelo)
+    if dialeto == "mysql":
+        comando = mysql.insert(tabela).values(linhas)
+        comando = comando.on_duplicate_key_update({coluna: comando.inserted[coluna] for coluna in colunas_atualizar})
+    elif dialeto in _ON_CONFLICT:
+        comando = _ON_CONFLICT[dialeto](tabela).values(linhas)
+        comando = comando.on_conflict_do_update(
+            index_elements=chaves, set_={coluna: comando.excluded[coluna] for coluna in colunas_atualizar}
+        )
+    else:
+        raise NotImplementedError(f"Upsert não suportado para o dialeto '{dialeto}'.")
+    db.execute(comando)
+    # O rowcount do MySQL conta 2 por linha atualizada; o número de linhas enviadas é o que importa ao chamador
+    return len(linhas)
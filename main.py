@@ -1,9 +1,13 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from database.connection import engine, Base
+from database.async_connection import encerrar_engine_async
+from database import slow_query_monitor
 from config.settings import config
 from utils.logger import logger
+from services import password_service, checkin_buffer_service, token_revocation_service
 
 # Importação dos roteadores globais
 from controllers.global_controllers import (
@@ -16,7 +20,9 @@ from controllers.global_controllers import (
     role_permission_controller,
     loja_externa_controller,
     visitante_controller,
-    checkin_controller # Novo
+    checkin_controller, # Novo
+    metrics_controller,
+    api_key_controller
 )
 
 # Importação dos roteadores de tenant
@@ -43,9 +49,19 @@ async def lifespan(app: FastAPI):
     # O Alembic agora é a fonte da verdade para a estrutura do banco de dados.
     # A linha abaixo pode ser mantida para desenvolvimento inicial, mas não cria mais tabelas.
     # Base.metadata.create_all(bind=engine)
+    await password_service.calibrar_custo()
+    checkin_buffer_service.iniciar()
+    # Carga inicial das revogações e manutenção periódica (descarte das expiradas) fora das requisições
+    await asyncio.to_thread(token_revocation_service.iniciar)
     logger.info("Aplicação iniciada. Banco de dados gerenciado pelo Alembic.")
     yield
     logger.info("Finalizando a aplicação...")
+    # Antes de liberar os engines: os check-ins em buffer ainda precisam do banco
+    checkin_buffer_service.encerrar()
+    token_revocation_service.encerrar()
+    password_service.encerrar_pool()
+    await encerrar_engine_async()
+    slow_query_monitor.encerrar()
 
 # --- Instância Principal do FastAPI ---
 app = FastAPI(
@@ -68,8 +84,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-DB-Checkouts", "Server-Timing", "X-Linhas-Alteradas"],
 )
 
+# --- Contexto por Requisição (diagnóstico de pool, SQL e log de acesso) ---
+from middleware.request_context_middleware import RequestContextMiddleware
+
+app.add_middleware(RequestContextMiddleware)
+
 # --- Inclusão de Roteadores Globais ---
 app.include_router(super_admin_controller.router, prefix="/api/global/superadmins", tags=["Global - Super Admins"])
 app.include_router(lodge_class_controller.router, prefix="/api/global/lodge-classes", tags=["Global - Classes de Loja"])
@@ -81,6 +103,8 @@ app.include_router(role_permission_controller.router, prefix="/associacoes_cargo
 app.include_router(loja_externa_controller.router, prefix="/api/global/lojas-externas", tags=["Global - Lojas Externas"])
 app.include_router(visitante_controller.router, prefix="/api/global/visitantes", tags=["Global - Visitantes"])
 app.include_router(checkin_controller.router, prefix="/api", tags=["Check-in"]) # Novo
+app.include_router(api_key_controller.router, prefix="/api/global/api-keys", tags=["Global - Chaves de API"])
+app.include_router(metrics_controller.router, prefix="/api/global/metrics", tags=["Global - Métricas"])
 
 # --- Inclusão de Roteadores de Tenant ---
 app.include_router(auth_controller.router, prefix="/api/tenant/auth", tags=["Tenant - Autenticação"])
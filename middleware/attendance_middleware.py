@@ -1,11 +1,12 @@
 # backend_python/middleware/attendance_middleware.py
 
-from fastapi import Request, HTTPException, status
-from datetime import datetime, timedelta
+from fastapi import Depends, Request, HTTPException, status
+from sqlalchemy.orm import Session
 from services import sessao_maconica_service
-from database import connection
+from database.connection import get_db
+from middleware.tenant_middleware import get_current_tenant
 
-async def check_attendance_window(request: Request):
+def check_attendance_window(request: Request, db: Session = Depends(get_db)):
     # This is a simplified example. A more robust solution should be implemented.
     # This middleware should be applied to the routes that register attendance.
     
@@ -14,20 +15,15 @@ async def check_attendance_window(request: Request):
     if not sessao_id:
         return
 
-    db = connection.SessionLocal()
-    try:
-        sessao = sessao_maconica_service.get_sessao(db, sessao_id)
-        if not sessao:
-            return
-
-        now = datetime.now()
-        start_time = sessao.data_sessao - timedelta(hours=2)
-        end_time = sessao.data_sessao + timedelta(hours=2)
+    # Usa a mesma sessão da requisição (get_db é resolvido uma única vez por requisição), já apontada
+    # para o shard do tenant: esta dependência roda antes dos parâmetros do endpoint
+    get_current_tenant(request, request.headers.get("x-lodge-code"), db)
+    sessao = sessao_maconica_service.get_sessao(db, sessao_id)
+    if not sessao:
+        return
 
-        if not (start_time <= now <= end_time):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Fora da janela de tempo para registro de presença."
-            )
-    finally:
-        db.close()
+    if not sessao_maconica_service.dentro_da_janela_presenca(sessao.data_sessao):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Fora da janela de tempo para registro de presença."
+        )
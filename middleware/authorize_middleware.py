@@ -1,53 +1,314 @@
 # backend_python/middleware/authorize_middleware.py
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+import hashlib
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer, APIKeyHeader
 from jose import JWTError, jwt
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from config.settings import config
 from database.connection import get_db
+from database.async_connection import get_async_db
+from database.sharding import SHARD_DIRETORIO, shard_da_sessao
 from models.models import SuperAdministrador, Webmaster, MembroLoja
+from utils.cache_utils import CacheLRUTTL
+from services.authorization_service import motor_rbac, obter_cargo_da_associacao
+from services.api_key_service import autenticar_chave_api
+from services.token_revocation_service import token_revogado
+from services.shard_service import selecionar_shard, selecionar_shard_async
+from middleware.tenant_middleware import get_current_tenant, get_current_tenant_async
+
+# Define os esquemas de autenticação: token JWT (Bearer) ou chave de API para integrações
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/global/superadmins/login", auto_error=False)
+api_key_scheme = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+# Perfil -> (modelo, claim do token que carrega o ID do usuário)
+PERFIS_USUARIO = {
+    "super_admin": (SuperAdministrador, "superadmin_id"),
+    "webmaster": (Webmaster, "webmaster_id"),
+    "lodge_member": (MembroLoja, "lodgeMemberId"),
+}
+
+# Caches do caminho rápido de autenticação:
+# - tokens decodificados, indexados pelo hash SHA-256 do token;
+# - "snapshots" dos usuários, indexados por (perfil, shard, id): os ids de membros só são
+#   únicos dentro do shard da loja.
+cache_tokens = CacheLRUTTL("tokens", config.TAMANHO_CACHE_AUTENTICACAO, config.TTL_CACHE_AUTENTICACAO)
+cache_usuarios = CacheLRUTTL("usuarios", config.TAMANHO_CACHE_AUTENTICACAO, config.TTL_CACHE_AUTENTICACAO)
+
+def _criar_snapshot(usuario) -> SimpleNamespace:
+    """Copia as colunas do usuário para um objeto leve, desvinculado da sessão."""
+    colunas = inspect(usuario).mapper.column_attrs
+    return SimpleNamespace(**{coluna.key: getattr(usuario, coluna.key) for coluna in colunas})
+
+def _decodificar_token(token: str) -> dict:
+    """Decodifica o token JWT, reaproveitando o resultado enquanto ele estiver em cache."""
+    chave = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = cache_tokens.obter(chave)
+    if payload is None:
+        # CORRIGIDO: Usa o algoritmo "HS256" diretamente
+        payload = jwt.decode(token, config.SEGREDO_JWT, algorithms=["HS256"])
+        expira_em = payload.get("exp")
+        ttl = expira_em - time.time() if expira_em else None
+        cache_tokens.definir(chave, payload, ttl)
+    return payload
 
-# Define o esquema de autenticação
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/global/superadmins/login")
+def _carregar_usuario(db: Session, perfil: str, user_id):
+    """Retorna o snapshot do usuário, consultando o banco apenas em caso de falha no cache."""
+    chave = (perfil, shard_da_sessao(db), user_id)
+    usuario = cache_usuarios.obter(chave)
+    if usuario is None:
+        modelo, _ = PERFIS_USUARIO[perfil]
+        registro = db.query(modelo).filter(modelo.id == user_id).first()
+        if registro is None:
+            return None
+        usuario = _criar_snapshot(registro)
+        cache_usuarios.definir(chave, usuario)
+    return usuario
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def _carregar_usuario_async(db: AsyncSession, perfil: str, user_id):
+    """Equivalente assíncrono de `_carregar_usuario`."""
+    chave = (perfil, shard_da_sessao(db), user_id)
+    usuario = cache_usuarios.obter(chave)
+    if usuario is None:
+        modelo, _ = PERFIS_USUARIO[perfil]
+        registro = (await db.execute(select(modelo).where(modelo.id == user_id))).scalars().first()
+        if registro is None:
+            return None
+        usuario = _criar_snapshot(registro)
+        cache_usuarios.definir(chave, usuario)
+    return usuario
+
+def invalidar_usuario_em_cache(perfil: str, user_id: int, shard: str = SHARD_DIRETORIO):
+    """
+    Descarta o snapshot de um usuário alterado, desativado ou removido.
+    Membros de loja devem informar o shard da sessão que fez a alteração (`shard_da_sessao`).
+    """
+    cache_usuarios.invalidar((perfil, shard, user_id))
+
+def obter_metricas_cache_autenticacao() -> dict:
+    """Retorna os contadores de acertos/falhas dos caches de autenticação."""
+    return {"tokens": cache_tokens.metricas(), "usuarios": cache_usuarios.metricas()}
+
+def get_current_user(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
     """
     Decodifica o token JWT para obter o usuário atual.
     Esta função é uma dependência que pode ser usada em qualquer endpoint protegido.
+    Chaves de API não são aceitas aqui: elas só passam por `has_permission`, que sempre verifica
+    a loja e os escopos da chave.
+    Tokens e usuários ficam em cache por um curto período para evitar uma consulta por requisição.
+    Por usar a sessão síncrona, é executada no threadpool; endpoints assíncronos usam `get_current_user_async`.
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Não foi possível validar as credenciais",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    credentials_exception = _erro_credenciais()
+    if not token:
+        raise credentials_exception
 
     try:
-        # CORRIGIDO: Usa o algoritmo "HS256" diretamente
-        payload = jwt.decode(token, config.SEGREDO_JWT, algorithms=["HS256"])
+        payload = _decodificar_token(token)
         perfil: str = payload.get("perfil")
-        if perfil is None:
+        if perfil not in PERFIS_USUARIO:
+            raise credentials_exception
+        # Verificado também para tokens vindos do cache, que não passam pela decodificação
+        if token_revogado(db, payload):
             raise credentials_exception
+        if perfil == "lodge_member":
+            # Membros ficam no shard da loja do token
+            selecionar_shard(db, payload.get("lodgeId"))
+
+        _, claim_id = PERFIS_USUARIO[perfil]
+        user = _carregar_usuario(db, perfil, payload.get(claim_id))
+        if user is None:
+            raise credentials_exception
+
+        return {"perfil": perfil, "user": user, "claims": payload}
 
-        user_data = {"perfil": perfil}
-        if perfil == "super_admin":
-            user_id = payload.get("superadmin_id")
-            user = db.query(SuperAdministrador).filter(SuperAdministrador.id == user_id).first()
-        elif perfil == "webmaster":
-            user_id = payload.get("webmaster_id")
-            user = db.query(Webmaster).filter(Webmaster.id == user_id).first()
-        elif perfil == "lodge_member":
-            user_id = payload.get("lodgeMemberId")
-            user = db.query(MembroLoja).filter(MembroLoja.id == user_id).first()
-        else:
+    except JWTError:
+        raise credentials_exception
+
+async def get_current_user_async(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Equivalente de `get_current_user` para endpoints que usam a sessão assíncrona.
+    Falhas de cache consultam o banco sem bloquear o event loop.
+    """
+    credentials_exception = _erro_credenciais()
+    if not token:
+        raise credentials_exception
+
+    try:
+        payload = _decodificar_token(token)
+        perfil: str = payload.get("perfil")
+        if perfil not in PERFIS_USUARIO:
             raise credentials_exception
+        if await db.run_sync(token_revogado, payload):
+            raise credentials_exception
+        if perfil == "lodge_member":
+            await selecionar_shard_async(db, payload.get("lodgeId"))
 
+        _, claim_id = PERFIS_USUARIO[perfil]
+        user = await _carregar_usuario_async(db, perfil, payload.get(claim_id))
         if user is None:
             raise credentials_exception
-        
-        user_data["user"] = user
-        return user_data
+
+        return {"perfil": perfil, "user": user, "claims": payload}
 
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+def _usuario_ou_chave_api(
+    token: Optional[str] = Depends(oauth2_scheme),
+    api_key: Optional[str] = Depends(api_key_scheme),
+    db: Session = Depends(get_db)
+) -> dict:
+    """
+    Usuário do token JWT ou, sem token, a chave de API do cabeçalho 'X-API-Key'.
+    Uso exclusivo de `has_permission`, que verifica a loja e os escopos da chave.
+    """
+    if token:
+        return get_current_user(token, db)
+    chave = autenticar_chave_api(db, api_key) if api_key else None
+    if chave is None:
+        raise _erro_credenciais()
+    return {"perfil": "api_key", "user": chave, "claims": {"lodgeId": chave.id_loja}}
+
+async def _usuario_ou_chave_api_async(
+    token: Optional[str] = Depends(oauth2_scheme),
+    api_key: Optional[str] = Depends(api_key_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> dict:
+    """Equivalente assíncrono de `_usuario_ou_chave_api`."""
+    if token:
+        return await get_current_user_async(token, db)
+    chave = await db.run_sync(autenticar_chave_api, api_key) if api_key else None
+    if chave is None:
+        raise _erro_credenciais()
+    return {"perfil": "api_key", "user": chave, "claims": {"lodgeId": chave.id_loja}}
+
+def _erro_credenciais() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Não foi possível validar as credenciais",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+# Perfis administrativos que não passam pela verificação de cargo
+PERFIS_COM_ACESSO_TOTAL = {"super_admin", "webmaster"}
+
+def _loja_do_parametro(request: Request) -> Optional[int]:
+    """`loja_id` informado na rota ou na query string (rotas globais que recebem a loja como parâmetro)."""
+    valor = request.path_params.get("loja_id") or request.query_params.get("loja_id")
+    if valor is None:
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parâmetro 'loja_id' inválido.")
+
+def _loja_da_requisicao(request: Request, db: Session) -> int:
+    """Loja alvo da requisição: o `loja_id` da rota ou o tenant resolvido pelo 'x-lodge-code' / 'Host'."""
+    id_loja = _loja_do_parametro(request)
+    if id_loja is None:
+        id_loja = get_current_tenant(request, request.headers.get("x-lodge-code"), db).id
+    return id_loja
+
+async def _loja_da_requisicao_async(request: Request, db: AsyncSession) -> int:
+    """Equivalente assíncrono de `_loja_da_requisicao`."""
+    id_loja = _loja_do_parametro(request)
+    if id_loja is None:
+        id_loja = (await get_current_tenant_async(request, request.headers.get("x-lodge-code"), db)).id
+    return id_loja
+
+def _avaliar_permissao(db: Session, acoes: list[str], current_user: dict, id_loja: Optional[int] = None) -> dict:
+    """
+    Decide se o usuário possui todas as `acoes`; levanta 401/403 caso contrário.
+    `id_loja` é a loja alvo da requisição, exigida para chaves de API.
+    """
+    if current_user["perfil"] in PERFIS_COM_ACESSO_TOTAL:
+        return current_user
+    if current_user["perfil"] == "api_key":
+        # Chaves de API valem apenas para a loja para a qual foram emitidas...
+        if id_loja is None or current_user["user"].id_loja != id_loja:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado. A chave de API não pertence a esta loja."
+            )
+        # ...e são limitadas aos escopos concedidos na criação
+        if not set(acoes) <= current_user["user"].escopos:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado. Escopo da chave de API insuficiente."
+            )
+        return current_user
+
+    motor_rbac.garantir_carregado(db)
+    claims = current_user["claims"]
+    mascara = motor_rbac.mascara(acoes)
+
+    if "pv" in claims:
+        # Token com permissões embutidas: vale enquanto o membro ainda ocupar o cargo do token
+        # (consulta em cache) e a versão de permissões desse cargo não for mais nova que a do token.
+        if obter_cargo_da_associacao(db, claims.get("associationId")) != claims.get("cargo"):
+            raise _erro_permissoes_desatualizadas()
+        versao_local = motor_rbac.versao(claims.get("cargo"))
+        if versao_local is None or claims["pv"] > versao_local:
+            # Token emitido por um worker que já recarregou a tabela: a desatualizada é a deste processo
+            motor_rbac.carregar(db)
+            versao_local = motor_rbac.versao(claims.get("cargo"))
+        if versao_local is None or claims["pv"] < versao_local:
+            raise _erro_permissoes_desatualizadas()
+        permitido = mascara is not None and (int(claims["perms"], 16) & mascara) == mascara
+    else:
+        id_cargo = obter_cargo_da_associacao(db, claims.get("associationId"))
+        permitido = motor_rbac.permite(id_cargo, mascara)
+
+    if not permitido:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado. Permissão insuficiente para realizar esta ação."
+        )
+    return current_user
+
+def _erro_permissoes_desatualizadas() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="As permissões do token estão desatualizadas. Renove o token.",
+        headers={"WWW-Authenticate": 'Bearer error="invalid_token"'},
+    )
+
+def has_permission(acoes: list[str]):
+    """
+    Fábrica de dependências que exige que o usuário possua todas as `acoes` informadas.
+    A decisão é um teste de máscara sobre a tabela RBAC compilada em memória.
+    """
+    def verificar_permissao(
+        request: Request,
+        current_user: dict = Depends(_usuario_ou_chave_api),
+        db: Session = Depends(get_db)
+    ) -> dict:
+        id_loja = _loja_da_requisicao(request, db) if current_user["perfil"] == "api_key" else None
+        return _avaliar_permissao(db, acoes, current_user, id_loja)
+
+    return verificar_permissao
+
+def has_permission_async(acoes: list[str]):
+    """Equivalente de `has_permission` para endpoints que usam a sessão assíncrona."""
+    async def verificar_permissao(
+        request: Request,
+        current_user: dict = Depends(_usuario_ou_chave_api_async),
+        db: AsyncSession = Depends(get_async_db)
+    ) -> dict:
+        id_loja = await _loja_da_requisicao_async(request, db) if current_user["perfil"] == "api_key" else None
+        return await db.run_sync(_avaliar_permissao, acoes, current_user, id_loja)
+
+    return verificar_permissao
@@ -0,0 +1,87 @@
+# backend_python/middleware/request_context_middleware.py
+
+import hashlib
+import time
+import uuid
+
+from config.settings import config
+from database.connection import engine, engines_replicas
+from database.sharding import engines_shards
+from utils.logger import logger
+from utils.request_context import ContextoRequisicao, contexto_requisicao, instrumentar_engine
+
+for _engine in (engine, *engines_replicas, *engines_shards.values()):
+    instrumentar_engine(_engine)
+
+def _chave_aderencia(cabecalhos: dict, scope) -> str:
+    """Deriva uma chave estável do cliente: a credencial enviada (hash) ou, na falta dela, o IP."""
+    credencial = cabecalhos.get(b"authorization") or cabecalhos.get(b"x-api-key")
+    if credencial:
+        return hashlib.sha256(credencial).hexdigest()
+    cliente = scope.get("client")
+    return f"ip:{cliente[0]}" if cliente else "desconhecido"
+
+def _server_timing(contexto: ContextoRequisicao, duracao_ms: float) -> str:
+    """Cabeçalho Server-Timing (exibido pelo DevTools do navegador) com o tempo em SQL e o total."""
+    return (
+        f'db;dur={contexto.tempo_sql * 1000:.1f};desc="SQL ({contexto.consultas_sql} consultas)", '
+        f"app;dur={duracao_ms:.1f}"
+    )
+
+def _registrar_instrucoes(contexto: ContextoRequisicao):
+    """Dump das instruções normalizadas da requisição, das mais repetidas (candidatas a N+1) às únicas."""
+    linhas = [
+        f"  {execucoes:>4}x {segundos * 1000:>8.1f} ms  {instrucao}"
+        for instrucao, (execucoes, segundos) in sorted(
+            contexto.instrucoes_sql.items(), key=lambda item: (-item[1][0], -item[1][1])
+        )
+    ]
+    logger.info(f"[SQL] {contexto.metodo} {contexto.caminho} (id: {contexto.id_requisicao})\n" + "\n".join(linhas))
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI que cria o contexto de cada requisição e expõe, nos cabeçalhos
+    'X-DB-Checkouts' e 'Server-Timing' e no log de acesso, quantas conexões foram retiradas
+    do pool, quantas instruções SQL foram executadas e quanto tempo foi gasto nelas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cabecalhos = dict(scope.get("headers") or [])
+        id_requisicao = cabecalhos.get(b"x-request-id", b"").decode("latin-1") or uuid.uuid4().hex
+        contexto = ContextoRequisicao(
+            id_requisicao=id_requisicao,
+            metodo=scope["method"],
+            caminho=scope["path"],
+            chave_aderencia=_chave_aderencia(cabecalhos, scope),
+            instrucoes_sql={} if config.REGISTRAR_INSTRUCOES_SQL else None,
+        )
+        token = contexto_requisicao.set(contexto)
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                duracao_ms = (time.perf_counter() - contexto.inicio) * 1000
+                cabecalhos_resposta = list(mensagem.get("headers", []))
+                cabecalhos_resposta.append((b"x-request-id", contexto.id_requisicao.encode("latin-1")))
+                cabecalhos_resposta.append((b"x-db-checkouts", str(contexto.checkouts_pool).encode("latin-1")))
+                cabecalhos_resposta.append((b"server-timing", _server_timing(contexto, duracao_ms).encode("latin-1")))
+                mensagem["headers"] = cabecalhos_resposta
+                logger.info(
+                    f"[Access] {contexto.metodo} {contexto.caminho} -> {mensagem['status']} "
+                    f"{duracao_ms:.1f} ms | sql: {contexto.consultas_sql} consultas, {contexto.tempo_sql * 1000:.1f} ms "
+                    f"| checkouts do pool: {contexto.checkouts_pool} | id: {contexto.id_requisicao}"
+                )
+                if contexto.instrucoes_sql:
+                    _registrar_instrucoes(contexto)
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            contexto_requisicao.reset(token)
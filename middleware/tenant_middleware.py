@@ -1,33 +1,77 @@
 # backend_python/middleware/tenant_middleware.py
 
-from fastapi import Header, HTTPException, status, Depends
+from typing import Optional
+
+from fastapi import Header, HTTPException, Request, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models.models import Loja
 from database.connection import get_db
+from database.async_connection import get_async_db
+from services import tenant_registry_service
+from services.tenant_registry_service import TenantSnapshot
+from services.shard_service import selecionar_shard, selecionar_shard_async
 
-async def get_current_tenant(
-    x_lodge_code: str = Header(..., alias="x-lodge-code"),
+def get_current_tenant(
+    request: Request,
+    x_lodge_code: Optional[str] = Header(None, alias="x-lodge-code"),
     db: Session = Depends(get_db)
-) -> Loja:
+) -> TenantSnapshot:
     """
-    Dependência FastAPI para identificar o tenant a partir do cabeçalho 'x-lodge-code'.
-    Retorna o objeto Loja correspondente ou levanta uma exceção HTTP.
+    Dependência FastAPI para identificar o tenant a partir do cabeçalho 'x-lodge-code'
+    ou, na sua ausência, do cabeçalho 'Host' (subdomínio de TENANT_BASE_DOMAIN ou domínio personalizado).
+    Retorna um snapshot da Loja correspondente (em cache); 404 para um código ou subdomínio desconhecido
+    e 400 quando nem o cabeçalho nem o host identificam uma loja.
+    A sessão da requisição passa a apontar para o shard que guarda os dados da loja.
     """
-    if not x_lodge_code:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cabeçalho 'x-lodge-code' é obrigatório."
-        )
+    host = request.headers.get("host")
+    if x_lodge_code:
+        tenant = tenant_registry_service.obter_tenant_por_codigo(db, x_lodge_code)
+    else:
+        tenant = _exigir_host_de_loja(host, host and tenant_registry_service.obter_tenant_por_host(db, host))
+    tenant = _exigir_tenant(tenant)
+    selecionar_shard(db, tenant.id)
+    return tenant
+
+async def get_current_tenant_async(
+    request: Request,
+    x_lodge_code: Optional[str] = Header(None, alias="x-lodge-code"),
+    db: AsyncSession = Depends(get_async_db)
+) -> TenantSnapshot:
+    """Equivalente de `get_current_tenant` para endpoints que usam a sessão assíncrona."""
+    host = request.headers.get("host")
+    if x_lodge_code:
+        tenant = await tenant_registry_service.obter_tenant_por_codigo_async(db, x_lodge_code)
+    else:
+        tenant = _exigir_host_de_loja(host, host and await tenant_registry_service.obter_tenant_por_host_async(db, host))
+    tenant = _exigir_tenant(tenant)
+    await selecionar_shard_async(db, tenant.id)
+    return tenant
 
-    tenant = db.query(Loja).filter(
-        Loja.codigo_loja == x_lodge_code,
-        Loja.esta_ativo == True
-    ).first()
+def get_db_da_loja(loja_id: int, db: Session = Depends(get_db)) -> Session:
+    """
+    Sessão da requisição apontada para o shard da loja `loja_id` (parâmetro da rota ou da query string),
+    para rotas que recebem a loja explicitamente em vez do cabeçalho 'x-lodge-code'.
+    """
+    selecionar_shard(db, loja_id)
+    return db
+
+def _erro_sem_identificacao() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cabeçalho 'x-lodge-code' é obrigatório."
+    )
+
+def _exigir_host_de_loja(host: Optional[str], tenant: Optional[TenantSnapshot]) -> Optional[TenantSnapshot]:
+    # Sem o cabeçalho, só um subdomínio do domínio base ou um domínio personalizado cadastrado identificam a
+    # loja; o host da própria API (ou qualquer outro) não é uma loja inexistente, e sim uma requisição sem loja
+    if not tenant and not (host and tenant_registry_service.codigo_do_subdominio(host)):
+        raise _erro_sem_identificacao()
+    return tenant
 
+def _exigir_tenant(tenant: Optional[TenantSnapshot]) -> TenantSnapshot:
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tenant não encontrado ou inativo."
         )
-    
     return tenant
@@ -1,13 +1,16 @@
 # backend_python/models/models.py
 
 from sqlalchemy import (Column, Integer, String, Boolean, DateTime, Enum as SQLAlchemyEnum, Time, 
-                        Text, ForeignKey, func, Date, Table)
+                        Text, ForeignKey, func, Date, Table, Index)
 from sqlalchemy.orm import relationship
 from database.connection import Base
 import enum
 
 class ModeloBase(Base):
     __abstract__ = True
+    # Sem `eager_defaults`: no MySQL (sem RETURNING) ele custaria um SELECT após cada INSERT e UPDATE.
+    # criado_em/atualizado_em ficam expirados após o flush; as respostas que os expõem usam
+    # `carregar_colunas_geradas` (database/connection.py).
     criado_em = Column(DateTime(timezone=True), server_default=func.now())
     atualizado_em = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -29,6 +32,23 @@ cargos_permissoes = Table(
     Column('id_permissao', ForeignKey('permissoes.id'), primary_key=True)
 )
 
+# Herança entre cargos (DAG): `id_cargo` herda todas as permissões de `id_cargo_herdado`
+cargos_heranca = Table(
+    'cargos_heranca',
+    Base.metadata,
+    Column('id_cargo', ForeignKey('cargos.id', ondelete='CASCADE'), primary_key=True),
+    Column('id_cargo_herdado', ForeignKey('cargos.id', ondelete='CASCADE'), primary_key=True),
+    Index('ix_cargos_heranca_id_cargo_herdado', 'id_cargo_herdado')
+)
+
+# Fecho transitivo pré-calculado: permissões diretas + herdadas de cada cargo
+cargos_permissoes_efetivas = Table(
+    'cargos_permissoes_efetivas',
+    Base.metadata,
+    Column('id_cargo', ForeignKey('cargos.id', ondelete='CASCADE'), primary_key=True),
+    Column('id_permissao', ForeignKey('permissoes.id', ondelete='CASCADE'), primary_key=True)
+)
+
 # --- MODELOS PRINCIPAIS ---
 
 class Potencia(ModeloBase):
@@ -89,14 +109,26 @@ class Cargo(ModeloBase):
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(255), unique=True, nullable=False)
     id_potencia = Column(Integer, ForeignKey('potencias.id'))
+    # Incrementado a cada alteração nas permissões do cargo; embutido nos tokens JWT
+    versao_permissoes = Column(Integer, nullable=False, default=1, server_default="1")
     potencia = relationship("Potencia", backref="cargos")
     permissoes = relationship("Permissao", secondary=cargos_permissoes, back_populates="cargos")
+    cargos_herdados = relationship(
+        "Cargo",
+        secondary=cargos_heranca,
+        primaryjoin=lambda: Cargo.id == cargos_heranca.c.id_cargo,
+        secondaryjoin=lambda: Cargo.id == cargos_heranca.c.id_cargo_herdado,
+        viewonly=True
+    )
 
 class Permissao(ModeloBase):
     __tablename__ = "permissoes"
+    __table_args__ = (Index("uq_permissoes_indice_bit", "indice_bit", unique=True),)
     id = Column(Integer, primary_key=True, index=True)
     acao = Column(String(255), unique=True, nullable=False)
     descricao = Column(String(255))
+    # Posição da permissão nos bitsets do RBAC (0, 1, 2, ...): denso e independente do id
+    indice_bit = Column(Integer, nullable=False)
     cargos = relationship("Cargo", secondary=cargos_permissoes, back_populates="permissoes")
 
 class SuperAdministrador(ModeloBase):
@@ -106,3 +138,32 @@ class SuperAdministrador(ModeloBase):
     email = Column(String(255), unique=True, index=True, nullable=False)
     senha_hash = Column(String(255), nullable=False)
     esta_ativo = Column(Boolean, default=True)
+
+class ChaveApi(ModeloBase):
+    __tablename__ = "chaves_api"
+    id = Column(Integer, primary_key=True, index=True)
+    id_loja = Column(Integer, ForeignKey('lojas.id'), nullable=False, index=True)
+    nome = Column(String(255), nullable=False)
+    prefixo = Column(String(8), nullable=False)
+    # Apenas o SHA-256 (hex) da chave é armazenado; a chave em texto puro é exibida uma única vez
+    hash_chave = Column(String(64), unique=True, index=True, nullable=False)
+    escopos = Column(Text, nullable=False, default="")
+    esta_ativo = Column(Boolean, default=True)
+    loja = relationship("Loja", backref="chaves_api")
+
+class TokenRevogado(ModeloBase):
+    __tablename__ = "tokens_revogados"
+    # Sincronização incremental das revogações: WHERE criado_em >= ?
+    __table_args__ = (Index("ix_tokens_revogados_criado_em", "criado_em"),)
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), unique=True, index=True, nullable=False)
+    # Após a expiração o token já é rejeitado pelo JWT, e o registro pode ser descartado
+    expira_em = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class MapaShard(ModeloBase):
+    """Diretório de sharding: em qual banco ficam os dados de cada loja (ausente = banco diretório)."""
+    __tablename__ = "mapa_shards"
+    id_loja = Column(Integer, ForeignKey('lojas.id', ondelete='CASCADE'), primary_key=True)
+    shard = Column(String(50), nullable=False, index=True)
+    # 'ativo' ou 'congelado' (escritas bloqueadas durante a migração da loja entre shards)
+    estado = Column(String(20), nullable=False, default="ativo", server_default="ativo")
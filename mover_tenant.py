@@ -0,0 +1,222 @@
+# backend_python/mover_tenant.py
+#
+# Move os dados de uma loja entre shards com a aplicação no ar:
+#   1. cópia:       copia as linhas da loja da origem para o destino (loja ainda ativa);
+#   2. congelamento: marca a loja como 'congelada' no mapa e aguarda os caches expirarem
+#                    (requisições da loja recebem 503 durante a janela);
+#   3. delta:       compara origem e destino por chave primária e aplica inserções,
+#                    atualizações e remoções ocorridas durante a cópia;
+#   4. virada:      aponta o mapa para o shard de destino e reativa a loja.
+# As linhas da loja são descobertas por reflexão: tabelas com coluna de loja (id_loja/tenant_id/lodge_id)
+# e, recursivamente, tabelas que referenciam essas por chave estrangeira. O esquema do destino
+# deve existir (mesmas migrações aplicadas em todos os shards).
+# As linhas são copiadas com as suas chaves primárias: os ids precisam ser globais
+# (DB_SHARD_ID_STRIDE/DB_SHARD_ID_OFFSETS). Antes da cópia, a ferramenta recusa mover uma loja
+# cujos ids já estejam em uso no destino por linhas de outras lojas.
+#
+# Uso: python mover_tenant.py <id_loja> <shard_destino> [--limpar-origem]
+#      (shards definidos em DB_SHARDS; 'diretorio' designa o banco principal)
+
+import argparse
+import time
+
+from sqlalchemy import MetaData, and_, delete, func, insert, inspect, not_, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from config.settings import config
+from models.models import MapaShard
+
+COLUNAS_DE_LOJA = ("id_loja", "tenant_id", "lodge_id")
+TAMANHO_LOTE = 1000
+
+def tabelas_da_loja(metadata: MetaData, id_loja: int, tabelas_globais: set[str]) -> list[tuple]:
+    """
+    Retorna [(tabela, condição)] em ordem de dependência (pais antes dos filhos), onde a condição
+    seleciona as linhas pertencentes à loja.
+    """
+    condicoes = {}
+    for tabela in metadata.sorted_tables:
+        if tabela.name in tabelas_globais:
+            continue
+        coluna_loja = next((tabela.c[nome] for nome in COLUNAS_DE_LOJA if nome in tabela.c), None)
+        if coluna_loja is not None:
+            condicoes[tabela.name] = coluna_loja == id_loja
+            continue
+        # Sem coluna de loja: pertence à loja se referencia linhas que pertencem a ela
+        for fk in tabela.foreign_keys:
+            pai = fk.column.table
+            if pai.name in condicoes:
+                condicoes[tabela.name] = fk.parent.in_(select(fk.column).where(condicoes[pai.name]))
+                break
+    return [(tabela, condicoes[tabela.name]) for tabela in metadata.sorted_tables if tabela.name in condicoes]
+
+def _linhas_ordenadas(conexao, tabela, condicao):
+    """Percorre as linhas da loja em ordem de chave primária, em lotes (paginação por chave)."""
+    pk = list(tabela.primary_key.columns)
+    ultima = None
+    while True:
+        consulta = select(tabela).where(condicao).order_by(*pk).limit(TAMANHO_LOTE)
+        if ultima is not None:
+            consulta = consulta.where(tuple_(*pk) > tuple_(*ultima))
+        lote = conexao.execute(consulta).mappings().all()
+        if not lote:
+            return
+        yield from lote
+        ultima = [lote[-1][coluna.name] for coluna in pk]
+
+def _chave(tabela, linha) -> tuple:
+    return tuple(linha[coluna.name] for coluna in tabela.primary_key.columns)
+
+def _filtro_pk(tabela, chave: tuple):
+    return and_(*(coluna == valor for coluna, valor in zip(tabela.primary_key.columns, chave)))
+
+def _contar_colisoes(conexao, tabela, condicao, chaves: list[tuple]) -> int:
+    pk = tuple_(*tabela.primary_key.columns)
+    consulta = select(func.count()).select_from(tabela).where(pk.in_(chaves), not_(condicao))
+    return conexao.execute(consulta).scalar_one()
+
+def verificar_colisoes(origem, destino, tabelas: list[tuple]) -> dict:
+    """
+    Conta, por tabela, as chaves primárias da loja na origem que já pertencem a linhas de outras
+    lojas no destino. Linhas da própria loja no destino (cópia interrompida) não são colisões.
+    """
+    colisoes = {}
+    with origem.connect() as conexao_origem, destino.connect() as conexao_destino:
+        for tabela, condicao in tabelas:
+            total, lote = 0, []
+            for linha in _linhas_ordenadas(conexao_origem, tabela, condicao):
+                lote.append(_chave(tabela, linha))
+                if len(lote) >= TAMANHO_LOTE:
+                    total += _contar_colisoes(conexao_destino, tabela, condicao, lote)
+                    lote = []
+            if lote:
+                total += _contar_colisoes(conexao_destino, tabela, condicao, lote)
+            if total:
+                colisoes[tabela.name] = total
+    return colisoes
+
+def copiar(origem, destino, tabelas: list[tuple]) -> int:
+    """Fase 1: substitui no destino as linhas da loja pelas da origem (idempotente após uma tentativa interrompida)."""
+    total = 0
+    with destino.begin() as conexao_destino:
+        for tabela, condicao in reversed(tabelas):
+            conexao_destino.execute(delete(tabela).where(condicao))
+    with origem.connect() as conexao_origem, destino.begin() as conexao_destino:
+        for tabela, condicao in tabelas:
+            lote = []
+            for linha in _linhas_ordenadas(conexao_origem, tabela, condicao):
+                lote.append(dict(linha))
+                if len(lote) >= TAMANHO_LOTE:
+                    conexao_destino.execute(insert(tabela), lote)
+                    total += len(lote)
+                    lote = []
+            if lote:
+                conexao_destino.execute(insert(tabela), lote)
+                total += len(lote)
+    return total
+
+def sincronizar_delta(origem, destino, tabelas: list[tuple]) -> dict:
+    """
+    Fase 3 (loja congelada): indexa por chave primária as linhas da loja no destino e percorre
+    as da origem em lotes, aplicando no destino apenas as diferenças.
+    """
+    contagem = {"inseridas": 0, "atualizadas": 0, "removidas": 0}
+    remocoes = []
+    with origem.connect() as conexao_origem, destino.begin() as conexao_destino:
+        for tabela, condicao in tabelas:
+            linhas_origem = _linhas_ordenadas(conexao_origem, tabela, condicao)
+            linhas_destino = list(_linhas_ordenadas(conexao_destino, tabela, condicao))
+            indice_destino = {_chave(tabela, linha): linha for linha in linhas_destino}
+            for linha in linhas_origem:
+                chave = _chave(tabela, linha)
+                atual = indice_destino.pop(chave, None)
+                if atual is None:
+                    conexao_destino.execute(insert(tabela).values(**linha))
+                    contagem["inseridas"] += 1
+                elif dict(atual) != dict(linha):
+                    conexao_destino.execute(update(tabela).where(_filtro_pk(tabela, chave)).values(**linha))
+                    contagem["atualizadas"] += 1
+            # O que sobrou no destino foi removido na origem; remove depois, dos filhos para os pais
+            remocoes.append((tabela, list(indice_destino)))
+        for tabela, chaves in reversed(remocoes):
+            for chave in chaves:
+                conexao_destino.execute(delete(tabela).where(_filtro_pk(tabela, chave)))
+                contagem["removidas"] += 1
+    return contagem
+
+def _definir_mapa(engine_diretorio, id_loja: int, shard: str, estado: str):
+    with Session(engine_diretorio) as db:
+        registro = db.get(MapaShard, id_loja)
+        if registro is None:
+            db.add(MapaShard(id_loja=id_loja, shard=shard, estado=estado))
+        else:
+            registro.shard, registro.estado = shard, estado
+        db.commit()
+
+def mover_loja(engine_diretorio, origem, destino, nome_origem: str, nome_destino: str, id_loja: int,
+               tabelas_globais: set[str], espera_congelamento: float, limpar_origem: bool = False):
+    """Executa as quatro fases. Em caso de falha após o congelamento, a loja volta ativa na origem."""
+    metadata = MetaData()
+    metadata.reflect(bind=origem)
+    tabelas = tabelas_da_loja(metadata, id_loja, tabelas_globais)
+    faltantes = [tabela.name for tabela, _ in tabelas if not inspect(destino).has_table(tabela.name)]
+    if faltantes:
+        raise SystemExit(f"O shard de destino não possui as tabelas {faltantes}. Aplique as migrações antes de mover.")
+    colisoes = verificar_colisoes(origem, destino, tabelas)
+    if colisoes:
+        raise SystemExit(
+            f"Ids da loja já usados por outras lojas no destino {colisoes}. Configure ids globais "
+            f"(DB_SHARD_ID_STRIDE/DB_SHARD_ID_OFFSETS) e renumere as linhas conflitantes antes de mover."
+        )
+
+    inicio = time.perf_counter()
+    copiadas = copiar(origem, destino, tabelas)
+    print(f"[1/4] Cópia: {copiadas} linhas em {len(tabelas)} tabelas ({time.perf_counter() - inicio:.1f} s).")
+
+    _definir_mapa(engine_diretorio, id_loja, nome_origem, "congelado")
+    print(f"[2/4] Loja congelada; aguardando {espera_congelamento:.0f} s para os caches expirarem...")
+    time.sleep(espera_congelamento)
+    inicio_congelamento = time.perf_counter()
+    try:
+        delta = sincronizar_delta(origem, destino, tabelas)
+        print(f"[3/4] Delta: {delta}.")
+        _definir_mapa(engine_diretorio, id_loja, nome_destino, "ativo")
+    except Exception:
+        _definir_mapa(engine_diretorio, id_loja, nome_origem, "ativo")
+        print("Falha durante o congelamento; a loja foi reativada no shard de origem.")
+        raise
+    print(f"[4/4] Virada concluída: loja {id_loja} agora em '{nome_destino}' "
+          f"(congelada por {time.perf_counter() - inicio_congelamento + espera_congelamento:.1f} s).")
+
+    if limpar_origem:
+        with origem.begin() as conexao:
+            for tabela, condicao in reversed(tabelas):
+                conexao.execute(delete(tabela).where(condicao))
+        print(f"Linhas da loja removidas de '{nome_origem}'.")
+
+def main():
+    from database.connection import engine
+    from database.sharding import SHARD_DIRETORIO, engine_do_shard, nomes_tabelas_globais
+    from services.shard_service import obter_entrada_shard
+
+    parser = argparse.ArgumentParser(description="Move os dados de uma loja para outro shard.")
+    parser.add_argument("id_loja", type=int)
+    parser.add_argument("shard_destino")
+    parser.add_argument("--limpar-origem", action="store_true", help="Remove as linhas da loja do shard de origem ao final.")
+    args = parser.parse_args()
+
+    with Session(engine) as db:
+        nome_origem = obter_entrada_shard(db, args.id_loja).shard
+    if nome_origem == args.shard_destino:
+        raise SystemExit(f"A loja {args.id_loja} já está em '{args.shard_destino}'.")
+    if args.shard_destino != SHARD_DIRETORIO and args.shard_destino not in config.SHARDS_BANCO_DE_DADOS:
+        raise SystemExit(f"Shard '{args.shard_destino}' não configurado em DB_SHARDS.")
+
+    mover_loja(
+        engine, engine_do_shard(nome_origem), engine_do_shard(args.shard_destino),
+        nome_origem, args.shard_destino, args.id_loja, nomes_tabelas_globais(),
+        espera_congelamento=config.TTL_CACHE_SHARDS + 2, limpar_origem=args.limpar_origem,
+    )
+
+if __name__ == "__main__":
+    main()
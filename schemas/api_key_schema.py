@@ -0,0 +1,32 @@
+# backend_python/schemas/api_key_schema.py
+
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from datetime import datetime
+
+class ApiKeyCreate(BaseModel):
+    nome: str = Field(..., min_length=3, max_length=255, description="Identificação da integração (ex: 'Quiosque da Portaria').")
+    id_loja: int = Field(..., description="ID da loja à qual a chave fica vinculada.")
+    escopos: List[str] = Field(default_factory=list, description="Ações permitidas para a chave (ex: 'sessao:gerenciar_presenca').")
+
+class ApiKeyResponse(BaseModel):
+    id: int
+    nome: str
+    id_loja: int
+    prefixo: str
+    escopos: List[str] = []
+    esta_ativo: bool
+    criado_em: Optional[datetime] = None
+
+    @field_validator("escopos", mode="before")
+    @classmethod
+    def separar_escopos(cls, valor):
+        if isinstance(valor, str):
+            return valor.split()
+        return valor
+
+    class Config:
+        from_attributes = True
+
+class ApiKeyCreatedResponse(ApiKeyResponse):
+    chave: str = Field(..., description="Chave em texto puro. É exibida apenas nesta resposta.")
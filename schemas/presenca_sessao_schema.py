@@ -15,7 +15,8 @@ class PresencaSessaoCreate(PresencaSessaoBase):
     id_sessao: int
 
 class PresencaSessao(PresencaSessaoBase):
-    id: int
+    # Ausências derivadas do rol (modo de presença esparso) não possuem linha própria
+    id: Optional[int] = None
     id_sessao: int
 
     model_config = SettingsConfigDict(from_attributes=True)
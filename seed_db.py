@@ -1,8 +1,8 @@
-import bcrypt
 from sqlalchemy import select
 from database.connection import SessionLocal
 from models.models import SuperAdministrador
 from config.settings import config
+from services import password_service
 
 def seed_database():
     """
@@ -19,10 +19,7 @@ def seed_database():
         if not existing_super_admin:
             print(f"Criando super admin com o e-mail '{super_admin_email}'...")
             
-            # CORREÇÃO FINAL: Usa a biblioteca bcrypt diretamente para o hash
-            password_bytes = config.ROOT_PASSWORD.encode('utf-8')
-            salt = bcrypt.gensalt()
-            hashed_password = bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+            hashed_password = password_service.hash_senha_sync(config.ROOT_PASSWORD)
             
             new_super_admin = SuperAdministrador(
                 nome_usuario="superadmin",
@@ -38,6 +35,7 @@ def seed_database():
 
     finally:
         db.close()
+        password_service.encerrar_pool()
 
 if __name__ == "__main__":
     print("Iniciando o processo de seeding do banco de dados...")
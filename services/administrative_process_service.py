@@ -1,6 +1,7 @@
 # backend_python/services/administrative_process_service.py
 
 from sqlalchemy.orm import Session
+from database.connection import carregar_colunas_geradas
 from models.models import ProcessoAdministrativo, Loja
 from typing import List, Optional
 from fastapi import HTTPException, status
@@ -29,5 +30,4 @@ def criar_processo_administrativo(db: Session, processo: dict):
     db_processo = ProcessoAdministrativo(**processo)
     db.add(db_processo)
     db.commit()
-    db.refresh(db_processo)
-    return db_processo
+    return carregar_colunas_geradas(db, db_processo)
@@ -0,0 +1,94 @@
+# backend_python/services/api_key_service.py
+
+import hashlib
+from types import SimpleNamespace
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from config.settings import config
+from database.connection import carregar_colunas_geradas
+from models.models import ChaveApi, Loja
+from schemas.api_key_schema import ApiKeyCreate
+from utils.api_key_utils import generate_api_key
+from utils.cache_utils import CacheLRUTTL
+
+# Marcador para digests sabidamente inválidos (cache negativo)
+_INVALIDA = object()
+
+_cache_chaves = CacheLRUTTL("chaves_api", config.TAMANHO_CACHE_AUTENTICACAO, config.TTL_CACHE_AUTENTICACAO)
+
+def calcular_digest(chave: str) -> str:
+    """Retorna o SHA-256 (hex) da chave, que é o único valor persistido."""
+    return hashlib.sha256(chave.encode("utf-8")).hexdigest()
+
+def _criar_snapshot(chave: ChaveApi) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=chave.id,
+        id_loja=chave.id_loja,
+        nome=chave.nome,
+        escopos=frozenset(chave.escopos.split()),
+    )
+
+def autenticar_chave_api(db: Session, chave: str) -> Optional[SimpleNamespace]:
+    """
+    Valida uma chave de API: um hash SHA-256 e uma busca em cache (ou pelo índice único em `hash_chave`).
+    Retorna o snapshot da chave ativa ou None.
+    """
+    digest = calcular_digest(chave)
+    snapshot = _cache_chaves.obter(digest)
+    if snapshot is _INVALIDA:
+        return None
+    if snapshot is None:
+        registro = db.query(ChaveApi).filter(ChaveApi.hash_chave == digest, ChaveApi.esta_ativo == True).first()
+        snapshot = _criar_snapshot(registro) if registro else _INVALIDA
+        _cache_chaves.definir(digest, snapshot)
+        if registro is None:
+            return None
+    return snapshot
+
+def criar_chave_api(db: Session, dados: ApiKeyCreate):
+    """Cria uma chave de API vinculada a uma loja e retorna a chave em texto puro (uma única vez)."""
+    if not db.query(Loja.id).filter(Loja.id == dados.id_loja).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Loja não encontrada.")
+
+    chave = generate_api_key()
+    digest = calcular_digest(chave)
+    db_chave = ChaveApi(
+        id_loja=dados.id_loja,
+        nome=dados.nome,
+        prefixo=chave[:8],
+        hash_chave=digest,
+        escopos=" ".join(sorted(set(dados.escopos))),
+    )
+    db.add(db_chave)
+    db.commit()
+    carregar_colunas_geradas(db, db_chave)
+    _cache_chaves.invalidar(digest)
+
+    resposta = {coluna.name: getattr(db_chave, coluna.name) for coluna in ChaveApi.__table__.columns}
+    resposta["chave"] = chave
+    return resposta
+
+def listar_chaves_api(db: Session, id_loja: Optional[int] = None):
+    """Lista as chaves de API (sem o segredo), opcionalmente filtrando por loja."""
+    consulta = db.query(ChaveApi)
+    if id_loja is not None:
+        consulta = consulta.filter(ChaveApi.id_loja == id_loja)
+    return consulta.all()
+
+def revogar_chave_api(db: Session, chave_id: int):
+    """Desativa uma chave de API e a remove do cache de verificação."""
+    db_chave = db.query(ChaveApi).filter(ChaveApi.id == chave_id).first()
+    if not db_chave:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chave de API não encontrada.")
+
+    db_chave.esta_ativo = False
+    db.commit()
+    _cache_chaves.invalidar(db_chave.hash_chave)
+    return {"mensagem": "Chave de API revogada com sucesso."}
+
+def obter_metricas() -> dict:
+    """Retorna os contadores do cache de verificação de chaves."""
+    return _cache_chaves.metricas()
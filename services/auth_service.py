@@ -1,55 +1,74 @@
 # backend_python/services/auth_service.py
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from models.models import MembroLoja, AssociacaoMembroLoja, Loja, Cargo
 from schemas.auth_schema import LodgeMemberLogin, LodgeMemberSelectLodge, LodgeMemberForgotPassword, LodgeMemberResetPassword
 from fastapi import HTTPException, status
 from datetime import timedelta
-import bcrypt
 from jose import jwt
 
 from config.settings import config
+from database.sharding import shard_da_sessao
 from utils.auth_utils import criar_token_acesso
 from utils.app_errors import AppError
+from services import password_service, login_admission_service
+from middleware.authorize_middleware import invalidar_usuario_em_cache
+from services.authorization_service import claims_de_permissao, obter_cargo_da_associacao
+from services.token_revocation_service import revogar_token
+
+def _dados_token_membro(db: Session, email: str, membro_id: int, associacao_id: int, loja_id: int, cargo_id) -> dict:
+    """Monta os claims do token de um membro, embutindo as permissões do cargo quando habilitado."""
+    data = {
+        "email": email,
+        "perfil": "lodge_member",
+        "lodgeMemberId": membro_id,
+        "associationId": associacao_id,
+        "lodgeId": loja_id
+    }
+    if config.EMBUTIR_PERMISSOES_JWT:
+        data.update(claims_de_permissao(db, cargo_id))
+    return data
 
-def login_membro_loja(db: Session, dados_login: LodgeMemberLogin):
+async def login_membro_loja(db: Session, dados_login: LodgeMemberLogin, ip_cliente: str):
     """Autentica um membro da loja e retorna um token de acesso."""
+    login_admission_service.admitir_login(ip_cliente, dados_login.email)
     membro = db.query(MembroLoja).filter(MembroLoja.email == dados_login.email).first()
 
-    if not membro or not bcrypt.checkpw(dados_login.senha.encode('utf-8'), membro.senha_hash.encode('utf-8')):
+    if not membro or not await password_service.verificar_senha(dados_login.senha, membro.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha inválidos.",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    password_service.agendar_rehash_se_necessario(
+        MembroLoja, membro.id, dados_login.senha, membro.senha_hash, shard_da_sessao(db)
+    )
 
     # Se o membro pertence a múltiplas associações/cargos, ele precisará selecionar um
-    # Por enquanto, pegamos a primeira associação ativa
-    associacao = db.query(AssociacaoMembroLoja).filter(
+    # Por enquanto, pegamos a primeira associação ativa (com cargo e loja na mesma consulta)
+    associacao = db.query(AssociacaoMembroLoja).options(
+        joinedload(AssociacaoMembroLoja.role),
+        joinedload(AssociacaoMembroLoja.lodge_member).joinedload(MembroLoja.tenant),
+    ).filter(
         AssociacaoMembroLoja.lodge_member_id == membro.id
     ).first()
 
     if not associacao:
         raise AppError("Membro não possui associação ativa com nenhuma loja/cargo.", status.HTTP_401_UNAUTHORIZED)
 
-    # Carrega o cargo e a loja da associação
-    db.refresh(associacao, attribute_names=['role', 'lodge_member'])
-    db.refresh(associacao.lodge_member, attribute_names=['tenant'])
-
     if not associacao.role or not associacao.lodge_member.tenant:
         raise AppError("Dados de associação incompletos.", status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    delta_expiracao = timedelta(minutes=config.MINUTOS_EXPIRACAO_TOKEN_ACESSO)
-    token_acesso = criar_token_acesso(
-        data={
-            "email": membro.email,
-            "perfil": "lodge_member",
-            "lodgeMemberId": membro.id,
-            "associationId": associacao.id,
-            "lodgeId": associacao.lodge_member.tenant.id
-        },
-        expires_delta=delta_expiracao
+    dados_token = _dados_token_membro(
+        db, membro.email, membro.id, associacao.id, associacao.lodge_member.tenant.id, associacao.role_id
     )
+    return _resposta_login(membro, associacao, dados_token)
+
+def _resposta_login(membro: MembroLoja, associacao: AssociacaoMembroLoja, dados_token: dict) -> dict:
+    delta_expiracao = timedelta(minutes=config.MINUTOS_EXPIRACAO_TOKEN_ACESSO)
+    token_acesso = criar_token_acesso(data=dados_token, expires_delta=delta_expiracao)
     return {
         "token_de_acesso": token_acesso,
         "tipo_token": "bearer",
@@ -62,12 +81,57 @@ def login_membro_loja(db: Session, dados_login: LodgeMemberLogin):
         }
     }
 
+async def login_membro_loja_async(db: AsyncSession, dados_login: LodgeMemberLogin, ip_cliente: str):
+    """Equivalente de `login_membro_loja` sobre a sessão assíncrona: nenhuma consulta bloqueia o event loop."""
+    login_admission_service.admitir_login(ip_cliente, dados_login.email)
+    resultado = await db.execute(select(MembroLoja).where(MembroLoja.email == dados_login.email).limit(1))
+    membro = resultado.scalars().first()
+
+    if not membro or not await password_service.verificar_senha(dados_login.senha, membro.senha_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email ou senha inválidos.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    password_service.agendar_rehash_se_necessario(
+        MembroLoja, membro.id, dados_login.senha, membro.senha_hash, shard_da_sessao(db)
+    )
+
+    # Carrega associação, cargo e loja de uma vez (não há carregamento preguiçoso em sessões assíncronas)
+    resultado = await db.execute(
+        select(AssociacaoMembroLoja)
+        .where(AssociacaoMembroLoja.lodge_member_id == membro.id)
+        .options(
+            selectinload(AssociacaoMembroLoja.role),
+            selectinload(AssociacaoMembroLoja.lodge_member).selectinload(MembroLoja.tenant),
+        )
+        .limit(1)
+    )
+    associacao = resultado.scalars().first()
+
+    if not associacao:
+        raise AppError("Membro não possui associação ativa com nenhuma loja/cargo.", status.HTTP_401_UNAUTHORIZED)
+    if not associacao.role or not associacao.lodge_member.tenant:
+        raise AppError("Dados de associação incompletos.", status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    dados_token = await db.run_sync(
+        _dados_token_membro,
+        membro.email, membro.id, associacao.id, associacao.lodge_member.tenant.id, associacao.role_id
+    )
+    return _resposta_login(membro, associacao, dados_token)
+
 def selecionar_loja_membro(db: Session, dados_selecao: LodgeMemberSelectLodge, current_user: dict):
     """Permite que um membro da loja selecione uma loja diferente se tiver múltiplas associações."""
+    if current_user["perfil"] != "lodge_member":
+        # O id de outra credencial (ex: chave de API) não identifica um membro
+        raise AppError("Apenas membros da loja podem selecionar uma loja.", status.HTTP_403_FORBIDDEN)
     membro_id = current_user["user"].id
     
-    # Verifica se o membro tem associação com a loja selecionada
-    associacao = db.query(AssociacaoMembroLoja).filter(
+    # Verifica se o membro tem associação com a loja selecionada (com cargo e loja na mesma consulta)
+    associacao = db.query(AssociacaoMembroLoja).options(
+        joinedload(AssociacaoMembroLoja.role),
+        joinedload(AssociacaoMembroLoja.lodge_member).joinedload(MembroLoja.tenant),
+    ).filter(
         AssociacaoMembroLoja.lodge_member_id == membro_id,
         AssociacaoMembroLoja.lodge_id == dados_selecao.lodge_id # Assumindo que AssociacaoMembroLoja tem lodge_id
     ).first()
@@ -76,18 +140,11 @@ def selecionar_loja_membro(db: Session, dados_selecao: LodgeMemberSelectLodge, c
         raise AppError("Membro não associado a esta loja.", status.HTTP_403_FORBIDDEN)
 
     # Recria o token com o novo contexto da loja
-    db.refresh(associacao, attribute_names=['role', 'lodge_member'])
-    db.refresh(associacao.lodge_member, attribute_names=['tenant'])
-
     delta_expiracao = timedelta(minutes=config.MINUTOS_EXPIRACAO_TOKEN_ACESSO)
     token_acesso = criar_token_acesso(
-        data={
-            "email": current_user["user"].email,
-            "perfil": "lodge_member",
-            "lodgeMemberId": membro_id,
-            "associationId": associacao.id,
-            "lodgeId": associacao.lodge_member.tenant.id
-        },
+        data=_dados_token_membro(
+            db, current_user["user"].email, membro_id, associacao.id, associacao.lodge_member.tenant.id, associacao.role_id
+        ),
         expires_delta=delta_expiracao
     )
     return {
@@ -103,9 +160,17 @@ def selecionar_loja_membro(db: Session, dados_selecao: LodgeMemberSelectLodge, c
     }
 
 def refresh_token(db: Session, current_user: dict):
-    """Gera um novo token de acesso para o usuário atual."""
+    """
+    Gera um novo token de acesso para o usuário atual.
+    Para membros, as permissões embutidas são recalculadas, o que renova tokens com versão desatualizada.
+    """
     # Reutiliza os dados do usuário do token atual para gerar um novo
     perfil = current_user["perfil"]
+    if perfil == "api_key":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Chaves de API não emitem tokens de acesso."
+        )
     email = current_user["user"].email
     data = {"email": email, "perfil": perfil}
 
@@ -114,15 +179,26 @@ def refresh_token(db: Session, current_user: dict):
     elif perfil == "webmaster":
         data["webmaster_id"] = current_user["user"].id
     elif perfil == "lodge_member":
-        data["lodgeMemberId"] = current_user["user"].id
-        data["associationId"] = current_user["association"].id
-        data["lodgeId"] = current_user["tenant"].id
+        associacao_id = current_user["claims"].get("associationId")
+        data = _dados_token_membro(
+            db, email, current_user["user"].id, associacao_id, current_user["claims"].get("lodgeId"),
+            obter_cargo_da_associacao(db, associacao_id)
+        )
 
     delta_expiracao = timedelta(minutes=config.MINUTOS_EXPIRACAO_TOKEN_ACESSO)
     token_acesso = criar_token_acesso(data=data, expires_delta=delta_expiracao)
     
     return {"token_de_acesso": token_acesso, "tipo_token": "bearer"}
 
+def logout(db: Session, current_user: dict):
+    """Revoga o token usado na requisição, que passa a ser recusado até expirar."""
+    if current_user["perfil"] == "api_key" or not revogar_token(db, current_user["claims"]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Esta credencial não pode ser revogada por logout."
+        )
+    return {"message": "Logout realizado com sucesso."}
+
 def forgot_password(db: Session, dados_esqueci_senha: LodgeMemberForgotPassword):
     """Inicia o processo de recuperação de senha para um membro da loja."""
     membro = db.query(MembroLoja).filter(MembroLoja.email == dados_esqueci_senha.email).first()
@@ -137,7 +213,7 @@ def forgot_password(db: Session, dados_esqueci_senha: LodgeMemberForgotPassword)
     return {"message": "Se o email estiver registrado, um link de recuperação de senha será enviado."}
 
 
-def reset_password(db: Session, dados_reset_senha: LodgeMemberResetPassword):
+async def reset_password(db: Session, dados_reset_senha: LodgeMemberResetPassword):
     """Reseta a senha de um membro da loja usando um token de recuperação."""
     try:
         payload = jwt.decode(dados_reset_senha.token, config.SEGREDO_JWT, algorithms=[config.ALGORITMO])
@@ -154,10 +230,9 @@ def reset_password(db: Session, dados_reset_senha: LodgeMemberResetPassword):
     if not membro:
         raise AppError("Usuário não encontrado.", status.HTTP_404_NOT_FOUND)
 
-    senha_hash = bcrypt.hashpw(dados_reset_senha.nova_senha.encode('utf-8'), bcrypt.gensalt())
-    membro.senha_hash = senha_hash.decode('utf-8')
+    membro.senha_hash = await password_service.hash_senha(dados_reset_senha.nova_senha)
     db.add(membro)
     db.commit()
-    db.refresh(membro)
+    invalidar_usuario_em_cache("lodge_member", membro.id, shard_da_sessao(db))
 
     return {"message": "Senha redefinida com sucesso."}
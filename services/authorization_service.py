@@ -0,0 +1,184 @@
+# backend_python/services/authorization_service.py
+
+import itertools
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from config.settings import config
+from database.sharding import shard_da_sessao
+from models.models import Cargo, Permissao, AssociacaoMembroLoja, cargos_permissoes_efetivas
+from utils.cache_utils import CacheLRUTTL
+
+class MotorRBAC:
+    """
+    Tabela de decisão RBAC compilada em memória.
+
+    A tabela é compilada a partir das permissões efetivas (diretas + herdadas) de cada cargo.
+    Cada `Permissao.acao` usa como índice de bit a coluna `Permissao.indice_bit` (densa e gravada
+    no banco, portanto estável entre processos e reinicializações), e cada `Cargo` é representado
+    por um inteiro cujo bit N está ligado quando o cargo possui a permissão de índice N. Assim,
+    verificar um conjunto de permissões é um único teste de máscara: `(bits_do_cargo & mascara) == mascara`,
+    e o tamanho dos bitsets (e do claim `perms`) acompanha o número de permissões, não os ids.
+
+    A tabela também guarda a `versao_permissoes` de cada cargo, usada para validar tokens que
+    embutem o conjunto de permissões. Ela é recarregada periodicamente para que alterações feitas
+    por outros workers sejam percebidas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bits_permissao: dict[str, int] = {}
+        self._bits_cargo: dict[int, int] = {}
+        self._versoes: dict[int, int] = {}
+        self._carregado_em: Optional[float] = None
+
+    # --- Compilação ---
+
+    def compilar(
+        self,
+        permissoes: dict[str, int],
+        associacoes: Iterable[tuple[int, int]],
+        versoes: Optional[dict[int, int]] = None
+    ):
+        """Monta a tabela completa a partir de {acao: indice_bit}, pares (id_cargo, indice_bit) e {id_cargo: versao}."""
+        bits_cargo: dict[int, int] = {}
+        for id_cargo, indice_bit in associacoes:
+            bits_cargo[id_cargo] = bits_cargo.get(id_cargo, 0) | (1 << indice_bit)
+        with self._lock:
+            self._bits_permissao = dict(permissoes)
+            self._bits_cargo = bits_cargo
+            self._versoes = dict(versoes or {})
+            self._carregado_em = time.monotonic()
+
+    def carregar(self, db: Session):
+        """Compila a tabela inteira a partir do banco (três consultas)."""
+        permissoes = dict(db.execute(select(Permissao.acao, Permissao.indice_bit)).all())
+        associacoes = db.execute(
+            select(cargos_permissoes_efetivas.c.id_cargo, Permissao.indice_bit)
+            .join(Permissao, Permissao.id == cargos_permissoes_efetivas.c.id_permissao)
+        ).all()
+        versoes = dict(db.execute(select(Cargo.id, Cargo.versao_permissoes)).all())
+        self.compilar(permissoes, associacoes, versoes)
+
+    def garantir_carregado(self, db: Session):
+        """Carrega a tabela na primeira utilização e a recarrega quando o intervalo configurado expira."""
+        if self._carregado_em is None or time.monotonic() - self._carregado_em > config.INTERVALO_RECARGA_RBAC:
+            self.carregar(db)
+
+    def recompilar_cargo(self, db: Session, id_cargo: int):
+        """Atualiza incrementalmente apenas o bitset e a versão de um cargo."""
+        if self._carregado_em is None:
+            return self.carregar(db)
+        indices = db.execute(
+            select(Permissao.indice_bit)
+            .join(cargos_permissoes_efetivas, cargos_permissoes_efetivas.c.id_permissao == Permissao.id)
+            .where(cargos_permissoes_efetivas.c.id_cargo == id_cargo)
+        ).scalars()
+        bits = 0
+        for indice_bit in indices:
+            bits |= 1 << indice_bit
+        versao = db.execute(select(Cargo.versao_permissoes).where(Cargo.id == id_cargo)).scalar()
+        with self._lock:
+            self._bits_cargo[id_cargo] = bits
+            self._versoes[id_cargo] = versao or 1
+
+    def registrar_permissao(self, acao: str, indice_bit: int):
+        """Registra (ou renomeia) uma ação recém-criada sem recompilar a tabela."""
+        with self._lock:
+            self._bits_permissao = {a: i for a, i in self._bits_permissao.items() if i != indice_bit}
+            self._bits_permissao[acao] = indice_bit
+
+    # --- Decisão ---
+
+    def mascara(self, acoes: Iterable[str]) -> Optional[int]:
+        """Converte ações em máscara de bits; retorna None se alguma ação não existir."""
+        mascara = 0
+        for acao in acoes:
+            indice_bit = self._bits_permissao.get(acao)
+            if indice_bit is None:
+                return None
+            mascara |= 1 << indice_bit
+        return mascara
+
+    def bits_do_cargo(self, id_cargo: Optional[int]) -> int:
+        return self._bits_cargo.get(id_cargo, 0)
+
+    def permite(self, id_cargo: Optional[int], mascara: Optional[int]) -> bool:
+        """Decisão O(1): o cargo possui todos os bits da máscara?"""
+        if mascara is None:
+            return False
+        return (self._bits_cargo.get(id_cargo, 0) & mascara) == mascara
+
+    def versao(self, id_cargo: Optional[int]) -> Optional[int]:
+        return self._versoes.get(id_cargo)
+
+    def acoes_do_cargo(self, id_cargo: int) -> list[str]:
+        bits = self.bits_do_cargo(id_cargo)
+        return sorted(acao for acao, indice_bit in self._bits_permissao.items() if bits >> indice_bit & 1)
+
+# Instância única usada pela aplicação
+motor_rbac = MotorRBAC()
+
+def indices_bit_livres(db: Session) -> Iterator[int]:
+    """
+    Índices de bit disponíveis para novas permissões, em ordem crescente (os liberados por
+    permissões excluídas primeiro; a exclusão já invalidou os tokens que tinham aquele bit).
+    As permissões ficam bloqueadas até o commit, para que criações concorrentes não repitam um índice.
+    """
+    usados = set(db.execute(select(Permissao.indice_bit).with_for_update()).scalars())
+    return (indice for indice in itertools.count() if indice not in usados)
+
+def incrementar_versao_cargo(db: Session, id_cargo: int):
+    """Incrementa a versão de permissões do cargo na transação corrente (invalida tokens emitidos)."""
+    db.execute(
+        update(Cargo)
+        .where(Cargo.id == id_cargo)
+        .values(versao_permissoes=Cargo.versao_permissoes + 1)
+    )
+
+def incrementar_versao_cargos_com_permissao(db: Session, id_permissao: int):
+    """Incrementa a versão de todos os cargos que possuem a permissão, inclusive por herança (ex: antes de excluí-la)."""
+    db.execute(
+        update(Cargo)
+        .where(Cargo.id.in_(select(cargos_permissoes_efetivas.c.id_cargo).where(cargos_permissoes_efetivas.c.id_permissao == id_permissao)))
+        .values(versao_permissoes=Cargo.versao_permissoes + 1)
+    )
+
+def claims_de_permissao(db: Session, id_cargo: Optional[int]) -> dict:
+    """
+    Claims compactos para embutir no token de um membro: cargo, bitset de permissões (hexadecimal)
+    e versão de permissões do cargo no momento da emissão.
+    """
+    if id_cargo is None:
+        return {}
+    motor_rbac.garantir_carregado(db)
+    return {
+        "cargo": id_cargo,
+        "perms": format(motor_rbac.bits_do_cargo(id_cargo), "x"),
+        "pv": motor_rbac.versao(id_cargo) or 1,
+    }
+
+# Associação (membro <-> loja) -> id do cargo ocupado
+_cache_cargo_associacao = CacheLRUTTL("cargo_por_associacao", config.TAMANHO_CACHE_AUTENTICACAO, config.TTL_CACHE_AUTENTICACAO)
+
+def obter_cargo_da_associacao(db: Session, associacao_id: Optional[int]) -> Optional[int]:
+    """Retorna o id do cargo da associação do membro, com cache."""
+    if associacao_id is None:
+        return None
+    chave = (shard_da_sessao(db), associacao_id)
+    id_cargo = _cache_cargo_associacao.obter(chave)
+    if id_cargo is None:
+        id_cargo = db.execute(
+            select(AssociacaoMembroLoja.role_id).where(AssociacaoMembroLoja.id == associacao_id)
+        ).scalar()
+        if id_cargo is not None:
+            _cache_cargo_associacao.definir(chave, id_cargo)
+    return id_cargo
+
+def invalidar_cargo_da_associacao(db: Session, associacao_id: int):
+    """Descarta o cargo em cache de uma associação cujo cargo foi alterado (no shard da sessão)."""
+    _cache_cargo_associacao.invalidar((shard_da_sessao(db), associacao_id))
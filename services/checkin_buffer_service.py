@@ -0,0 +1,360 @@
+# backend_python/services/checkin_buffer_service.py
+
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DataError, IntegrityError
+
+from config.settings import config
+from database.connection import SessionLocal
+from database.upsert import upsert_em_massa
+from models import models
+from services.shard_service import selecionar_shard
+from utils.logger import logger
+
+# Arquivo (fora do padrão dos segmentos) com os check-ins que o banco recusou de forma definitiva
+ARQUIVO_DESCARTADOS = "descartados.jsonl"
+
+# Erros que não se resolvem repetindo o mesmo registro (ex: sessão removida, chave estrangeira inválida)
+ERROS_PERMANENTES = (IntegrityError, DataError)
+
+class Segmento:
+    """Arquivo JSONL de check-ins ainda não gravados no banco, bloqueado (flock) pelo processo dono."""
+
+    def __init__(self, caminho: str, arquivo):
+        self.caminho = caminho
+        self.arquivo = arquivo
+        self.registros: list[dict] = []
+
+    @classmethod
+    def novo(cls, diretorio: str) -> "Segmento":
+        caminho = os.path.join(diretorio, f"checkins-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+        arquivo = open(caminho, "a", encoding="utf-8")
+        fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return cls(caminho, arquivo)
+
+    @classmethod
+    def adotar_orfao(cls, caminho: str) -> Optional["Segmento"]:
+        """Abre o segmento deixado por um processo encerrado; None se outro worker vivo ainda o detém."""
+        try:
+            arquivo = open(caminho, "r+", encoding="utf-8")
+        except FileNotFoundError:
+            # Gravado e removido pelo dono entre a listagem e a abertura
+            return None
+        try:
+            fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            arquivo.close()
+            return None
+        segmento = cls(caminho, arquivo)
+        for linha in arquivo:
+            try:
+                segmento.registros.append(json.loads(linha))
+            except json.JSONDecodeError:
+                # Última linha incompleta (queda durante a escrita): o check-in não chegou a ser confirmado
+                logger.warning(f"[CheckinBuffer] Linha incompleta ignorada em {caminho}.")
+        return segmento
+
+    def anexar(self, *registros: dict):
+        """Anexa os registros com um único fsync. Em caso de erro (ex: disco cheio), desfaz a escrita parcial."""
+        posicao = self.arquivo.tell()
+        try:
+            self.arquivo.write("".join(json.dumps(registro) + "\n" for registro in registros))
+            self.arquivo.flush()
+            os.fsync(self.arquivo.fileno())
+        except OSError:
+            # Uma linha pela metade seria concatenada à próxima e invalidaria um check-in confirmado
+            try:
+                self.arquivo.truncate(posicao)
+                self.arquivo.seek(posicao)
+            except (OSError, ValueError):
+                pass
+            raise
+        self.registros.extend(registros)
+
+    def descartar(self):
+        """Remove o arquivo depois que os registros foram gravados no banco."""
+        try:
+            os.remove(self.caminho)
+        except OSError as e:
+            # Os registros já estão no banco: se o arquivo sobrar, a regravação na próxima inicialização é inofensiva
+            logger.warning(f"[CheckinBuffer] Não foi possível remover {self.caminho}: {e}")
+        self.arquivo.close()
+
+class BufferCheckins:
+    """
+    Check-ins com escrita adiada (write-behind). Cada check-in é anexado ao segmento atual em disco
+    (com fsync) antes de ser confirmado ao cliente; uma thread grava os segmentos no banco em lotes,
+    a cada DESCARGA_CHECKINS_MS ou ao atingir LOTE_MAXIMO_CHECKINS registros, e só então apaga o arquivo.
+    Cada loja é gravada na sua própria transação: os registros de uma loja indisponível (ex: congelada
+    durante uma migração de shard) voltam ao segmento atual sem atrasar as demais, e os que o banco recusa
+    de forma definitiva vão para ARQUIVO_DESCARTADOS.
+    Segmentos deixados por um processo que caiu são regravados na inicialização (o upsert é idempotente).
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._segmento: Optional[Segmento] = None
+        self._a_gravar: deque[Segmento] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._ativo = False
+        self._janela_aceitos = deque()
+        # Loja -> instante (monotônico) da próxima tentativa após uma falha transitória
+        self._lojas_adiadas: dict[int, float] = {}
+        self._metricas = {
+            "aceitos": 0, "gravados": 0, "lotes": 0, "falhas": 0, "descartados": 0,
+            "orfaos_recuperados": 0, "erros_thread": 0,
+        }
+
+    @property
+    def ativo(self) -> bool:
+        return self._ativo
+
+    @property
+    def saudavel(self) -> bool:
+        """Ativo e com a thread de gravação em execução."""
+        return self._ativo and self._thread is not None and self._thread.is_alive()
+
+    def iniciar(self):
+        os.makedirs(config.DIRETORIO_BUFFER_CHECKINS, exist_ok=True)
+        for caminho in sorted(glob.glob(os.path.join(config.DIRETORIO_BUFFER_CHECKINS, "checkins-*.jsonl"))):
+            orfao = Segmento.adotar_orfao(caminho)
+            if orfao is not None:
+                self._a_gravar.append(orfao)
+                self._metricas["orfaos_recuperados"] += len(orfao.registros)
+        if self._a_gravar:
+            logger.info(f"[CheckinBuffer] {self._metricas['orfaos_recuperados']} check-ins pendentes recuperados do disco.")
+        self._segmento = Segmento.novo(config.DIRETORIO_BUFFER_CHECKINS)
+        self._ativo = True
+        self._thread = threading.Thread(target=self._laco, name="checkin-buffer", daemon=True)
+        self._thread.start()
+
+    def registrar(self, id_loja: int, id_sessao: int, id_membro: int, data_hora_checkin: datetime):
+        """
+        Grava o check-in no segmento em disco; ao retornar, ele sobrevive a uma queda do processo.
+        Levanta 503 se o buffer não puder aceitá-lo (thread de gravação parada, erro de disco).
+        """
+        registro = {
+            "id_loja": id_loja, "id_sessao": id_sessao, "id_membro": id_membro,
+            "data_hora_checkin": data_hora_checkin.isoformat(),
+        }
+        with self._condicao:
+            if not self.saudavel:
+                raise _erro_indisponivel()
+            try:
+                self._segmento.anexar(registro)
+            except OSError as e:
+                logger.error(f"[CheckinBuffer] Falha ao gravar o check-in em disco: {e}")
+                raise _erro_indisponivel()
+            self._metricas["aceitos"] += 1
+            agora = time.monotonic()
+            self._janela_aceitos.append(agora)
+            while agora - self._janela_aceitos[0] > 60:
+                self._janela_aceitos.popleft()
+            if len(self._segmento.registros) >= config.LOTE_MAXIMO_CHECKINS:
+                self._condicao.notify()
+
+    def _trocar_segmento(self):
+        # Chamado com a condição adquirida: o segmento cheio vai para a fila e os novos check-ins seguem num arquivo novo.
+        # O arquivo novo é criado antes da troca: se falhar, o segmento atual continua em uso.
+        if self._segmento is not None and self._segmento.registros:
+            novo = Segmento.novo(config.DIRETORIO_BUFFER_CHECKINS) if self._ativo else None
+            self._a_gravar.append(self._segmento)
+            self._segmento = novo
+
+    def _laco(self):
+        intervalo = config.DESCARGA_CHECKINS_MS / 1000
+        while True:
+            encerrando = not self._ativo
+            try:
+                with self._condicao:
+                    if self._ativo and len(self._segmento.registros) < config.LOTE_MAXIMO_CHECKINS:
+                        self._condicao.wait(timeout=intervalo)
+                    encerrando = not self._ativo
+                    self._trocar_segmento()
+                self._gravar_fila()
+            except Exception:
+                # A thread não pode morrer: o que não foi gravado continua em disco e na fila para o próximo ciclo
+                logger.exception("[CheckinBuffer] Erro no ciclo de gravação.")
+                with self._condicao:
+                    self._metricas["erros_thread"] += 1
+                if not encerrando:
+                    time.sleep(intervalo)
+            if encerrando:
+                return
+
+    def _gravar_fila(self):
+        """Grava cada segmento da fila uma vez; os registros a repetir passam para o segmento atual."""
+        for _ in range(len(self._a_gravar)):
+            segmento = self._a_gravar.popleft()
+            try:
+                a_repetir = self._gravar(segmento.registros)
+            except Exception:
+                # Ex: erro de disco ao mover um registro para os descartados; o segmento é tentado de novo
+                self._a_gravar.append(segmento)
+                raise
+            if a_repetir and not self._reenfileirar(a_repetir):
+                # Sem segmento atual (encerramento) ou sem espaço em disco: o arquivo antigo continua valendo
+                segmento.registros = a_repetir
+                self._a_gravar.append(segmento)
+                continue
+            segmento.descartar()
+
+    def _reenfileirar(self, registros: list[dict]) -> bool:
+        with self._condicao:
+            if self._segmento is None:
+                return False
+            try:
+                self._segmento.anexar(*registros)
+            except OSError as e:
+                logger.error(f"[CheckinBuffer] Falha ao regravar {len(registros)} check-ins pendentes: {e}")
+                return False
+        return True
+
+    def _gravar(self, registros: list[dict]) -> list[dict]:
+        """Grava um lote, uma transação por loja. Retorna os registros das lojas que devem ser repetidas."""
+        # Repetições do mesmo membro na mesma sessão: prevalece o check-in mais recente
+        # (registros reenfileirados ficam depois de outros mais novos no arquivo)
+        ultimos: dict[tuple, dict] = {}
+        for registro in registros:
+            chave = (registro["id_loja"], registro["id_sessao"], registro["id_membro"])
+            if chave not in ultimos or registro["data_hora_checkin"] >= ultimos[chave]["data_hora_checkin"]:
+                ultimos[chave] = registro
+        por_loja: dict[int, list[dict]] = {}
+        for registro in ultimos.values():
+            por_loja.setdefault(registro["id_loja"], []).append(registro)
+
+        a_repetir = []
+        agora = time.monotonic()
+        for id_loja, registros_loja in por_loja.items():
+            if self._lojas_adiadas.get(id_loja, 0) > agora:
+                a_repetir.extend(registros_loja)
+                continue
+            try:
+                self._gravar_loja(id_loja, registros_loja)
+            except ERROS_PERMANENTES:
+                # Algum registro nunca será aceito: grava um a um para separar os inválidos dos demais
+                a_repetir.extend(self._gravar_individualmente(id_loja, registros_loja))
+            except Exception as e:
+                self._adiar_loja(id_loja, len(registros_loja), e)
+                a_repetir.extend(registros_loja)
+        return a_repetir
+
+    def _gravar_individualmente(self, id_loja: int, registros: list[dict]) -> list[dict]:
+        for posicao, registro in enumerate(registros):
+            try:
+                self._gravar_loja(id_loja, [registro])
+            except ERROS_PERMANENTES as e:
+                self._descartar(registro, e)
+            except Exception as e:
+                self._adiar_loja(id_loja, len(registros) - posicao, e)
+                return registros[posicao:]
+        return []
+
+    def _gravar_loja(self, id_loja: int, registros: list[dict]):
+        linhas = [{
+            "id_sessao": registro["id_sessao"], "id_membro": registro["id_membro"], "status_presenca": "Presente",
+            "data_hora_checkin": datetime.fromisoformat(registro["data_hora_checkin"]),
+        } for registro in registros]
+        db = SessionLocal()
+        try:
+            selecionar_shard(db, id_loja)
+            upsert_em_massa(
+                db, models.PresencaSessao, linhas,
+                chaves=["id_sessao", "id_membro"], colunas_atualizar=["status_presenca", "data_hora_checkin"],
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self._lojas_adiadas.pop(id_loja, None)
+        with self._condicao:
+            self._metricas["gravados"] += len(registros)
+            self._metricas["lotes"] += 1
+
+    def _adiar_loja(self, id_loja: int, quantidade: int, erro: Exception):
+        # Falha transitória (loja congelada, banco indisponível): a loja espera antes de nova tentativa,
+        # com um aviso no log apenas na primeira falha da sequência
+        if id_loja not in self._lojas_adiadas:
+            detalhe = erro.detail if isinstance(erro, HTTPException) else erro
+            logger.warning(f"[CheckinBuffer] {quantidade} check-ins da loja {id_loja} adiados: {detalhe}")
+        self._lojas_adiadas[id_loja] = time.monotonic() + max(1.0, config.DESCARGA_CHECKINS_MS / 1000)
+        with self._condicao:
+            self._metricas["falhas"] += 1
+
+    def _descartar(self, registro: dict, erro: Exception):
+        linha = {**registro, "erro": str(erro)[:500], "descartado_em": datetime.now().isoformat()}
+        caminho = os.path.join(config.DIRETORIO_BUFFER_CHECKINS, ARQUIVO_DESCARTADOS)
+        with open(caminho, "a", encoding="utf-8") as arquivo:
+            fcntl.flock(arquivo, fcntl.LOCK_EX)
+            arquivo.write(json.dumps(linha) + "\n")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        with self._condicao:
+            self._metricas["descartados"] += 1
+        logger.error(
+            f"[CheckinBuffer] Check-in recusado pelo banco movido para {ARQUIVO_DESCARTADOS} "
+            f"(loja {registro['id_loja']}, sessão {registro['id_sessao']}, membro {registro['id_membro']}): {erro}"
+        )
+
+    def encerrar(self):
+        """Grava o que estiver pendente e encerra a thread (chamado no encerramento da aplicação)."""
+        with self._condicao:
+            if not self._ativo:
+                return
+            self._ativo = False
+            self._condicao.notify()
+        self._thread.join(timeout=30)
+        pendentes = sum(len(segmento.registros) for segmento in self._a_gravar)
+        if pendentes:
+            logger.warning(f"[CheckinBuffer] {pendentes} check-ins não gravados ficam em disco para a próxima inicialização.")
+        if self._segmento is not None:
+            self._segmento.descartar()
+
+    def obter_metricas(self) -> dict:
+        agora = time.monotonic()
+        with self._condicao:
+            while self._janela_aceitos and agora - self._janela_aceitos[0] > 60:
+                self._janela_aceitos.popleft()
+            pendentes = len(self._segmento.registros) if self._segmento else 0
+            return {
+                **self._metricas,
+                "ativo": self._ativo,
+                "thread_viva": self._thread is not None and self._thread.is_alive(),
+                "pid": os.getpid(),
+                "pendentes": pendentes + sum(len(segmento.registros) for segmento in self._a_gravar),
+                "segmentos_a_gravar": len(self._a_gravar),
+                "lojas_adiadas": len(self._lojas_adiadas),
+                "checkins_por_segundo_60s": round(len(self._janela_aceitos) / 60, 2),
+            }
+
+def _erro_indisponivel() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="O registro de presença está temporariamente indisponível. Tente novamente em instantes.",
+        headers={"Retry-After": "5"},
+    )
+
+buffer_checkins = BufferCheckins()
+
+def iniciar():
+    if config.CHECKIN_EM_BUFFER:
+        buffer_checkins.iniciar()
+        logger.info(f"[CheckinBuffer] Check-ins com escrita adiada em {config.DIRETORIO_BUFFER_CHECKINS}.")
+
+def encerrar():
+    buffer_checkins.encerrar()
+
+def obter_metricas() -> dict:
+    return buffer_checkins.obter_metricas()
@@ -15,7 +15,6 @@ def create_condecoracao(db: Session, condecoracao_data: CondecoracaoCreate) -> C
     nova_condecoracao = Condecoracao(**condecoracao_data.model_dump())
     db.add(nova_condecoracao)
     db.commit()
-    db.refresh(nova_condecoracao)
     return nova_condecoracao
 
 def get_condecoracao_by_id(db: Session, condecoracao_id: int) -> Condecoracao:
@@ -38,7 +37,6 @@ def update_condecoracao(db: Session, condecoracao_id: int, condecoracao_data: Co
         setattr(db_condecoracao, key, value)
 
     db.commit()
-    db.refresh(db_condecoracao)
     return db_condecoracao
 
 def delete_condecoracao(db: Session, condecoracao_id: int):
@@ -15,7 +15,6 @@ def create_familiar(db: Session, familiar_data: FamiliarCreate) -> Familiar:
     novo_familiar = Familiar(**familiar_data.model_dump())
     db.add(novo_familiar)
     db.commit()
-    db.refresh(novo_familiar)
     return novo_familiar
 
 def get_familiar_by_id(db: Session, familiar_id: int) -> Familiar:
@@ -38,7 +37,6 @@ def update_familiar(db: Session, familiar_id: int, familiar_data: FamiliarUpdate
         setattr(db_familiar, key, value)
 
     db.commit()
-    db.refresh(db_familiar)
     return db_familiar
 
 def delete_familiar(db: Session, familiar_id: int):
@@ -24,7 +24,6 @@ def create_historico_cargo(db: Session, historico_data: HistoricoCargoCreate) ->
     novo_historico = HistoricoCargo(**historico_data.model_dump())
     db.add(novo_historico)
     db.commit()
-    db.refresh(novo_historico)
     return novo_historico
 
 def get_historico_by_id(db: Session, historico_id: int) -> HistoricoCargo:
@@ -47,7 +46,6 @@ def update_historico_cargo(db: Session, historico_id: int, historico_data: Histo
         setattr(db_historico, key, value)
 
     db.commit()
-    db.refresh(db_historico)
     return db_historico
 
 def delete_historico_cargo(db: Session, historico_id: int):
@@ -14,7 +14,6 @@ def create_lodge_class(db: Session, lodge_class: LodgeClassCreate) -> Classe:
     new_lodge_class = Classe(**lodge_class.model_dump())
     db.add(new_lodge_class)
     db.commit()
-    db.refresh(new_lodge_class)
     return new_lodge_class
 
 def get_lodge_class(db: Session, lodge_class_id: int) -> Classe:
@@ -38,7 +37,6 @@ def update_lodge_class(db: Session, lodge_class_id: int, lodge_class_update: Lod
     
     db.add(db_lodge_class)
     db.commit()
-    db.refresh(db_lodge_class)
     return db_lodge_class
 
 def delete_lodge_class(db: Session, lodge_class_id: int):
@@ -1,10 +1,15 @@
 # backend_python/services/lodge_member_service.py
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from database.sharding import shard_da_sessao
 from models.models import MembroLoja, AssociacaoMembroLoja, Cargo, Loja
 from schemas.lodge_member_schema import LodgeMemberCreate, LodgeMemberUpdate
 from fastapi import HTTPException, status
-import bcrypt
+from middleware.authorize_middleware import invalidar_usuario_em_cache
+from services import password_service
+from services.authorization_service import invalidar_cargo_da_associacao
 
 def criar_membro_loja(db: Session, membro: LodgeMemberCreate, tenant_id: int):
     """Cria um novo membro da loja e sua associação com um cargo."""
@@ -19,16 +24,16 @@ def criar_membro_loja(db: Session, membro: LodgeMemberCreate, tenant_id: int):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cargo não encontrado.")
 
     # Cria o MembroLoja
-    senha_hash = bcrypt.hashpw(membro.senha.encode('utf-8'), bcrypt.gensalt())
+    senha_hash = password_service.hash_senha_sync(membro.senha)
     novo_membro = MembroLoja(
         nome=membro.nome,
         email=membro.email,
-        senha_hash=senha_hash.decode('utf-8'),
+        senha_hash=senha_hash,
         tenant_id=tenant_id
     )
     db.add(novo_membro)
-    db.commit()
-    db.refresh(novo_membro)
+    # Flush (não commit) para obter o id: membro e associação entram na mesma transação
+    db.flush()
 
     # Cria a AssociaçãoMembroLoja
     nova_associacao = AssociacaoMembroLoja(
@@ -37,7 +42,6 @@ def criar_membro_loja(db: Session, membro: LodgeMemberCreate, tenant_id: int):
     )
     db.add(nova_associacao)
     db.commit()
-    db.refresh(nova_associacao)
 
     return novo_membro
 
@@ -45,6 +49,11 @@ def obter_todos_membros_loja(db: Session, tenant_id: int):
     """Retorna todos os membros de uma loja específica."""
     return db.query(MembroLoja).filter(MembroLoja.tenant_id == tenant_id).all()
 
+async def obter_todos_membros_loja_async(db: AsyncSession, tenant_id: int):
+    """Equivalente assíncrono de `obter_todos_membros_loja`."""
+    resultado = await db.execute(select(MembroLoja).where(MembroLoja.tenant_id == tenant_id))
+    return resultado.scalars().all()
+
 def obter_membro_loja_por_id(db: Session, membro_id: int, tenant_id: int):
     """Retorna um membro da loja específico pelo ID e tenant_id."""
     membro = db.query(MembroLoja).filter(
@@ -62,9 +71,10 @@ def atualizar_membro_loja(db: Session, membro_id: int, tenant_id: int, membro_at
     update_data = membro_atualizacao.model_dump(exclude_unset=True)
     
     if "senha" in update_data and update_data["senha"]:
-        update_data["senha_hash"] = bcrypt.hashpw(update_data["senha"].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        update_data["senha_hash"] = password_service.hash_senha_sync(update_data["senha"])
         del update_data["senha"]
     
+    associacao = None
     if "role_id" in update_data and update_data["role_id"]:
         # Atualiza a associação de cargo
         cargo = db.query(Cargo).filter(Cargo.id == update_data["role_id"]).first()
@@ -89,7 +99,10 @@ def atualizar_membro_loja(db: Session, membro_id: int, tenant_id: int, membro_at
 
     db.add(db_membro)
     db.commit()
-    db.refresh(db_membro)
+    invalidar_usuario_em_cache("lodge_member", membro_id, shard_da_sessao(db))
+    if associacao is not None:
+        # Depois do commit: uma leitura concorrente não pode voltar a guardar o cargo antigo
+        invalidar_cargo_da_associacao(db, associacao.id)
     return db_membro
 
 def deletar_membro_loja(db: Session, membro_id: int, tenant_id: int):
@@ -101,4 +114,5 @@ def deletar_membro_loja(db: Session, membro_id: int, tenant_id: int):
     
     db.delete(db_membro)
     db.commit()
+    invalidar_usuario_em_cache("lodge_member", membro_id, shard_da_sessao(db))
     return {"mensagem": "Membro da Loja deletado com sucesso."}
@@ -0,0 +1,49 @@
+# backend_python/services/login_admission_service.py
+
+import math
+import threading
+
+from fastapi import HTTPException, status
+
+from config.settings import config
+from services import password_service
+from utils.logger import logger
+from utils.rate_limit_utils import LimitadorTokenBucket, consumir_todos
+
+_limitador_ip = LimitadorTokenBucket(config.LOGIN_TENTATIVAS_POR_MINUTO_IP / 60, config.LOGIN_RAJADA_IP)
+_limitador_email = LimitadorTokenBucket(config.LOGIN_TENTATIVAS_POR_MINUTO_EMAIL / 60, config.LOGIN_RAJADA_EMAIL)
+
+_metricas_lock = threading.Lock()
+_metricas = {"admitidas": 0, "rejeitadas_ip": 0, "rejeitadas_email": 0}
+
+def admitir_login(ip_cliente: str, email: str):
+    """
+    Controle de admissão antes da verificação bcrypt: cada tentativa consome uma ficha do bucket do IP
+    e uma do bucket do par (e-mail, IP). Sem saldo, responde 429 imediatamente, sem gastar CPU com o hash.
+    O bucket do e-mail é por IP para que tentativas de terceiros não bloqueiem o login do titular.
+    """
+    chave_email = email.strip().lower()
+    espera = consumir_todos([(_limitador_ip, ip_cliente), (_limitador_email, (chave_email, ip_cliente))])
+    if espera == 0:
+        with _metricas_lock:
+            _metricas["admitidas"] += 1
+        return
+
+    motivo = "rejeitadas_ip" if _limitador_ip.segundos_ate_liberar(ip_cliente) > 0 else "rejeitadas_email"
+    with _metricas_lock:
+        _metricas[motivo] += 1
+    logger.warning(f"[LoginAdmission] Tentativa de login recusada ({motivo}) para {chave_email} a partir de {ip_cliente}.")
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Muitas tentativas de login. Tente novamente mais tarde.",
+        headers={"Retry-After": str(math.ceil(espera))},
+    )
+
+def obter_metricas() -> dict:
+    """Retorna tentativas admitidas/recusadas e a estimativa de CPU poupada (recusas x custo médio do bcrypt)."""
+    with _metricas_lock:
+        metricas = dict(_metricas)
+    rejeitadas = metricas["rejeitadas_ip"] + metricas["rejeitadas_email"]
+    tempo_medio_ms = password_service.obter_metricas()["tempo_medio_ms"]
+    metricas["cpu_poupada_ms"] = round(rejeitadas * tempo_medio_ms, 2)
+    return metricas
@@ -14,5 +14,4 @@ def create_loja_externa(db: Session, loja_externa: loja_externa_schema.LojaExter
     db_loja_externa = models.LojaExterna(**loja_externa.dict())
     db.add(db_loja_externa)
     db.commit()
-    db.refresh(db_loja_externa)
     return db_loja_externa
\ No newline at end of file
@@ -1,11 +1,14 @@
 # backend_python/services/membro_service.py
 
 from sqlalchemy.orm import Session
+from database.connection import carregar_colunas_geradas
+from database.sharding import shard_da_sessao
 from fastapi import HTTPException, status
-import bcrypt
 
 from models.models import MembroLoja, Loja
 from schemas.membro_schema import MembroCreate, MembroUpdate
+from middleware.authorize_middleware import invalidar_usuario_em_cache
+from services import password_service
 
 def create_membro(db: Session, membro_data: MembroCreate) -> MembroLoja:
     """Cria um novo membro no banco de dados."""
@@ -20,18 +23,17 @@ def create_membro(db: Session, membro_data: MembroCreate) -> MembroLoja:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email já cadastrado.")
 
     # Criptografa a senha
-    senha_hash = bcrypt.hashpw(membro_data.senha.encode('utf-8'), bcrypt.gensalt())
+    senha_hash = password_service.hash_senha_sync(membro_data.senha)
 
     # Cria o objeto do novo membro
     novo_membro = MembroLoja(
         **membro_data.model_dump(exclude={'senha'}),
-        senha_hash=senha_hash.decode('utf-8')
+        senha_hash=senha_hash
     )
 
     db.add(novo_membro)
     db.commit()
-    db.refresh(novo_membro)
-    return novo_membro
+    return carregar_colunas_geradas(db, novo_membro)
 
 def get_membro_by_id(db: Session, membro_id: int) -> MembroLoja:
     """Busca um membro pelo seu ID."""
@@ -52,20 +54,20 @@ def update_membro(db: Session, membro_id: int, membro_data: MembroUpdate) -> Mem
 
     # Se a senha for fornecida, criptografa a nova senha
     if "senha" in update_data and update_data["senha"]:
-        senha_hash = bcrypt.hashpw(update_data["senha"].encode('utf-8'), bcrypt.gensalt())
-        db_membro.senha_hash = senha_hash.decode('utf-8')
+        db_membro.senha_hash = password_service.hash_senha_sync(update_data["senha"])
         del update_data["senha"]
 
     for key, value in update_data.items():
         setattr(db_membro, key, value)
 
     db.commit()
-    db.refresh(db_membro)
-    return db_membro
+    invalidar_usuario_em_cache("lodge_member", membro_id, shard_da_sessao(db))
+    return carregar_colunas_geradas(db, db_membro)
 
 def delete_membro(db: Session, membro_id: int):
     """Deleta um membro do banco de dados."""
     db_membro = get_membro_by_id(db, membro_id)
     db.delete(db_membro)
     db.commit()
+    invalidar_usuario_em_cache("lodge_member", membro_id, shard_da_sessao(db))
     return {"ok": True}
@@ -0,0 +1,246 @@
+# backend_python/services/password_service.py
+
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from config.settings import config
+from database.connection import SessionLocal
+from database.sharding import SHARD_DIRETORIO, engine_do_shard
+from utils.logger import logger
+
+# Custo padrão do bcrypt até a calibração (ou BCRYPT_COST) definir o da implantação
+CUSTO_PADRAO_BCRYPT = 12
+
+# --- Funções executadas nos processos de trabalho (precisam ser de nível de módulo) ---
+
+def _gerar_hash(senha: str, custo: int) -> str:
+    return bcrypt.hashpw(senha.encode('utf-8'), bcrypt.gensalt(rounds=custo)).decode('utf-8')
+
+def _verificar(senha: str, senha_hash: str) -> bool:
+    return bcrypt.checkpw(senha.encode('utf-8'), senha_hash.encode('utf-8'))
+
+def _medir_hash_ms(custo: int, repeticoes: int = 3) -> float:
+    """Menor tempo (em ms) de `repeticoes` hashes com o custo informado."""
+    amostras = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        bcrypt.hashpw(b"calibracao-sigma", bcrypt.gensalt(rounds=custo))
+        amostras.append((time.perf_counter() - inicio) * 1000)
+    return min(amostras)
+
+# --- Pool de processos e controle de concorrência ---
+
+_custo_atual: int = config.CUSTO_BCRYPT or CUSTO_PADRAO_BCRYPT
+_tarefas_rehash: set = set()
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Limite dos chamadores síncronos (threadpool e scripts); os assíncronos esperam num semáforo do
+# próprio event loop, sem ocupar threads do executor padrão enquanto aguardam
+_limite = threading.BoundedSemaphore(config.MAX_HASH_SENHA_EM_ANDAMENTO)
+_limites_por_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_metricas_lock = threading.Lock()
+_metricas = {
+    "em_andamento": 0,
+    "na_fila": 0,
+    "max_na_fila": 0,
+    "total": 0,
+    "tempo_total_ms": 0.0,
+    "tempo_max_ms": 0.0,
+    "rehashes": 0,
+}
+
+def _obter_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=config.PROCESSOS_HASH_SENHA)
+                logger.info(f"[PasswordService] Pool de hash iniciado com {config.PROCESSOS_HASH_SENHA} processos.")
+    return _executor
+
+def _entrar_na_fila():
+    with _metricas_lock:
+        _metricas["na_fila"] += 1
+        _metricas["max_na_fila"] = max(_metricas["max_na_fila"], _metricas["na_fila"])
+
+def _sair_da_fila():
+    with _metricas_lock:
+        _metricas["na_fila"] -= 1
+
+def _iniciar_execucao(enfileirada: bool):
+    with _metricas_lock:
+        if enfileirada:
+            _metricas["na_fila"] -= 1
+        _metricas["em_andamento"] += 1
+
+def _finalizar_execucao(inicio: float):
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    with _metricas_lock:
+        _metricas["em_andamento"] -= 1
+        _metricas["total"] += 1
+        _metricas["tempo_total_ms"] += duracao_ms
+        _metricas["tempo_max_ms"] = max(_metricas["tempo_max_ms"], duracao_ms)
+
+def _limite_do_loop() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    limite = _limites_por_loop.get(loop)
+    if limite is None:
+        limite = _limites_por_loop[loop] = asyncio.Semaphore(config.MAX_HASH_SENHA_EM_ANDAMENTO)
+    return limite
+
+def _agendar_liberacao(loop: asyncio.AbstractEventLoop, limite: asyncio.Semaphore, inicio: float):
+    # Chamado na thread do pool de processos: o semáforo do loop só pode ser tocado no próprio loop
+    def liberar():
+        limite.release()
+        _finalizar_execucao(inicio)
+    try:
+        loop.call_soon_threadsafe(liberar)
+    except RuntimeError:
+        # Loop já encerrado: não há mais quem espere pela vaga
+        _finalizar_execucao(inicio)
+
+async def _executar(funcao, *args):
+    """Executa `funcao` no pool sem bloquear o event loop, respeitando o limite de operações simultâneas."""
+    inicio = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    limite = _limite_do_loop()
+    enfileirada = limite.locked()
+    if enfileirada:
+        _entrar_na_fila()
+    try:
+        await limite.acquire()
+    except asyncio.CancelledError:
+        if enfileirada:
+            _sair_da_fila()
+        raise
+    _iniciar_execucao(enfileirada)
+    try:
+        futuro = _obter_executor().submit(funcao, *args)
+    except BaseException:
+        limite.release()
+        _finalizar_execucao(inicio)
+        raise
+    # A vaga acompanha o processo, não a requisição: se esta for cancelada, o hash em curso
+    # continua ocupando o pool e a vaga só é devolvida quando ele termina.
+    futuro.add_done_callback(lambda _: _agendar_liberacao(loop, limite, inicio))
+    return await asyncio.wrap_future(futuro)
+
+def _executar_sync(funcao, *args):
+    """Versão bloqueante de `_executar`, para serviços síncronos (executados no threadpool) e scripts."""
+    inicio = time.perf_counter()
+    enfileirada = not _limite.acquire(blocking=False)
+    if enfileirada:
+        _entrar_na_fila()
+        _limite.acquire()
+    _iniciar_execucao(enfileirada)
+    try:
+        return _obter_executor().submit(funcao, *args).result()
+    finally:
+        _limite.release()
+        _finalizar_execucao(inicio)
+
+# --- API pública ---
+
+async def hash_senha(senha: str) -> str:
+    """Gera o hash bcrypt de uma senha em um processo separado, com o custo calibrado."""
+    return await _executar(_gerar_hash, senha, _custo_atual)
+
+async def verificar_senha(senha: str, senha_hash: str) -> bool:
+    """Verifica uma senha contra o hash bcrypt em um processo separado."""
+    return await _executar(_verificar, senha, senha_hash)
+
+def hash_senha_sync(senha: str) -> str:
+    """Equivalente síncrono de `hash_senha`."""
+    return _executar_sync(_gerar_hash, senha, _custo_atual)
+
+def verificar_senha_sync(senha: str, senha_hash: str) -> bool:
+    """Equivalente síncrono de `verificar_senha`."""
+    return _executar_sync(_verificar, senha, senha_hash)
+
+def custo_do_hash(senha_hash: str) -> Optional[int]:
+    """Extrai o fator de custo de um hash no formato '$2b$12$...'."""
+    try:
+        return int(senha_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+async def calibrar_custo() -> int:
+    """
+    Define o custo do bcrypt para esta implantação. Usa BCRYPT_COST, se configurado; caso contrário,
+    mede o custo mínimo e escolhe o maior custo cujo tempo estimado (dobra a cada incremento)
+    não ultrapassa BCRYPT_TARGET_MS.
+    """
+    global _custo_atual
+    if config.CUSTO_BCRYPT:
+        _custo_atual = config.CUSTO_BCRYPT
+        return _custo_atual
+
+    base_ms = await asyncio.wrap_future(_obter_executor().submit(_medir_hash_ms, config.CUSTO_MINIMO_BCRYPT))
+    custo = config.CUSTO_MINIMO_BCRYPT
+    while custo < config.CUSTO_MAXIMO_BCRYPT and base_ms * 2 ** (custo + 1 - config.CUSTO_MINIMO_BCRYPT) <= config.TEMPO_ALVO_BCRYPT_MS:
+        custo += 1
+    _custo_atual = custo
+    estimado_ms = base_ms * 2 ** (custo - config.CUSTO_MINIMO_BCRYPT)
+    logger.info(f"[PasswordService] Custo bcrypt calibrado: {custo} (~{estimado_ms:.0f} ms; alvo {config.TEMPO_ALVO_BCRYPT_MS} ms).")
+    return _custo_atual
+
+def _gravar_novo_hash(modelo, usuario_id: int, hash_antigo: str, hash_novo: str, shard: str) -> int:
+    # Grava no mesmo shard em que o login encontrou o usuário (as tabelas globais seguem no diretório)
+    db = SessionLocal(bind=engine_do_shard(shard))
+    try:
+        # Só substitui se a senha não tiver sido alterada nesse meio tempo
+        alterados = db.query(modelo).filter(modelo.id == usuario_id, modelo.senha_hash == hash_antigo).update(
+            {"senha_hash": hash_novo}, synchronize_session=False
+        )
+        db.commit()
+        return alterados
+    finally:
+        db.close()
+
+async def _rehash(modelo, usuario_id: int, senha: str, hash_antigo: str, shard: str):
+    try:
+        hash_novo = await hash_senha(senha)
+        if await asyncio.to_thread(_gravar_novo_hash, modelo, usuario_id, hash_antigo, hash_novo, shard):
+            with _metricas_lock:
+                _metricas["rehashes"] += 1
+    except Exception as e:
+        logger.error(f"[PasswordService] Falha ao refazer o hash de {modelo.__name__} {usuario_id}: {e}")
+
+def agendar_rehash_se_necessario(modelo, usuario_id: int, senha: str, senha_hash: str, shard: str = SHARD_DIRETORIO):
+    """
+    Após um login bem-sucedido, agenda em segundo plano a regravação do hash caso ele tenha
+    sido gerado com um custo menor que o atual. Não atrasa a resposta do login.
+    Hashes mais fortes são mantidos: processos calibrados com custos diferentes não se revezam
+    regravando o mesmo hash.
+    `shard` é o da sessão que leu o usuário (`shard_da_sessao`), onde o novo hash é gravado.
+    """
+    custo = custo_do_hash(senha_hash)
+    if custo is None or custo >= _custo_atual:
+        return
+    tarefa = asyncio.get_running_loop().create_task(_rehash(modelo, usuario_id, senha, senha_hash, shard))
+    _tarefas_rehash.add(tarefa)
+    tarefa.add_done_callback(_tarefas_rehash.discard)
+
+def obter_metricas() -> dict:
+    """Retorna profundidade da fila e latência das operações de hash."""
+    with _metricas_lock:
+        metricas = dict(_metricas)
+    metricas["tempo_medio_ms"] = round(metricas["tempo_total_ms"] / metricas["total"], 2) if metricas["total"] else 0.0
+    metricas["custo_bcrypt"] = _custo_atual
+    metricas["processos"] = config.PROCESSOS_HASH_SENHA
+    metricas["max_em_andamento"] = config.MAX_HASH_SENHA_EM_ANDAMENTO
+    return metricas
+
+def encerrar_pool():
+    """Finaliza o pool de processos (chamado no encerramento da aplicação)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -1,17 +1,22 @@
 # backend_python/services/permission_service.py
 
 from sqlalchemy.orm import Session
+from database.connection import carregar_colunas_geradas
+from database.retry import repetir_em_conflito
 from models.models import Permissao
 from schemas.permission_schema import PermissionCreate, PermissionUpdate
 from fastapi import HTTPException, status
+from services.authorization_service import motor_rbac, incrementar_versao_cargos_com_permissao, indices_bit_livres
 
+@repetir_em_conflito()
 def criar_permissao(db: Session, permissao: PermissionCreate):
     """Cria uma nova permissão no banco de dados."""
-    db_permissao = Permissao(acao=permissao.acao, descricao=permissao.descricao)
+    indice_bit = next(indices_bit_livres(db))
+    db_permissao = Permissao(acao=permissao.acao, descricao=permissao.descricao, indice_bit=indice_bit)
     db.add(db_permissao)
     db.commit()
-    db.refresh(db_permissao)
-    return db_permissao
+    motor_rbac.registrar_permissao(db_permissao.acao, db_permissao.indice_bit)
+    return carregar_colunas_geradas(db, db_permissao)
 
 def obter_todas_permissoes(db: Session):
     """Retorna todas as permissões do banco de dados."""
@@ -34,14 +39,16 @@ def atualizar_permissao(db: Session, permissao_id: int, permissao_atualizacao: P
 
     db.add(db_permissao)
     db.commit()
-    db.refresh(db_permissao)
-    return db_permissao
+    motor_rbac.registrar_permissao(db_permissao.acao, db_permissao.indice_bit)
+    return carregar_colunas_geradas(db, db_permissao)
 
 def deletar_permissao(db: Session, permissao_id: int):
     """Deleta uma permissão do banco de dados."""
     db_permissao = obter_permissao_por_id(db, permissao_id)
+    incrementar_versao_cargos_com_permissao(db, permissao_id)
     db.delete(db_permissao)
     db.commit()
+    motor_rbac.carregar(db)
     return {"mensagem": "Permissão deletada com sucesso."}
 
 def ensure_session_permissions(db: Session):
@@ -51,13 +58,22 @@ def ensure_session_permissions(db: Session):
         {"acao": "sessao:gerenciar_presenca", "descricao": "Permite manipular a lista de presença manualmente."},
     ]
 
+    # Uma consulta para as existentes e um único commit para as criadas
+    acoes = [perm_data["acao"] for perm_data in permissions_to_ensure]
+    existentes = {perm.acao for perm in db.query(Permissao).filter(Permissao.acao.in_(acoes)).all()}
+    new_perms = []
+    livres = None
     for perm_data in permissions_to_ensure:
-        existing_perm = db.query(Permissao).filter(Permissao.acao == perm_data["acao"]).first()
-        if not existing_perm:
-            new_perm = Permissao(acao=perm_data["acao"], descricao=perm_data["descricao"])
+        if perm_data["acao"] not in existentes:
+            livres = livres or indices_bit_livres(db)
+            new_perm = Permissao(acao=perm_data["acao"], descricao=perm_data["descricao"], indice_bit=next(livres))
             db.add(new_perm)
-            db.commit()
-            db.refresh(new_perm)
-            print(f"Permissão criada: {new_perm.acao}")
+            new_perms.append(new_perm)
         else:
-            print(f"Permissão já existe: {existing_perm.acao}")
\ No newline at end of file
+            print(f"Permissão já existe: {perm_data['acao']}")
+
+    if new_perms:
+        db.commit()
+        for new_perm in new_perms:
+            motor_rbac.registrar_permissao(new_perm.acao, new_perm.indice_bit)
+            print(f"Permissão criada: {new_perm.acao}")
\ No newline at end of file
@@ -11,7 +11,6 @@ def create_potencia(db: Session, potencia: PotenciaCreate) -> Potencia:
     new_potencia = Potencia(**potencia.model_dump())
     db.add(new_potencia)
     db.commit()
-    db.refresh(new_potencia)
     return new_potencia
 
 # ... (get_potencia, get_all_potencias, update_potencia, delete_potencia)
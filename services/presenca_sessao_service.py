@@ -6,6 +6,10 @@ from schemas import presenca_sessao_schema
 from datetime import datetime
 
 def get_presencas_sessao(db: Session, skip: int = 0, limit: int = 100):
+    """
+    Linhas de presença gravadas, paginadas. Não inclui as ausências derivadas das sessões do modo
+    esparso (não têm linha própria); a lista completa de uma sessão vem de GET /sessoes/{id}.
+    """
     return db.query(models.PresencaSessao).offset(skip).limit(limit).all()
 
 def get_presenca_sessao(db: Session, presenca_sessao_id: int):
@@ -15,7 +19,6 @@ def create_presenca_sessao(db: Session, presenca_sessao: presenca_sessao_schema.
     db_presenca_sessao = models.PresencaSessao(**presenca_sessao.dict())
     db.add(db_presenca_sessao)
     db.commit()
-    db.refresh(db_presenca_sessao)
     return db_presenca_sessao
 
 def update_presenca_sessao(db: Session, presenca_sessao_id: int, presenca_update: presenca_sessao_schema.PresencaSessaoBase):
@@ -25,5 +28,4 @@ def update_presenca_sessao(db: Session, presenca_sessao_id: int, presenca_update
             setattr(db_presenca, key, value)
         db_presenca.data_hora_checkin = datetime.now()
         db.commit()
-        db.refresh(db_presenca)
     return db_presenca
\ No newline at end of file
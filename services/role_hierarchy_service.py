@@ -0,0 +1,132 @@
+# backend_python/services/role_hierarchy_service.py
+
+from collections import defaultdict
+
+from sqlalchemy import select, delete, insert
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from models.models import Cargo, cargos_heranca, cargos_permissoes, cargos_permissoes_efetivas
+from services.authorization_service import motor_rbac, incrementar_versao_cargo
+
+def _carregar_arestas(db: Session) -> tuple[dict, dict]:
+    """Retorna os mapas {cargo: herdados} e {cargo: herdeiros} da tabela de herança."""
+    herdados, herdeiros = defaultdict(set), defaultdict(set)
+    for id_cargo, id_herdado in db.execute(select(cargos_heranca.c.id_cargo, cargos_heranca.c.id_cargo_herdado)):
+        herdados[id_cargo].add(id_herdado)
+        herdeiros[id_herdado].add(id_cargo)
+    return herdados, herdeiros
+
+def _alcancaveis(origem: int, arestas: dict) -> set[int]:
+    """Conjunto de cargos alcançáveis a partir de `origem` (inclusive) seguindo `arestas`."""
+    visitados, pilha = set(), [origem]
+    while pilha:
+        atual = pilha.pop()
+        if atual in visitados:
+            continue
+        visitados.add(atual)
+        pilha.extend(arestas.get(atual, ()))
+    return visitados
+
+def atualizar_fecho(db: Session, id_cargo: int) -> set[int]:
+    """
+    Recalcula as permissões efetivas do cargo e de todos os cargos que herdam dele, gravando apenas
+    as diferenças em `cargos_permissoes_efetivas` e incrementando a versão dos cargos alterados.
+    Deve ser chamado na mesma transação da alteração (aresta ou atribuição). Retorna os cargos alterados.
+    """
+    herdados, herdeiros = _carregar_arestas(db)
+    afetados = _alcancaveis(id_cargo, herdeiros)
+    # Os afetados dependem de cargos fora do conjunto, cujo fecho atual continua válido
+    necessarios = set().union(*(_alcancaveis(c, herdados) for c in afetados))
+
+    diretas = defaultdict(set)
+    for c, p in db.execute(
+        select(cargos_permissoes.c.id_cargo, cargos_permissoes.c.id_permissao)
+        .where(cargos_permissoes.c.id_cargo.in_(necessarios))
+    ):
+        diretas[c].add(p)
+    atuais = defaultdict(set)
+    for c, p in db.execute(
+        select(cargos_permissoes_efetivas.c.id_cargo, cargos_permissoes_efetivas.c.id_permissao)
+        .where(cargos_permissoes_efetivas.c.id_cargo.in_(necessarios))
+    ):
+        atuais[c].add(p)
+
+    efetivas: dict[int, set] = {c: atuais[c] for c in necessarios - afetados}
+
+    def calcular(cargo: int) -> set:
+        if cargo not in efetivas:
+            resultado = set(diretas[cargo])
+            for herdado in herdados.get(cargo, ()):
+                resultado |= calcular(herdado)
+            efetivas[cargo] = resultado
+        return efetivas[cargo]
+
+    alterados = set()
+    for cargo in afetados:
+        novas = calcular(cargo)
+        removidas, adicionadas = atuais[cargo] - novas, novas - atuais[cargo]
+        if removidas:
+            db.execute(delete(cargos_permissoes_efetivas).where(
+                cargos_permissoes_efetivas.c.id_cargo == cargo,
+                cargos_permissoes_efetivas.c.id_permissao.in_(removidas)
+            ))
+        if adicionadas:
+            db.execute(insert(cargos_permissoes_efetivas), [
+                {"id_cargo": cargo, "id_permissao": p} for p in adicionadas
+            ])
+        if removidas or adicionadas:
+            incrementar_versao_cargo(db, cargo)
+            alterados.add(cargo)
+    return alterados
+
+def reconstruir_fechos(db: Session):
+    """Recalcula o fecho de todos os cargos (carga inicial ou reparo). Não faz commit."""
+    herdados, herdeiros = _carregar_arestas(db)
+    raizes = [id_cargo for id_cargo in db.execute(select(Cargo.id)).scalars() if not herdados.get(id_cargo)]
+    for raiz in raizes:
+        atualizar_fecho(db, raiz)
+
+def recompilar_cargos(db: Session, cargos: set[int]):
+    """Propaga para a tabela RBAC em memória os cargos alterados (após o commit)."""
+    for cargo in cargos:
+        motor_rbac.recompilar_cargo(db, cargo)
+
+def adicionar_heranca(db: Session, role_id: int, inherited_role_id: int):
+    """Faz o cargo `role_id` herdar as permissões de `inherited_role_id`, rejeitando ciclos."""
+    cargos = db.query(Cargo).filter(Cargo.id.in_([role_id, inherited_role_id])).count()
+    if cargos != len({role_id, inherited_role_id}):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cargo não encontrado.")
+
+    herdados, _ = _carregar_arestas(db)
+    if inherited_role_id in herdados.get(role_id, ()):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Herança já existe para este cargo.")
+    if role_id in _alcancaveis(inherited_role_id, herdados):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A herança criaria um ciclo entre cargos.")
+
+    db.execute(insert(cargos_heranca).values(id_cargo=role_id, id_cargo_herdado=inherited_role_id))
+    alterados = atualizar_fecho(db, role_id)
+    db.commit()
+    recompilar_cargos(db, alterados)
+    return {"mensagem": "Herança de cargo adicionada com sucesso."}
+
+def remover_heranca(db: Session, role_id: int, inherited_role_id: int):
+    """Remove a herança entre dois cargos e recalcula o fecho dos afetados."""
+    resultado = db.execute(delete(cargos_heranca).where(
+        cargos_heranca.c.id_cargo == role_id,
+        cargos_heranca.c.id_cargo_herdado == inherited_role_id
+    ))
+    if resultado.rowcount == 0:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Herança não encontrada.")
+
+    alterados = atualizar_fecho(db, role_id)
+    db.commit()
+    recompilar_cargos(db, alterados)
+    return {"mensagem": "Herança de cargo removida com sucesso."}
+
+def obter_cargos_herdados(db: Session, role_id: int):
+    """Retorna os cargos dos quais o cargo herda diretamente."""
+    cargo = db.query(Cargo).filter(Cargo.id == role_id).first()
+    if not cargo:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cargo não encontrado.")
+    return cargo.cargos_herdados
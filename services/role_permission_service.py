@@ -1,9 +1,10 @@
 # backend_python/services/role_permission_service.py
 
 from sqlalchemy.orm import Session
-from models.models import CargoPermissao, Cargo, Permissao
+from models.models import CargoPermissao, Cargo, Permissao, cargos_permissoes_efetivas
 from schemas.role_permission_schema import RolePermissionCreate
 from fastapi import HTTPException, status
+from services.role_hierarchy_service import atualizar_fecho, recompilar_cargos
 
 def atribuir_permissao_a_cargo(db: Session, role_id: int, permission_id: int):
     """Atribui uma permissão a um cargo."""
@@ -27,8 +28,10 @@ def atribuir_permissao_a_cargo(db: Session, role_id: int, permission_id: int):
 
     nova_associacao = CargoPermissao(role_id=role_id, permission_id=permission_id)
     db.add(nova_associacao)
+    db.flush()
+    alterados = atualizar_fecho(db, role_id)
     db.commit()
-    db.refresh(nova_associacao)
+    recompilar_cargos(db, alterados)
     return nova_associacao
 
 def remover_permissao_de_cargo(db: Session, role_id: int, permission_id: int):
@@ -42,17 +45,22 @@ def remover_permissao_de_cargo(db: Session, role_id: int, permission_id: int):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Associação não encontrada.")
 
     db.delete(associacao)
+    db.flush()
+    alterados = atualizar_fecho(db, role_id)
     db.commit()
+    recompilar_cargos(db, alterados)
     return {"mensagem": "Permissão removida do cargo com sucesso."}
 
 def obter_permissoes_por_cargo(db: Session, role_id: int):
-    """Retorna todas as permissões associadas a um cargo."""
-    cargo = db.query(Cargo).filter(Cargo.id == role_id).first()
-    if not cargo:
+    """Retorna todas as permissões efetivas de um cargo (diretas e herdadas)."""
+    # Leitura única sobre o fecho pré-calculado, indexada pela chave primária (id_cargo, id_permissao)
+    permissoes = db.query(Permissao).join(
+        cargos_permissoes_efetivas, cargos_permissoes_efetivas.c.id_permissao == Permissao.id
+    ).filter(cargos_permissoes_efetivas.c.id_cargo == role_id).all()
+
+    if not permissoes and not db.query(Cargo.id).filter(Cargo.id == role_id).first():
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cargo não encontrado.")
-    
-    # Carrega as permissões através do relacionamento
-    return [associacao.permission for associacao in cargo.permissoes_associadas]
+    return permissoes
 
 def obter_cargos_por_permissao(db: Session, permission_id: int):
     """Retorna todos os cargos que possuem uma permissão específica."""
@@ -1,6 +1,7 @@
 # backend_python/services/role_service.py
 
 from sqlalchemy.orm import Session
+from database.connection import carregar_colunas_geradas
 from models.models import Cargo, Classe
 from schemas.role_schema import RoleCreate, RoleUpdate
 from fastapi import HTTPException, status
@@ -15,8 +16,7 @@ def criar_cargo(db: Session, cargo: RoleCreate):
     db_cargo = Cargo(name=cargo.name, lodge_class_id=cargo.lodge_class_id)
     db.add(db_cargo)
     db.commit()
-    db.refresh(db_cargo)
-    return db_cargo
+    return carregar_colunas_geradas(db, db_cargo)
 
 def obter_todos_cargos(db: Session):
     """Retorna todos os cargos do banco de dados."""
@@ -44,8 +44,7 @@ def atualizar_cargo(db: Session, cargo_id: int, cargo_atualizacao: RoleUpdate):
 
     db.add(db_cargo)
     db.commit()
-    db.refresh(db_cargo)
-    return db_cargo
+    return carregar_colunas_geradas(db, db_cargo)
 
 def deletar_cargo(db: Session, cargo_id: int):
     """Deleta um cargo do banco de dados."""
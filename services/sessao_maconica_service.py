@@ -1,56 +1,197 @@
 # backend_python/services/sessao_maconica_service.py
 
-from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from models import models
 from schemas import sessao_maconica_schema, presenca_sessao_schema, visitante_schema
 from datetime import datetime, timedelta
+from typing import Optional
 from fastapi import HTTPException, status
+from config.settings import config
+from database.retry import repetir_em_conflito
+from database.upsert import upsert_em_massa
+from utils.cache_utils import CacheLRUTTL
+
+STATUS_AUSENTE = 'Ausente'
+
+# Presenças só são aceitas até 2 horas antes ou depois do horário da sessão
+JANELA_PRESENCA = timedelta(hours=2)
+
+# Sessão corrente de cada loja (id, data): evita uma consulta por check-in durante a rajada de abertura
+_cache_sessao_atual = CacheLRUTTL("sessao_atual", config.TAMANHO_CACHE_TENANTS, 30)
+
+def dentro_da_janela_presenca(data_sessao: datetime, agora: Optional[datetime] = None) -> bool:
+    agora = agora or datetime.now()
+    return data_sessao - JANELA_PRESENCA <= agora <= data_sessao + JANELA_PRESENCA
+
+def sessao_atual(db: Session, loja_id: int) -> Optional[tuple]:
+    """
+    (id, data_sessao) da sessão mais recente da loja. Só fica em cache a sessão dentro da janela de presença:
+    fora dela (ex: a sessão anterior, enquanto outro worker abre a próxima) a consulta é refeita a cada chamada.
+    """
+    sessao = _cache_sessao_atual.obter(loja_id)
+    if sessao is None:
+        registro = db.query(models.SessaoMaconica.id, models.SessaoMaconica.data_sessao).filter(
+            models.SessaoMaconica.id_loja == loja_id
+        ).order_by(models.SessaoMaconica.data_sessao.desc()).first()
+        if registro is None:
+            return None
+        sessao = (registro.id, registro.data_sessao)
+        if dentro_da_janela_presenca(registro.data_sessao):
+            _cache_sessao_atual.definir(loja_id, sessao)
+    return sessao
+
+def _presencas_da_visao(sessao: "models.SessaoMaconica") -> list:
+    """
+    Presenças registradas mais as ausências derivadas: todo membro do rol da sessão
+    (`membros_convocados`) sem registro aparece como 'Ausente', como no modo completo.
+    """
+    registradas = [presenca_sessao_schema.PresencaSessao.model_validate(presenca) for presenca in sessao.presencas]
+    com_registro = {presenca.id_membro for presenca in registradas if presenca.id_membro is not None}
+    ausencias = [
+        presenca_sessao_schema.PresencaSessao(id_sessao=sessao.id, id_membro=id_membro, status_presenca=STATUS_AUSENTE)
+        for id_membro in sessao.membros_convocados
+        if id_membro not in com_registro
+    ]
+    # Membros em ordem de id e visitantes ao final, a mesma ordem das linhas geradas no modo completo
+    return sorted(registradas + ausencias, key=lambda presenca: (presenca.id_membro is None, presenca.id_membro or 0, presenca.id or 0))
+
+def visao_sessao(sessao: Optional["models.SessaoMaconica"]):
+    """
+    Sessão como vista pela API. Sessões do modo esparso (com rol gravado) têm as ausências
+    derivadas na leitura; as do modo completo já possuem uma linha por membro e são devolvidas como estão.
+    """
+    if sessao is None or sessao.membros_convocados is None:
+        return sessao
+    return sessao_maconica_schema.SessaoMaconica.model_validate(sessao).model_copy(
+        update={"presencas": _presencas_da_visao(sessao)}
+    )
 
 def get_sessoes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.SessaoMaconica).offset(skip).limit(limit).all()
+    sessoes = db.query(models.SessaoMaconica).offset(skip).limit(limit).all()
+    return [visao_sessao(sessao) for sessao in sessoes]
 
 def get_sessao(db: Session, sessao_id: int):
     return db.query(models.SessaoMaconica).filter(models.SessaoMaconica.id == sessao_id).first()
 
+async def get_sessao_async(db: AsyncSession, sessao_id: int):
+    # As presenças entram na resposta; em sessões assíncronas precisam ser carregadas antecipadamente
+    resultado = await db.execute(
+        select(models.SessaoMaconica)
+        .where(models.SessaoMaconica.id == sessao_id)
+        .options(selectinload(models.SessaoMaconica.presencas))
+    )
+    return visao_sessao(resultado.scalars().first())
+
 def create_sessao(db: Session, sessao: sessao_maconica_schema.SessaoMaconicaCreate, loja_id: int):
     db_sessao = models.SessaoMaconica(**sessao.dict(), id_loja=loja_id)
-    db.add(db_sessao)
-    db.commit()
-    db.refresh(db_sessao)
+    filtro_ativos = (models.MembroLoja.id_loja == loja_id, models.MembroLoja.situacao == 'Ativo')
+
+    if config.MODO_PRESENCA == "esparso":
+        # Só o rol (ids dos membros ativos) é gravado; as ausências são derivadas na leitura
+        db_sessao.membros_convocados = list(db.execute(
+            select(models.MembroLoja.id).where(*filtro_ativos).order_by(models.MembroLoja.id)
+        ).scalars())
+        # Sessão nova não tem presenças: a visão é montada sem carregar a coleção do banco
+        db_sessao.presencas = []
+        db.add(db_sessao)
+        db.commit()
+        _cache_sessao_atual.invalidar(loja_id)
+        return visao_sessao(db_sessao)
 
-    membros_ativos = db.query(models.MembroLoja).filter(models.MembroLoja.id_loja == loja_id, models.MembroLoja.situacao == 'Ativo').all()
-    for membro in membros_ativos:
-        presenca = presenca_sessao_schema.PresencaSessaoCreate(id_sessao=db_sessao.id, id_membro=membro.id, status_presenca='Ausente')
-        db_presenca = models.PresencaSessao(**presenca.dict())
-        db.add(db_presenca)
-    
+    db.add(db_sessao)
+    # Flush (não commit) para obter o id: sessão e presenças entram na mesma transação
+    db.flush()
+
+    # Lista de presença inicial gerada no próprio banco: um único INSERT ... SELECT dos membros ativos,
+    # sem carregar os membros nem criar um objeto por presença
+    db.execute(
+        insert(models.PresencaSessao).from_select(
+            ["id_sessao", "id_membro", "status_presenca"],
+            select(literal(db_sessao.id), models.MembroLoja.id, literal(STATUS_AUSENTE)).where(*filtro_ativos),
+        )
+    )
     db.commit()
-    db.refresh(db_sessao)
+    _cache_sessao_atual.invalidar(loja_id)
 
     return db_sessao
 
+def _atualizar_status_em_massa(db: Session, sessao_id: int, coluna, status_por_id: dict, agora: datetime) -> int:
+    """
+    Um único UPDATE para todas as linhas da sessão identificadas por `coluna` (membro ou visitante):
+    o novo status vem de um CASE sobre o id. Retorna o número de linhas atualizadas.
+    """
+    if not status_por_id:
+        return 0
+    resultado = db.execute(
+        update(models.PresencaSessao)
+        .where(models.PresencaSessao.id_sessao == sessao_id, coluna.in_(list(status_por_id)))
+        .values(status_presenca=case(status_por_id, value=coluna), data_hora_checkin=agora)
+        .execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount
+
+def _registrar_presencas_esparsas(db: Session, sessao_id: int, status_por_membro: dict, agora: datetime) -> int:
+    """
+    No modo esparso, 'Ausente' remove o registro do membro (a ausência é derivada do rol);
+    os demais status atualizam o registro existente ou o criam (upsert sobre o índice único). Um comando por operação.
+    """
+    ausentes = [id_membro for id_membro, status_presenca in status_por_membro.items() if status_presenca == STATUS_AUSENTE]
+    registrados = {id_membro: status_presenca for id_membro, status_presenca in status_por_membro.items() if status_presenca != STATUS_AUSENTE}
+    alteradas = 0
+    if ausentes:
+        alteradas += db.execute(
+            delete(models.PresencaSessao)
+            .where(models.PresencaSessao.id_sessao == sessao_id, models.PresencaSessao.id_membro.in_(ausentes))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    alteradas += upsert_em_massa(
+        db, models.PresencaSessao,
+        [
+            {"id_sessao": sessao_id, "id_membro": id_membro, "status_presenca": status_presenca, "data_hora_checkin": agora}
+            for id_membro, status_presenca in registrados.items()
+        ],
+        chaves=["id_sessao", "id_membro"],
+        colunas_atualizar=["status_presenca", "data_hora_checkin"],
+    )
+    return alteradas
+
+@repetir_em_conflito()
 def update_session_attendance(db: Session, sessao_id: int, attendance_data: list[presenca_sessao_schema.PresencaSessaoBase]):
-    for attendance in attendance_data:
-        # Determine if it's a member or visitor attendance
-        if attendance.id_membro:
-            db.query(models.PresencaSessao).filter(
-                models.PresencaSessao.id_sessao == sessao_id,
-                models.PresencaSessao.id_membro == attendance.id_membro
-            ).update({"status_presenca": attendance.status_presenca, "data_hora_checkin": datetime.now()})
-        elif attendance.id_visitante:
-            db.query(models.PresencaSessao).filter(
-                models.PresencaSessao.id_sessao == sessao_id,
-                models.PresencaSessao.id_visitante == attendance.id_visitante
-            ).update({"status_presenca": attendance.status_presenca, "data_hora_checkin": datetime.now()})
+    """
+    Aplica a lista de presença inteira em comandos de conjunto (um UPDATE com CASE para os membros
+    e outro para os visitantes), com um único horário de registro para todo o lote.
+    Retorna a sessão atualizada e o número de linhas alteradas.
+    """
+    agora = datetime.now()
+    # Entradas repetidas: prevalece a última, como no processamento item a item
+    status_por_membro = {attendance.id_membro: attendance.status_presenca for attendance in attendance_data if attendance.id_membro}
+    status_por_visitante = {
+        attendance.id_visitante: attendance.status_presenca
+        for attendance in attendance_data if not attendance.id_membro and attendance.id_visitante
+    }
+    esparsa = db.query(models.SessaoMaconica.membros_convocados).filter(
+        models.SessaoMaconica.id == sessao_id
+    ).scalar() is not None
+
+    if esparsa:
+        alteradas = _registrar_presencas_esparsas(db, sessao_id, status_por_membro, agora)
+    else:
+        alteradas = _atualizar_status_em_massa(db, sessao_id, models.PresencaSessao.id_membro, status_por_membro, agora)
+    alteradas += _atualizar_status_em_massa(db, sessao_id, models.PresencaSessao.id_visitante, status_por_visitante, agora)
     db.commit()
-    return get_sessao(db, sessao_id)
+    # Os comandos em massa não sincronizam a sessão: a resposta relê as presenças
+    sessao = get_sessao(db, sessao_id)
+    if sessao is not None:
+        db.expire(sessao, ["presencas"])
+    return visao_sessao(sessao), alteradas
 
 def manage_session_visitor(db: Session, sessao_id: int, visitor_data: visitante_schema.VisitanteCreate):
     # First, create or get the visitor
     db_visitor = models.Visitante(**visitor_data.dict())
     db.add(db_visitor)
-    db.commit()
-    db.refresh(db_visitor)
+    db.flush()
 
     # Then, create a PresencaSessao entry for the visitor
     presenca = presenca_sessao_schema.PresencaSessaoCreate(
@@ -62,20 +203,18 @@ def manage_session_visitor(db: Session, sessao_id: int, visitor_data: visitante_
     db_presenca = models.PresencaSessao(**presenca.dict())
     db.add(db_presenca)
     db.commit()
-    db.refresh(db_presenca)
 
     return db_visitor
 
 def remove_session_visitor(db: Session, visitor_id: int):
     # Delete the PresencaSessao entry first
     db.query(models.PresencaSessao).filter(models.PresencaSessao.id_visitante == visitor_id).delete()
-    db.commit()
 
-    # Then delete the visitor
+    # Then delete the visitor (same transaction as the attendance rows)
     db_visitor = db.query(models.Visitante).filter(models.Visitante.id == visitor_id).first()
     if db_visitor:
         db.delete(db_visitor)
-        db.commit()
+    db.commit()
     return db_visitor
 
 def suggest_next_session_date(db: Session, loja_id: int):
@@ -113,5 +252,4 @@ def update_sessao_status(db: Session, sessao_id: int, new_status: str):
 
     sessao.status = new_status
     db.commit()
-    db.refresh(sessao)
-    return sessao
+    return visao_sessao(sessao)
@@ -0,0 +1,90 @@
+# backend_python/services/shard_service.py
+
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config.settings import config
+from database.async_connection import obter_engine_async_shard
+from database.sharding import SHARD_DIRETORIO, engine_do_shard, engines_shards
+from models.models import MapaShard
+from utils.cache_utils import CacheLRUTTL
+from utils.request_context import obter_contexto
+
+ESTADO_ATIVO = "ativo"
+ESTADO_CONGELADO = "congelado"
+
+@dataclass(frozen=True)
+class EntradaShard:
+    shard: str
+    congelado: bool
+
+_ENTRADA_DIRETORIO = EntradaShard(SHARD_DIRETORIO, False)
+
+# TTL curto: é o tempo máximo para todos os processos perceberem que uma loja foi congelada ou movida
+_cache_mapa = CacheLRUTTL("mapa_shards", config.TAMANHO_CACHE_TENANTS, config.TTL_CACHE_SHARDS)
+
+def obter_entrada_shard(db: Session, id_loja: int) -> EntradaShard:
+    """Shard e estado de uma loja; lojas sem registro no mapa ficam no banco diretório."""
+    entrada = _cache_mapa.obter(id_loja)
+    if entrada is None:
+        registro = db.query(MapaShard).filter(MapaShard.id_loja == id_loja).first()
+        entrada = EntradaShard(registro.shard, registro.estado == ESTADO_CONGELADO) if registro else _ENTRADA_DIRETORIO
+        _cache_mapa.definir(id_loja, entrada)
+    return entrada
+
+def _exigir_disponivel(entrada: EntradaShard):
+    if entrada.congelado:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Os dados desta loja estão sendo migrados. Tente novamente em instantes.",
+            headers={"Retry-After": str(config.TTL_CACHE_SHARDS * 2)},
+        )
+
+def _anotar_loja(id_loja: Optional[int]):
+    # Registra a loja no contexto da requisição (usado nos logs de diagnóstico)
+    contexto = obter_contexto()
+    if contexto is not None:
+        contexto.id_loja = id_loja
+
+def selecionar_shard(db: Session, id_loja: Optional[int]) -> str:
+    """
+    Aponta a sessão da requisição para o shard da loja: as tabelas da loja passam a ser lidas e
+    escritas nele, enquanto as globais continuam no diretório. Lojas congeladas respondem 503.
+    """
+    _anotar_loja(id_loja)
+    if id_loja is None or not engines_shards:
+        return SHARD_DIRETORIO
+    entrada = obter_entrada_shard(db, id_loja)
+    _exigir_disponivel(entrada)
+    db.bind = engine_do_shard(entrada.shard)
+    # Os caches indexados por id de linha da loja (usuários, cargo por associação) incluem o shard
+    db.info["shard"] = entrada.shard
+    return entrada.shard
+
+async def selecionar_shard_async(db: AsyncSession, id_loja: Optional[int]) -> str:
+    """Equivalente de `selecionar_shard` para a sessão assíncrona."""
+    _anotar_loja(id_loja)
+    if id_loja is None or not engines_shards:
+        return SHARD_DIRETORIO
+    entrada = await db.run_sync(obter_entrada_shard, id_loja)
+    _exigir_disponivel(entrada)
+    db.sync_session.bind = obter_engine_async_shard(entrada.shard).sync_engine
+    db.info["shard"] = entrada.shard
+    return entrada.shard
+
+def alocar_loja(db: Session, id_loja: int):
+    """Registra uma loja recém-criada no shard padrão (sem DB_DEFAULT_SHARD, ela fica no diretório)."""
+    if config.SHARD_PADRAO:
+        db.add(MapaShard(id_loja=id_loja, shard=config.SHARD_PADRAO, estado=ESTADO_ATIVO))
+        _cache_mapa.invalidar(id_loja)
+
+def invalidar_shard(id_loja: int):
+    _cache_mapa.invalidar(id_loja)
+
+def obter_metricas() -> dict:
+    """Shards configurados e contadores do cache do mapa de shards."""
+    return {"shards": sorted(engines_shards), "shard_padrao": config.SHARD_PADRAO, "cache": _cache_mapa.metricas()}
@@ -0,0 +1,134 @@
+# backend_python/services/tenant_registry_service.py
+
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config.settings import config
+from models.models import Loja
+from utils.cache_utils import CacheLRUTTL
+
+@dataclass(frozen=True)
+class TenantSnapshot:
+    """Representação leve e imutável de uma Loja ativa, segura para compartilhar entre requisições."""
+    id: int
+    codigo_loja: str
+    nome_loja: str
+    id_potencia: int
+    dominio_personalizado: Optional[str]
+    esta_ativo: bool
+
+    @classmethod
+    def de_loja(cls, loja: Loja) -> "TenantSnapshot":
+        return cls(
+            id=loja.id,
+            codigo_loja=loja.codigo_loja,
+            nome_loja=loja.nome_loja,
+            id_potencia=loja.id_potencia,
+            dominio_personalizado=loja.dominio_personalizado,
+            esta_ativo=loja.esta_ativo,
+        )
+
+# Marcador para códigos/domínios sabidamente inexistentes (cache negativo)
+_INEXISTENTE = object()
+
+_cache_tenants = CacheLRUTTL("tenants", config.TAMANHO_CACHE_TENANTS, config.TTL_CACHE_TENANTS)
+_cache_negativo = CacheLRUTTL("tenants_negativo", config.TAMANHO_CACHE_TENANTS, config.TTL_CACHE_TENANTS_NEGATIVO)
+
+def _normalizar_dominio(host: str) -> str:
+    """Remove a porta e normaliza o host recebido no cabeçalho 'Host'."""
+    return host.split(":", 1)[0].strip().lower()
+
+def _buscar_em_cache(chave: tuple):
+    """Retorna o snapshot em cache, `_INEXISTENTE` (cache negativo) ou None se for preciso consultar o banco."""
+    tenant = _cache_tenants.obter(chave)
+    if tenant is not None:
+        return tenant
+    return _cache_negativo.obter(chave)
+
+def _armazenar(chave: tuple, loja: Optional[Loja]) -> Optional[TenantSnapshot]:
+    if not loja:
+        _cache_negativo.definir(chave, _INEXISTENTE)
+        return None
+
+    tenant = TenantSnapshot.de_loja(loja)
+    _cache_tenants.definir(chave, tenant)
+    _cache_tenants.definir(("codigo", tenant.codigo_loja), tenant)
+    if tenant.dominio_personalizado:
+        _cache_tenants.definir(("dominio", _normalizar_dominio(tenant.dominio_personalizado)), tenant)
+    return tenant
+
+def _resolver(db: Session, chave: tuple, filtro) -> Optional[TenantSnapshot]:
+    em_cache = _buscar_em_cache(chave)
+    if em_cache is not None:
+        return None if em_cache is _INEXISTENTE else em_cache
+    return _armazenar(chave, db.query(Loja).filter(filtro, Loja.esta_ativo == True).first())
+
+async def _resolver_async(db: AsyncSession, chave: tuple, filtro) -> Optional[TenantSnapshot]:
+    em_cache = _buscar_em_cache(chave)
+    if em_cache is not None:
+        return None if em_cache is _INEXISTENTE else em_cache
+    resultado = await db.execute(select(Loja).where(filtro, Loja.esta_ativo == True).limit(1))
+    return _armazenar(chave, resultado.scalars().first())
+
+def obter_tenant_por_codigo(db: Session, codigo_loja: str) -> Optional[TenantSnapshot]:
+    """Resolve uma loja ativa pelo `codigo_loja`, consultando o banco apenas em caso de falha no cache."""
+    return _resolver(db, ("codigo", codigo_loja), Loja.codigo_loja == codigo_loja)
+
+def obter_tenant_por_dominio(db: Session, host: str) -> Optional[TenantSnapshot]:
+    """Resolve uma loja ativa pelo domínio personalizado (cabeçalho 'Host')."""
+    dominio = _normalizar_dominio(host)
+    return _resolver(db, ("dominio", dominio), Loja.dominio_personalizado == dominio)
+
+def codigo_do_subdominio(host: str) -> Optional[str]:
+    """Código da loja em '<codigo>.<DOMINIO_BASE_LOJAS>', ou None se o host não for um subdomínio do domínio base."""
+    base = config.DOMINIO_BASE_LOJAS.strip().lower()
+    dominio = _normalizar_dominio(host)
+    if not base or not dominio.endswith("." + base):
+        return None
+    codigo = dominio[:-len(base) - 1]
+    return codigo if codigo and "." not in codigo else None
+
+def obter_tenant_por_host(db: Session, host: str) -> Optional[TenantSnapshot]:
+    """
+    Resolve uma loja ativa pelo cabeçalho 'Host': um subdomínio do domínio base (TENANT_BASE_DOMAIN)
+    identifica a loja pelo código; outro host só identifica uma loja se for um domínio personalizado cadastrado.
+    """
+    codigo = codigo_do_subdominio(host)
+    if codigo:
+        return _resolver(db, ("subdominio", codigo), func.lower(Loja.codigo_loja) == codigo)
+    return obter_tenant_por_dominio(db, host)
+
+async def obter_tenant_por_codigo_async(db: AsyncSession, codigo_loja: str) -> Optional[TenantSnapshot]:
+    """Equivalente assíncrono de `obter_tenant_por_codigo`."""
+    return await _resolver_async(db, ("codigo", codigo_loja), Loja.codigo_loja == codigo_loja)
+
+async def obter_tenant_por_dominio_async(db: AsyncSession, host: str) -> Optional[TenantSnapshot]:
+    """Equivalente assíncrono de `obter_tenant_por_dominio`."""
+    dominio = _normalizar_dominio(host)
+    return await _resolver_async(db, ("dominio", dominio), Loja.dominio_personalizado == dominio)
+
+async def obter_tenant_por_host_async(db: AsyncSession, host: str) -> Optional[TenantSnapshot]:
+    """Equivalente assíncrono de `obter_tenant_por_host`."""
+    codigo = codigo_do_subdominio(host)
+    if codigo:
+        return await _resolver_async(db, ("subdominio", codigo), func.lower(Loja.codigo_loja) == codigo)
+    return await obter_tenant_por_dominio_async(db, host)
+
+def invalidar_tenant(codigo_loja: Optional[str] = None, dominio_personalizado: Optional[str] = None):
+    """Remove do cache (positivo e negativo) as entradas de um código e/ou domínio de loja."""
+    chaves = []
+    if codigo_loja:
+        chaves.extend([("codigo", codigo_loja), ("subdominio", codigo_loja.lower())])
+    if dominio_personalizado:
+        chaves.append(("dominio", _normalizar_dominio(dominio_personalizado)))
+    for chave in chaves:
+        _cache_tenants.invalidar(chave)
+        _cache_negativo.invalidar(chave)
+
+def obter_metricas() -> dict:
+    """Retorna os contadores dos caches de tenants."""
+    return {"tenants": _cache_tenants.metricas(), "negativo": _cache_negativo.metricas()}
@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session, joinedload
 from models.models import Loja, Classe
 from schemas.tenant_schema import TenantCreate, TenantUpdate
 from fastapi import HTTPException, status
+from services.tenant_registry_service import invalidar_tenant
+from services.shard_service import alocar_loja, invalidar_shard
 
 def create_tenant(db: Session, tenant: TenantCreate) -> Loja:
     # Verifica se a classe (potência) existe
@@ -18,8 +20,11 @@ def create_tenant(db: Session, tenant: TenantCreate) -> Loja:
 
     new_tenant = Loja(**tenant.model_dump())
     db.add(new_tenant)
+    db.flush()
+    alocar_loja(db, new_tenant.id)
     db.commit()
-    db.refresh(new_tenant)
+    # Descarta eventual cache negativo do código recém-criado
+    invalidar_tenant(new_tenant.codigo_loja, new_tenant.dominio_personalizado)
     return new_tenant
 
 def get_tenant(db: Session, tenant_id: int) -> Loja:
@@ -35,6 +40,7 @@ def update_tenant(db: Session, tenant_id: int, tenant_update: TenantUpdate) -> L
     db_tenant = get_tenant(db, tenant_id)
 
     update_data = tenant_update.model_dump(exclude_unset=True)
+    codigo_anterior, dominio_anterior = db_tenant.codigo_loja, db_tenant.dominio_personalizado
     
     # Se o id_classe for atualizado, verifica se a nova classe existe
     if "id_classe" in update_data:
@@ -47,7 +53,8 @@ def update_tenant(db: Session, tenant_id: int, tenant_update: TenantUpdate) -> L
     
     db.add(db_tenant)
     db.commit()
-    db.refresh(db_tenant)
+    invalidar_tenant(codigo_anterior, dominio_anterior)
+    invalidar_tenant(db_tenant.codigo_loja, db_tenant.dominio_personalizado)
     return db_tenant
 
 def delete_tenant(db: Session, tenant_id: int):
@@ -57,4 +64,6 @@ def delete_tenant(db: Session, tenant_id: int):
     
     db.delete(db_tenant)
     db.commit()
+    invalidar_tenant(db_tenant.codigo_loja, db_tenant.dominio_personalizado)
+    invalidar_shard(tenant_id)
     return {"message": "Loja deletada com sucesso."}
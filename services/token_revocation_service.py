@@ -0,0 +1,197 @@
+# backend_python/services/token_revocation_service.py
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config.settings import config
+from database.connection import SessionLocal
+from models.models import TokenRevogado
+from utils.bloom_filter import FiltroBloom
+from utils.logger import logger
+
+# Os ids e o `criado_em` de transações concorrentes ficam visíveis fora de ordem: cada sincronização
+# relê as revogações criadas nesta janela antes da mais recente já vista.
+SOBREPOSICAO_SINCRONIZACAO = timedelta(seconds=60)
+
+class RegistroRevogacoes:
+    """
+    Lista de tokens revogados mantida em memória.
+    O filtro de Bloom descarta sem custo a grande maioria dos tokens (não revogados);
+    apenas os "possivelmente presentes" são confirmados no conjunto exato de `jti`s.
+    As novas revogações são buscadas de forma incremental pelas requisições (somente leitura,
+    por `criado_em` com sobreposição); o descarte das expiradas e a reconstrução do filtro
+    ficam com uma thread de manutenção iniciada com a aplicação.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lock_sincronizacao = threading.Lock()
+        self._filtro = FiltroBloom(config.CAPACIDADE_FILTRO_REVOGACOES)
+        self._jtis: set[str] = set()
+        # Maior `criado_em` já lido (relógio do banco); None antes da primeira leitura
+        self._marca: Optional[datetime] = None
+        self._ultima_sincronizacao = 0.0
+        self._ultima_reconstrucao = 0.0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._metricas = {"verificacoes": 0, "descartadas_pelo_filtro": 0, "falsos_positivos": 0, "revogados_rejeitados": 0}
+
+    def _adicionar(self, jti: str):
+        if jti not in self._jtis:
+            self._jtis.add(jti)
+            self._filtro.adicionar(jti)
+
+    def _avancar_marca(self, criado_em: Optional[datetime]):
+        if criado_em is not None and (self._marca is None or criado_em > self._marca):
+            self._marca = criado_em
+
+    def reconstruir(self, db: Session):
+        """Remove do banco as revogações já expiradas e recarrega o filtro do zero (thread de manutenção)."""
+        agora = datetime.now(timezone.utc)
+        removidos = db.query(TokenRevogado).filter(TokenRevogado.expira_em < agora).delete(synchronize_session=False)
+        db.commit()
+        registros = db.query(TokenRevogado.jti, TokenRevogado.criado_em).all()
+
+        filtro = FiltroBloom(max(config.CAPACIDADE_FILTRO_REVOGACOES, len(registros) * 2))
+        jtis = set()
+        for jti, _ in registros:
+            jtis.add(jti)
+            filtro.adicionar(jti)
+        with self._lock_sincronizacao, self._lock:
+            # Revogações lidas pelas requisições após a leitura acima voltam na próxima sincronização (sobreposição)
+            self._filtro = filtro
+            self._jtis = jtis
+            self._marca = None
+            for _, criado_em in registros:
+                self._avancar_marca(criado_em)
+            self._ultima_sincronizacao = self._ultima_reconstrucao = time.monotonic()
+        logger.info(f"[TokenRevocation] Filtro reconstruído com {len(jtis)} revogações ({removidos} expiradas descartadas).")
+
+    def _precisa_reconstruir(self, agora: float) -> bool:
+        return (not self._ultima_reconstrucao
+                or agora - self._ultima_reconstrucao >= config.INTERVALO_RECONSTRUCAO_REVOGACOES
+                or self._filtro.saturado)
+
+    def _precisa_sincronizar(self, agora: float) -> bool:
+        return not self._ultima_sincronizacao or agora - self._ultima_sincronizacao >= config.INTERVALO_SINCRONIZACAO_REVOGACOES
+
+    def sincronizar(self, db: Session):
+        """
+        Busca as revogações registradas (inclusive por outros processos) desde a última sincronização.
+        Só lê: nenhuma escrita ou commit na sessão da requisição. Se outra requisição (ou a reconstrução)
+        já estiver sincronizando, esta segue com o estado atual em vez de esperar.
+        """
+        if not self._precisa_sincronizar(time.monotonic()):
+            return
+        if not self._lock_sincronizacao.acquire(blocking=False):
+            return
+        try:
+            agora = time.monotonic()
+            if not self._precisa_sincronizar(agora):
+                return
+            consulta = db.query(TokenRevogado.jti, TokenRevogado.criado_em)
+            if self._marca is not None:
+                consulta = consulta.filter(TokenRevogado.criado_em >= self._marca - SOBREPOSICAO_SINCRONIZACAO)
+            novos = consulta.all()
+            with self._lock:
+                for jti, criado_em in novos:
+                    self._adicionar(jti)
+                    self._avancar_marca(criado_em)
+                self._ultima_sincronizacao = agora
+        finally:
+            self._lock_sincronizacao.release()
+
+    def _laco_manutencao(self):
+        while not self._parar.wait(timeout=config.INTERVALO_SINCRONIZACAO_REVOGACOES):
+            self._manter()
+
+    def _manter(self):
+        if not self._precisa_reconstruir(time.monotonic()):
+            return
+        try:
+            with SessionLocal() as db:
+                self.reconstruir(db)
+        except Exception:
+            # A thread não pode morrer: tenta de novo no próximo ciclo
+            logger.exception("[TokenRevocation] Falha ao reconstruir o filtro de revogações.")
+
+    def iniciar(self):
+        """Carrega o filtro e inicia a thread que descarta as expiradas e o reconstrói periodicamente."""
+        self._manter()
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._laco_manutencao, name="token-revocation", daemon=True)
+        self._thread.start()
+
+    def encerrar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def esta_revogado(self, db: Session, jti: Optional[str]) -> bool:
+        """Indica se o `jti` foi revogado. Tokens sem `jti` (emitidos antes da revogação existir) não são revogáveis."""
+        if not jti:
+            return False
+        self.sincronizar(db)
+        with self._lock:
+            self._metricas["verificacoes"] += 1
+            if jti not in self._filtro:
+                self._metricas["descartadas_pelo_filtro"] += 1
+                return False
+            if jti not in self._jtis:
+                self._metricas["falsos_positivos"] += 1
+                return False
+            self._metricas["revogados_rejeitados"] += 1
+            return True
+
+    def revogar(self, db: Session, jti: str, expira_em: datetime):
+        """Grava a revogação e a aplica imediatamente neste processo."""
+        try:
+            db.add(TokenRevogado(jti=jti, expira_em=expira_em))
+            db.commit()
+        except IntegrityError:
+            # Token já revogado anteriormente (ex: logout repetido)
+            db.rollback()
+        with self._lock:
+            self._adicionar(jti)
+
+    def metricas(self) -> dict:
+        with self._lock:
+            metricas = dict(self._metricas)
+            metricas["revogacoes_ativas"] = len(self._jtis)
+            metricas["bits_filtro"] = self._filtro.num_bits
+            metricas["funcoes_hash_filtro"] = self._filtro.num_hashes
+        metricas["thread_manutencao_viva"] = self._thread is not None and self._thread.is_alive()
+        return metricas
+
+registro_revogacoes = RegistroRevogacoes()
+
+def token_revogado(db: Session, claims: dict) -> bool:
+    """Verifica se o token representado pelas `claims` foi revogado."""
+    return registro_revogacoes.esta_revogado(db, claims.get("jti"))
+
+def revogar_token(db: Session, claims: dict) -> bool:
+    """Revoga o token representado pelas `claims` até a sua expiração. Retorna False se ele não tiver `jti`."""
+    jti = claims.get("jti")
+    if not jti:
+        return False
+    exp = claims.get("exp")
+    expira_em = datetime.fromtimestamp(exp, tz=timezone.utc) if exp else datetime.now(timezone.utc)
+    registro_revogacoes.revogar(db, jti, expira_em)
+    logger.info(f"[TokenRevocation] Token {jti} revogado (perfil: {claims.get('perfil')}).")
+    return True
+
+def iniciar():
+    registro_revogacoes.iniciar()
+
+def encerrar():
+    registro_revogacoes.encerrar()
+
+def obter_metricas() -> dict:
+    """Retorna as verificações realizadas e quantas foram resolvidas apenas pelo filtro de Bloom."""
+    return registro_revogacoes.metricas()
@@ -16,7 +16,6 @@ def update_visitante(db: Session, visitante_id: int, visitante: visitante_schema
         for key, value in visitante.dict().items():
             setattr(db_visitante, key, value)
         db.commit()
-        db.refresh(db_visitante)
     return db_visitante
 
 def delete_visitante(db: Session, visitante_id: int):
@@ -1,9 +1,10 @@
 # backend_python/services/webmaster_role_service.py
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from models.models import AssociacaoMembroLoja, Cargo, MembroLoja
 from schemas.webmaster_role_schema import WebmasterRoleAssignment
 from fastapi import HTTPException, status
+from services.authorization_service import invalidar_cargo_da_associacao
 
 def atribuir_cargo_a_membro_loja(db: Session, associacao_id: int, role_id: int):
     """Atribui um cargo a um membro da loja através de sua associação."""
@@ -18,7 +19,7 @@ def atribuir_cargo_a_membro_loja(db: Session, associacao_id: int, role_id: int):
     associacao.role_id = role_id
     db.add(associacao)
     db.commit()
-    db.refresh(associacao)
+    invalidar_cargo_da_associacao(db, associacao.id)
     return associacao
 
 def remover_cargo_de_membro_loja(db: Session, associacao_id: int):
@@ -34,16 +35,17 @@ def remover_cargo_de_membro_loja(db: Session, associacao_id: int):
     associacao.role_id = None # Assumindo que role_id pode ser nulo
     db.add(associacao)
     db.commit()
-    db.refresh(associacao)
+    invalidar_cargo_da_associacao(db, associacao.id)
     return associacao
 
 def obter_cargo_membro_loja(db: Session, associacao_id: int):
     """Obtém o cargo de um membro da loja através de sua associação."""
-    associacao = db.query(AssociacaoMembroLoja).filter(AssociacaoMembroLoja.id == associacao_id).first()
+    associacao = db.query(AssociacaoMembroLoja).options(joinedload(AssociacaoMembroLoja.role)).filter(
+        AssociacaoMembroLoja.id == associacao_id
+    ).first()
     if not associacao:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Associação de membro da loja não encontrada.")
     
-    db.refresh(associacao, attribute_names=['role'])
     return {
         "lodge_member_association_id": associacao.id,
         "role_id": associacao.role_id,
@@ -4,8 +4,9 @@ from sqlalchemy.orm import Session
 from models.models import Webmaster
 from schemas.webmaster_schema import WebmasterUpdateEmail
 from utils.password_utils import generate_secure_password
+from middleware.authorize_middleware import invalidar_usuario_em_cache
+from services import password_service
 from fastapi import HTTPException, status
-import bcrypt
 
 def obter_webmaster_por_id(db: Session, webmaster_id: int):
     """Retorna um webmaster específico pelo ID."""
@@ -19,12 +20,10 @@ def resetar_senha_webmaster(db: Session, webmaster_id: int):
     db_webmaster = obter_webmaster_por_id(db, webmaster_id)
 
     nova_senha = generate_secure_password()
-    senha_hash = bcrypt.hashpw(nova_senha.encode('utf-8'), bcrypt.gensalt())
-
-    db_webmaster.senha_hash = senha_hash.decode('utf-8')
+    db_webmaster.senha_hash = password_service.hash_senha_sync(nova_senha)
     db.add(db_webmaster)
     db.commit()
-    db.refresh(db_webmaster)
+    invalidar_usuario_em_cache("webmaster", webmaster_id)
 
     return {"message": "Senha do webmaster resetada com sucesso.", "new_password": nova_senha}
 
@@ -35,5 +34,5 @@ def atualizar_email_webmaster(db: Session, webmaster_id: int, email_atualizacao:
     db_webmaster.email = email_atualizacao.email
     db.add(db_webmaster)
     db.commit()
-    db.refresh(db_webmaster)
+    invalidar_usuario_em_cache("webmaster", webmaster_id)
     return db_webmaster
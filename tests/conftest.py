@@ -0,0 +1,75 @@
+# backend_python/tests/conftest.py
+
+import os
+
+# Configuração mínima para importar a aplicação sem um .env (o banco dos testes é um SQLite em memória)
+for nome, valor in {
+    "DB_GLOBAL_USER": "teste",
+    "DB_GLOBAL_PASS": "senha-de-teste",
+    "DB_GLOBAL_HOST": "localhost",
+    "DB_ASYNC_URL": "sqlite+aiosqlite://",
+    "EMAIL_HOST": "localhost",
+    "EMAIL_PORT": "25",
+    "EMAIL_USER": "teste",
+    "EMAIL_PASS": "teste",
+    "JWT_SECRET": "segredo-de-teste-com-pelo-menos-32-caracteres",
+    "ROOT_EMAIL": "root@teste.local",
+    "ROOT_PASSWORD": "senha-de-teste",
+}.items():
+    os.environ.setdefault(nome, valor)
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+from database.connection import Base, SessionLocal
+from models import models
+
+class ContadorInstrucoes:
+    """Conta as instruções SQL enviadas ao banco (BEGIN/COMMIT do driver não passam pelo cursor)."""
+
+    def __init__(self):
+        self.instrucoes: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.instrucoes.append(statement)
+
+    def zerar(self):
+        self.instrucoes.clear()
+
+    @property
+    def total(self) -> int:
+        return len(self.instrucoes)
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    if "presencas_sessao" in Base.metadata.tables:
+        with engine.begin() as conexao:
+            # Alvo do upsert de presenças (migração presenca_unica)
+            conexao.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_presencas_sessao_sessao_membro ON presencas_sessao (id_sessao, id_membro)"
+            ))
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(engine):
+    sessao = SessionLocal(bind=engine)
+    yield sessao
+    sessao.close()
+
+@pytest.fixture
+def loja(db):
+    loja = models.Loja(nome_loja="Loja de Teste", codigo_loja="TESTE01", id_potencia=1)
+    db.add(loja)
+    db.commit()
+    return loja
+
+@pytest.fixture
+def contador(engine):
+    contador = ContadorInstrucoes()
+    event.listen(engine, "before_cursor_execute", contador)
+    yield contador
+    event.remove(engine, "before_cursor_execute", contador)
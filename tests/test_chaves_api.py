@@ -0,0 +1,23 @@
+# backend_python/tests/test_chaves_api.py
+#
+# Número de instruções SQL das escritas de chaves de API (sem releitura após o commit).
+
+from schemas.api_key_schema import ApiKeyCreate
+from services import api_key_service
+
+def _instrucoes(contador) -> str:
+    return "\n".join(contador.instrucoes)
+
+def test_criar_chave_api(db, loja, contador):
+    contador.zerar()
+    resposta = api_key_service.criar_chave_api(db, ApiKeyCreate(nome="Quiosque", id_loja=loja.id, escopos=["a:b"]))
+    # SELECT da loja, INSERT e leitura de criado_em/atualizado_em para a resposta
+    assert contador.total == 3, _instrucoes(contador)
+    assert resposta["criado_em"] is not None
+
+def test_revogar_chave_api(db, loja, contador):
+    criada = api_key_service.criar_chave_api(db, ApiKeyCreate(nome="Quiosque", id_loja=loja.id))
+    contador.zerar()
+    api_key_service.revogar_chave_api(db, criada["id"])
+    # SELECT da chave e UPDATE; atualizado_em não entra na resposta e não é relido
+    assert contador.total == 2, _instrucoes(contador)
@@ -0,0 +1,64 @@
+# backend_python/tests/test_idas_ao_banco.py
+#
+# Número de instruções SQL por operação de escrita de sessões e presenças: sem releitura após o
+# commit, sem commits intermediários e sem um comando por linha. Um aumento aqui é uma ida ao
+# banco a mais por requisição. As chaves de API ficam em test_chaves_api.py.
+
+from datetime import datetime
+
+import pytest
+
+from config.settings import config
+from database.upsert import upsert
+from models import models
+from schemas.presenca_sessao_schema import PresencaSessaoBase
+from schemas.sessao_maconica_schema import SessaoMaconicaCreate
+from services import sessao_maconica_service
+
+MODELOS_NECESSARIOS = ("SessaoMaconica", "PresencaSessao", "MembroLoja")
+
+pytestmark = pytest.mark.skipif(
+    not all(hasattr(models, nome) for nome in MODELOS_NECESSARIOS),
+    reason=f"Modelos ausentes nesta árvore: {', '.join(n for n in MODELOS_NECESSARIOS if not hasattr(models, n))}",
+)
+
+def _nova_sessao() -> SessaoMaconicaCreate:
+    return SessaoMaconicaCreate(data_sessao=datetime.now(), tipo="Ordinária", status="Agendada")
+
+def _instrucoes(contador) -> str:
+    return "\n".join(contador.instrucoes)
+
+def test_criar_sessao_modo_completo(db, loja, contador, monkeypatch):
+    monkeypatch.setattr(config, "MODO_PRESENCA", "completo")
+    contador.zerar()
+    sessao_maconica_service.create_sessao(db, _nova_sessao(), loja.id)
+    # INSERT da sessão e um único INSERT ... SELECT para a lista de presença
+    assert contador.total == 2, _instrucoes(contador)
+
+def test_criar_sessao_modo_esparso(db, loja, contador, monkeypatch):
+    monkeypatch.setattr(config, "MODO_PRESENCA", "esparso")
+    contador.zerar()
+    sessao_maconica_service.create_sessao(db, _nova_sessao(), loja.id)
+    # SELECT do rol e INSERT da sessão
+    assert contador.total == 2, _instrucoes(contador)
+
+def test_atualizar_presencas_modo_completo(db, loja, contador, monkeypatch):
+    monkeypatch.setattr(config, "MODO_PRESENCA", "completo")
+    sessao = sessao_maconica_service.create_sessao(db, _nova_sessao(), loja.id)
+    lista = [PresencaSessaoBase(id_membro=id_membro, status_presenca="Presente") for id_membro in range(1, 51)]
+    contador.zerar()
+    sessao_maconica_service.update_session_attendance(db, sessao.id, lista)
+    # Modo da sessão, um UPDATE com CASE para todos os membros e a releitura da sessão para a resposta
+    assert contador.total == 3, _instrucoes(contador)
+
+def test_checkin(db, loja, contador):
+    valores = {"id_sessao": 1, "id_membro": 7, "status_presenca": "Presente", "data_hora_checkin": datetime.now()}
+    contador.zerar()
+    for _ in range(2):
+        upsert(
+            db, models.PresencaSessao, valores, chaves=["id_sessao", "id_membro"],
+            atualizar={"status_presenca": valores["status_presenca"], "data_hora_checkin": valores["data_hora_checkin"]},
+        )
+        db.commit()
+    # Um único comando por check-in, inclusive quando o registro já existe
+    assert contador.total == 2, _instrucoes(contador)
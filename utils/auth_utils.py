@@ -1,5 +1,6 @@
 # backend_python/utils/auth_utils.py
 
+import uuid
 from datetime import datetime, timedelta, timezone
 from jose import jwt
 from typing import Optional
@@ -14,7 +15,8 @@ def criar_token_acesso(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expira_em = datetime.now(timezone.utc) + timedelta(minutes=15)
     
-    a_codificar.update({"exp": expira_em})
+    # `jti` identifica o token de forma única, permitindo revogá-lo antes da expiração
+    a_codificar.update({"exp": expira_em, "jti": uuid.uuid4().hex})
     
     # CORRIGIDO: Usa o algoritmo padrão e seguro "HS256" diretamente.
     token_jwt_codificado = jwt.encode(a_codificar, config.SEGREDO_JWT, algorithm="HS256")
@@ -0,0 +1,38 @@
+# backend_python/utils/bloom_filter.py
+
+import hashlib
+import math
+
+class FiltroBloom:
+    """
+    Filtro de Bloom simples: responde "definitivamente ausente" ou "possivelmente presente".
+    Dimensionado a partir da capacidade esperada e da taxa de falsos positivos desejada.
+    """
+
+    def __init__(self, capacidade: int, taxa_falso_positivo: float = 0.001):
+        self.capacidade = max(capacidade, 1)
+        self.num_bits = max(8, int(-self.capacidade * math.log(taxa_falso_positivo) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacidade * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.quantidade = 0
+
+    def _posicoes(self, valor: str):
+        # Dupla dispersão (Kirsch-Mitzenmacher) a partir de um único digest
+        digest = hashlib.blake2b(valor.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def adicionar(self, valor: str):
+        for posicao in self._posicoes(valor):
+            self._bits[posicao >> 3] |= 1 << (posicao & 7)
+        self.quantidade += 1
+
+    def __contains__(self, valor: str) -> bool:
+        return all(self._bits[posicao >> 3] & (1 << (posicao & 7)) for posicao in self._posicoes(valor))
+
+    @property
+    def saturado(self) -> bool:
+        """Indica que o filtro passou da capacidade planejada e deve ser reconstruído."""
+        return self.quantidade > self.capacidade
@@ -0,0 +1,82 @@
+# backend_python/utils/cache_utils.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+_AUSENTE = object()
+
+class CacheLRUTTL:
+    """
+    Cache em memória com limite de tamanho (LRU) e expiração por entrada (TTL).
+    Seguro para uso concorrente entre threads e com contadores de acertos/falhas.
+    """
+
+    def __init__(self, nome: str, tamanho_max: int, ttl_segundos: float):
+        self.nome = nome
+        self.tamanho_max = tamanho_max
+        self.ttl_segundos = ttl_segundos
+        self._dados: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.invalidacoes = 0
+
+    def obter(self, chave: Hashable, padrao: Any = None) -> Any:
+        """Retorna o valor armazenado para a chave ou `padrao` se ausente/expirado."""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._dados.get(chave, _AUSENTE)
+            if item is _AUSENTE:
+                self.falhas += 1
+                return padrao
+            expira_em, valor = item
+            if expira_em <= agora:
+                del self._dados[chave]
+                self.expirados += 1
+                self.falhas += 1
+                return padrao
+            self._dados.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def definir(self, chave: Hashable, valor: Any, ttl_segundos: Optional[float] = None):
+        """Armazena um valor; o TTL pode ser reduzido por entrada (ex: expiração do token)."""
+        ttl = self.ttl_segundos if ttl_segundos is None else min(ttl_segundos, self.ttl_segundos)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + ttl, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho_max:
+                self._dados.popitem(last=False)
+
+    def invalidar(self, chave: Hashable):
+        """Remove uma entrada do cache, se existir."""
+        with self._lock:
+            if self._dados.pop(chave, _AUSENTE) is not _AUSENTE:
+                self.invalidacoes += 1
+
+    def limpar(self):
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self.invalidacoes += len(self._dados)
+            self._dados.clear()
+
+    def metricas(self) -> dict:
+        """Retorna os contadores do cache para observabilidade."""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                "nome": self.nome,
+                "tamanho": len(self._dados),
+                "tamanho_max": self.tamanho_max,
+                "ttl_segundos": self.ttl_segundos,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "expirados": self.expirados,
+                "invalidacoes": self.invalidacoes,
+                "taxa_acerto": round(self.acertos / total, 4) if total else 0.0,
+            }
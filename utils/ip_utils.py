@@ -0,0 +1,36 @@
+# backend_python/utils/ip_utils.py
+
+from ipaddress import ip_address
+
+from fastapi import Request
+
+from config.settings import config
+
+def _e_proxy_confiavel(endereco: str) -> bool:
+    try:
+        ip = ip_address(endereco)
+    except ValueError:
+        return False
+    return any(ip in rede for rede in config.LISTA_PROXIES_CONFIAVEIS)
+
+def ip_do_cliente(request: Request) -> str:
+    """
+    IP de origem da requisição. Atrás de proxies reversos (TRUSTED_PROXIES), percorre o
+    X-Forwarded-For da direita para a esquerda e retorna o primeiro endereço que não é de um
+    proxy confiável; entradas à esquerda dele foram enviadas pelo próprio cliente e são ignoradas.
+    Sem proxies configurados, ou se a conexão não vier de um deles, usa o IP da conexão.
+    """
+    ip = request.client.host if request.client else "desconhecido"
+    if not _e_proxy_confiavel(ip):
+        return ip
+    encaminhados = [
+        endereco.strip()
+        for cabecalho in request.headers.getlist("x-forwarded-for")
+        for endereco in cabecalho.split(",")
+        if endereco.strip()
+    ]
+    for endereco in reversed(encaminhados):
+        if not _e_proxy_confiavel(endereco):
+            return endereco
+        ip = endereco
+    return ip
@@ -40,6 +40,18 @@ combined_file_handler.setLevel(logging.INFO) # Ou o nível configurado
 combined_file_handler.setFormatter(formatter)
 logger.addHandler(combined_file_handler)
 
+# Logger dedicado às consultas SQL lentas (arquivo próprio, sem propagar para os demais handlers)
+slow_query_logger = logging.getLogger(f"{__name__}.slow_queries")
+slow_query_logger.setLevel(logging.INFO)
+slow_query_logger.propagate = False
+slow_query_file_handler = RotatingFileHandler(
+    os.path.join(log_dir, 'slow_queries.log'),
+    maxBytes=config.TAMANHO_MAX_LOG if isinstance(config.TAMANHO_MAX_LOG, int) else int(config.TAMANHO_MAX_LOG[:-1]) * 1024 * 1024,
+    backupCount=int(config.MAX_ARQUIVOS_LOG[:-1]) if isinstance(config.MAX_ARQUIVOS_LOG, str) and config.MAX_ARQUIVOS_LOG.endswith('d') else 14
+)
+slow_query_file_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+slow_query_logger.addHandler(slow_query_file_handler)
+
 # Handler para console (apenas em desenvolvimento)
 if config.NODE_ENV != 'production':
     console_handler = logging.StreamHandler()
@@ -0,0 +1,64 @@
+# backend_python/utils/rate_limit_utils.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+class LimitadorTokenBucket:
+    """
+    Conjunto de token buckets indexados por chave (ex: IP ou e-mail).
+    Cada bucket acumula `taxa_por_segundo` fichas até o limite `capacidade`; cada operação consome uma.
+    Buckets inativos são descartados quando o número de chaves excede `max_chaves` (LRU).
+    """
+
+    def __init__(self, taxa_por_segundo: float, capacidade: float, max_chaves: int = 100000):
+        self.taxa_por_segundo = taxa_por_segundo
+        self.capacidade = capacidade
+        self.max_chaves = max_chaves
+        self._buckets: "OrderedDict[Hashable, list[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _reabastecer(self, chave: Hashable, agora: float) -> list[float]:
+        bucket = self._buckets.get(chave)
+        if bucket is None:
+            bucket = [self.capacidade, agora]
+            self._buckets[chave] = bucket
+            while len(self._buckets) > self.max_chaves:
+                self._buckets.popitem(last=False)
+        else:
+            fichas, ultimo = bucket
+            bucket[0] = min(self.capacidade, fichas + (agora - ultimo) * self.taxa_por_segundo)
+            bucket[1] = agora
+            self._buckets.move_to_end(chave)
+        return bucket
+
+    def segundos_ate_liberar(self, chave: Hashable) -> float:
+        """Tempo estimado até haver uma ficha disponível para a chave (0 se já houver)."""
+        with self._lock:
+            fichas = self._reabastecer(chave, time.monotonic())[0]
+            if fichas >= 1:
+                return 0.0
+            return (1 - fichas) / self.taxa_por_segundo if self.taxa_por_segundo > 0 else float("inf")
+
+    def consumir(self, chave: Hashable) -> bool:
+        """Consome uma ficha da chave; retorna False se o orçamento estiver esgotado."""
+        with self._lock:
+            bucket = self._reabastecer(chave, time.monotonic())
+            if bucket[0] < 1:
+                return False
+            bucket[0] -= 1
+            return True
+
+def consumir_todos(limitadores: list[tuple["LimitadorTokenBucket", Hashable]]) -> float:
+    """
+    Consome uma ficha de cada par (limitador, chave) somente se todos tiverem saldo.
+    Retorna 0 em caso de sucesso ou o maior tempo de espera (em segundos) entre os buckets esgotados.
+    """
+    espera = max(limitador.segundos_ate_liberar(chave) for limitador, chave in limitadores)
+    if espera > 0:
+        return espera
+    for limitador, chave in limitadores:
+        if not limitador.consumir(chave):
+            return max(limitador.segundos_ate_liberar(chave), 1.0)
+    return 0.0
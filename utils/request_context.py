@@ -0,0 +1,81 @@
+# backend_python/utils/request_context.py
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+
+from utils.sql_utils import normalizar_sql
+
+@dataclass
+class ContextoRequisicao:
+    """Dados de diagnóstico e roteamento acumulados ao longo de uma requisição."""
+    id_requisicao: str
+    metodo: str
+    caminho: str
+    # Identifica o cliente (credencial ou IP) para a aderência ao primário após escritas
+    chave_aderencia: Optional[str] = None
+    inicio: float = field(default_factory=time.perf_counter)
+    # Loja identificada pela autenticação (None em rotas globais)
+    id_loja: Optional[int] = None
+    checkouts_pool: int = 0
+    consultas_sql: int = 0
+    tempo_sql: float = 0.0
+    # Instruções normalizadas -> [execuções, segundos]; só preenchido quando o dump de SQL está ativo
+    instrucoes_sql: Optional[dict] = None
+
+# O objeto é mutável: o threadpool do FastAPI copia o contexto, mas compartilha a mesma instância,
+# então as contagens feitas em endpoints síncronos também são vistas pelo middleware.
+contexto_requisicao: ContextVar[Optional[ContextoRequisicao]] = ContextVar("contexto_requisicao", default=None)
+
+def obter_contexto() -> Optional[ContextoRequisicao]:
+    """Retorna o contexto da requisição atual (None fora de uma requisição, ex: scripts)."""
+    return contexto_requisicao.get()
+
+def contar_checkout_pool(dbapi_connection, connection_record, connection_proxy):
+    """Ouvinte do evento 'checkout' dos pools: contabiliza a conexão na requisição atual."""
+    contexto = contexto_requisicao.get()
+    if contexto is not None:
+        contexto.checkouts_pool += 1
+
+# Funções chamadas após cada instrução com (conexão, instrução, parâmetros, executemany, duração, contexto)
+_observadores_consultas = []
+
+def observar_consultas(observador):
+    """Registra uma função a ser notificada de cada instrução SQL executada pelos engines instrumentados."""
+    _observadores_consultas.append(observador)
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    duracao = time.perf_counter() - conn.info["inicio_consultas"].pop()
+    contexto = contexto_requisicao.get()
+    for observador in _observadores_consultas:
+        observador(conn, statement, parameters, executemany, duracao, contexto)
+    if contexto is None:
+        return
+    contexto.consultas_sql += 1
+    contexto.tempo_sql += duracao
+    if contexto.instrucoes_sql is not None:
+        estatistica = contexto.instrucoes_sql.setdefault(normalizar_sql(statement), [0, 0.0])
+        estatistica[0] += 1
+        estatistica[1] += duracao
+
+def _descartar_inicio(contexto_excecao):
+    # Instruções que falharam não passam pelo 'after_cursor_execute'
+    conexao = contexto_excecao.connection
+    if conexao is not None and conexao.info.get("inicio_consultas"):
+        conexao.info["inicio_consultas"].pop()
+
+def instrumentar_engine(engine):
+    """
+    Registra no engine (síncrono; para os assíncronos, passe `sync_engine`) os ouvintes que
+    contabilizam na requisição atual as conexões retiradas do pool, as instruções SQL e o tempo gasto nelas.
+    """
+    event.listen(engine, "checkout", contar_checkout_pool)
+    event.listen(engine, "before_cursor_execute", _antes_da_consulta)
+    event.listen(engine, "after_cursor_execute", _depois_da_consulta)
+    event.listen(engine, "handle_error", _descartar_inicio)
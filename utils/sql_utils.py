@@ -0,0 +1,25 @@
+# backend_python/utils/sql_utils.py
+
+import re
+
+_COMENTARIOS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_TEXTOS = re.compile(r"'(?:[^']|'')*'")
+_NUMEROS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_MARCADORES = re.compile(r"%\(\w+\)s|%s|:\w+|\?|\$\d+")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALORES = re.compile(r"(VALUES\s*\(\?\))(?:\s*,\s*\(\?\))+", re.IGNORECASE)
+_ESPACOS = re.compile(r"\s+")
+
+def normalizar_sql(instrucao: str) -> str:
+    """
+    Reduz uma instrução SQL à sua forma canônica: literais e marcadores de parâmetro viram '?',
+    listas IN e inserções em lote colapsam em um único item e espaços são compactados.
+    Instruções que diferem apenas nos valores resultam no mesmo texto.
+    """
+    sql = _COMENTARIOS.sub(" ", instrucao)
+    sql = _TEXTOS.sub("?", sql)
+    sql = _MARCADORES.sub("?", sql)
+    sql = _NUMEROS.sub("?", sql)
+    sql = _LISTAS.sub("(?)", sql)
+    sql = _VALORES.sub(r"\1", sql)
+    return _ESPACOS.sub(" ", sql).strip()